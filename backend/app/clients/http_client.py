@@ -0,0 +1,170 @@
+"""
+Shared outbound HTTP clients.
+
+One httpx.AsyncClient per origin (scheme://host:port), reused across requests so
+connections stay alive and TLS handshakes to api.github.com / dev.azure.com are paid
+once. Clients speak HTTP/2 where the server supports it (requires the `h2` package,
+installed by httpx[http2]).
+
+At most HTTP_MAX_POOLED_ORIGINS clients are kept (webhook and action URLs can name
+any host); the least recently used one is evicted and closed once requests already
+running on it have had http_timeout_seconds to finish.
+
+Clients bind to the event loop that first uses them, so they are owned by a long-lived
+loop: the API lifespan and the Celery worker runtime both call close_http_clients()
+on shutdown.
+
+Polled resources (catalog-info.yaml, SBOMs) are fetched with conditional_get(): the
+ETag / Last-Modified of the last processed response is kept in Redis per URL and sent
+back as If-None-Match / If-Modified-Since, so an unchanged resource costs a 304 with
+no body (and, on api.github.com, no rate-limit budget).
+"""
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from app.clients.redis_client import get_redis
+from app.config import get_settings
+
+logger = structlog.get_logger()
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+VALIDATORS_PREFIX = "http:validators:"
+VALIDATORS_TTL = 30 * 86_400  # 30 days — then the next poll is unconditional once
+
+# origin → client, least recently used first
+_clients: OrderedDict[str, httpx.AsyncClient] = OrderedDict()
+# Evicted clients → the task closing them after a grace period
+_retiring: dict[httpx.AsyncClient, asyncio.Task[None]] = {}
+# Tests point clients at a stub (e.g. httpx.MockTransport) instead of the network
+_transport_factory: Callable[[], httpx.AsyncBaseTransport] | None = None
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.hostname:
+        raise ValueError(f"Absolute URL required, got {url!r}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname.lower()}:{port}"
+
+
+def _new_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    transport = _transport_factory() if _transport_factory else None
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE and transport is None,
+        timeout=httpx.Timeout(
+            settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections_per_host,
+            max_keepalive_connections=settings.http_max_connections_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        transport=transport,
+    )
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """The pooled client for url's origin; pass full URLs to its request methods."""
+    key = _origin(url)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        client = _clients[key] = _new_client()
+        logger.debug("http.client.created", origin=key, http2=HTTP2_AVAILABLE)
+        while len(_clients) > get_settings().http_max_pooled_origins:
+            origin, evicted = _clients.popitem(last=False)
+            logger.debug("http.client.evicted", origin=origin)
+            _retire(evicted)
+    _clients.move_to_end(key)
+    return client
+
+
+def _retire(client: httpx.AsyncClient) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # no loop has used it yet, so it holds no connections
+    _retiring[client] = loop.create_task(_close_later(client, get_settings().http_timeout_seconds))
+
+
+async def _close_later(client: httpx.AsyncClient, delay: float) -> None:
+    await asyncio.sleep(delay)
+    _retiring.pop(client, None)
+    await _close(client)
+
+
+async def _close(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.warning("http.client.close_failed", error=str(e))
+
+
+def set_transport_factory(factory: Callable[[], httpx.AsyncBaseTransport] | None) -> None:
+    """Route newly created clients through a custom transport (None restores the network)."""
+    global _transport_factory
+    _transport_factory = factory
+
+
+async def close_http_clients() -> None:
+    clients = [*_clients.values(), *_retiring]
+    for task in _retiring.values():
+        task.cancel()
+    _clients.clear()
+    _retiring.clear()
+    for client in clients:
+        await _close(client)
+
+
+# ─── Conditional requests ────────────────────────────────────────────────────
+
+async def conditional_get(url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+    """
+    GET url, revalidating against the validators stored by remember_validators().
+    Callers treat status 304 as "unchanged since last processed".
+    """
+    request_headers = dict(headers or {})
+    try:
+        redis = await get_redis()
+        validators = await redis.hgetall(f"{VALIDATORS_PREFIX}{url}")
+    except Exception as e:
+        logger.debug("http.validators.unavailable", url=url, error=str(e))
+        validators = {}
+    if etag := validators.get("etag"):
+        request_headers["If-None-Match"] = etag
+    if last_modified := validators.get("last_modified"):
+        request_headers["If-Modified-Since"] = last_modified
+    return await get_http_client(url).get(url, headers=request_headers)
+
+
+async def remember_validators(url: str, response: httpx.Response) -> None:
+    """
+    Store response's ETag / Last-Modified for the next conditional_get(url). Call it
+    only once the response has been processed, so a failed run refetches the body.
+    """
+    validators: dict[str | bytes, str] = {
+        field: value
+        for field, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if (value := response.headers.get(header))
+    }
+    key = f"{VALIDATORS_PREFIX}{url}"
+    try:
+        redis = await get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if validators:
+                pipe.hset(key, mapping=validators)
+                pipe.expire(key, VALIDATORS_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.debug("http.validators.store_failed", url=url, error=str(e))
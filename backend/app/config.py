@@ -41,6 +41,55 @@ class Settings(BaseSettings):
     github_webhook_secret: str = "dev-webhook-secret"
     github_token: str = ""
     ado_webhook_secret: str = "dev-ado-secret"
+    # Debounce window per entity for webhook-triggered ingestion (0 dispatches every event)
+    ingestion_coalesce_window_seconds: int = 10
+
+    # Ingestion event bus (per-source Redis streams, see app.modules.ingestion.bus)
+    ingestion_bus_stream_maxlen: int = 50_000
+    ingestion_bus_batch_size: int = 50
+    # Events dispatched per second per source, shared by every consumer (not per
+    # replica); overrides keyed by source name
+    ingestion_bus_rate_per_second: float = 20.0
+    ingestion_bus_source_rates: dict[str, float] = {}
+    # Consumers pause while the Celery queue holds more tasks than this
+    ingestion_bus_max_queue_depth: int = 500
+    ingestion_bus_claim_idle_ms: int = 60_000
+    ingestion_bus_max_deliveries: int = 5
+
+    # Nightly full-org catalog sync (see app.modules.ingestion.org_sync)
+    github_sync_orgs: list[str] = []
+    github_org_sync_concurrency: int = 8
+    github_org_sync_requests_per_second: float = 10.0
+    # Pause when GitHub's remaining REST budget drops to this, until its reset time
+    github_rate_limit_reserve: int = 100
+
+    # Location targets in catalog-info.yaml (monorepos): parallel fetches, files per repo
+    catalog_location_concurrency: int = 8
+    catalog_max_location_files: int = 200
+
+    # Search ranking (BM25 field boosts and whole-name bonuses)
+    search_name_boost: float = 3.0
+    search_tag_boost: float = 2.0
+    search_description_boost: float = 1.0
+    search_exact_name_bonus: float = 5.0
+    search_name_prefix_bonus: float = 2.0
+
+    # Search index sync (catalog:changes stream + periodic full rebuild)
+    search_change_stream_maxlen: int = 100_000
+    search_reconcile_interval_seconds: int = 900
+    # Empty disables snapshots (every start does a full catalog scan). /tmp is private to
+    # each container: use a volume shared by the replicas so a new one can start from it
+    search_snapshot_path: str = "/tmp/nexus/search-index.snap"
+    # Lifetime of a cached ranked result set that search cursors page through
+    search_result_ttl_seconds: int = 120
+
+    # Outbound HTTP (shared per-host pools, see app.clients.http_client)
+    http_timeout_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http_max_connections_per_host: int = 20
+    http_keepalive_expiry_seconds: float = 60.0
+    # Origins with a pooled client; the least recently used is closed beyond this
+    http_max_pooled_origins: int = 64
 
     # Azure Web PubSub (Phase 1 — real-time updates)
     webpubsub_connection_string: str = ""
@@ -1,6 +1,6 @@
-from typing import Annotated
+from typing import Annotated, Any
 from fastapi import Depends, Header, Request
-from app.core.exceptions import AuthenticationError
+from app.core.exceptions import AuthenticationError, AuthorizationError
 from app.core.security import decode_token, extract_user
 from app.config import Settings, get_settings
 
@@ -30,6 +30,15 @@ async def get_optional_user(
         return None
 
 
+async def require_admin(
+    user: Annotated[dict[str, Any], Depends(get_current_user)],
+) -> dict[str, Any]:
+    if user.get("role") != "Admin":
+        raise AuthorizationError("This operation requires the Admin role.")
+    return user
+
+
 CurrentUser = Annotated[dict, Depends(get_current_user)]
+AdminUser = Annotated[dict[str, Any], Depends(require_admin)]
 OptionalUser = Annotated[dict | None, Depends(get_optional_user)]
 AppSettings = Annotated[Settings, Depends(get_settings)]
@@ -23,7 +23,10 @@ from app.modules.actions.router import router as actions_router
 from app.modules.ops.router import router as ops_router
 from app.modules.scorecards.router import router as scorecards_router
 from app.modules.actions.seeds import seed_built_in_actions
+from app.modules.search.events import SearchIndexSync
+from app.modules.ingestion.bus import IngestionBus
 from app.clients.redis_client import close_redis
+from app.clients.http_client import close_http_clients
 
 
 def configure_logging() -> None:
@@ -46,7 +49,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     configure_logging()
     structlog.get_logger().info("nexus.startup", environment=get_settings().environment)
     await seed_built_in_actions()
+    # Builds the in-process search index, then tails catalog change events
+    search_sync = SearchIndexSync()
+    await search_sync.start()
+    # Drains webhook events from the ingestion streams into Celery
+    ingestion_bus = IngestionBus()
+    await ingestion_bus.start()
     yield
+    await ingestion_bus.stop()
+    await search_sync.stop()
+    await close_http_clients()
     await close_redis()
     structlog.get_logger().info("nexus.shutdown")
 
@@ -12,6 +12,7 @@ from datetime import datetime, timezone, timedelta
 
 import structlog
 
+from app.clients.http_client import get_http_client
 from app.core.exceptions import AuthorizationError, NotFoundError, ValidationError
 from app.modules.actions.models import (
     ActionExecution,
@@ -260,7 +261,6 @@ class ActionService:
 
 async def _dispatch_ado_pipeline(config: dict, params: dict) -> str:
     """Trigger an Azure DevOps pipeline run."""
-    import httpx
     org = config.get("organization", "")
     project = config.get("project", "")
     pipeline_id = config.get("pipeline_id", "")
@@ -272,20 +272,18 @@ async def _dispatch_ado_pipeline(config: dict, params: dict) -> str:
     url = f"https://dev.azure.com/{org}/{project}/_apis/pipelines/{pipeline_id}/runs?api-version=7.1"
     body = {"templateParameters": params}
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            url,
-            json=body,
-            headers={"Authorization": f"Basic {pat}", "Content-Type": "application/json"},
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        return str(data.get("id", ""))
+    resp = await get_http_client(url).post(
+        url,
+        json=body,
+        headers={"Authorization": f"Basic {pat}", "Content-Type": "application/json"},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return str(data.get("id", ""))
 
 
 async def _dispatch_github_actions(config: dict, params: dict) -> str:
     """Trigger a GitHub Actions workflow_dispatch."""
-    import httpx
     owner = config.get("owner", "")
     repo = config.get("repo", "")
     workflow_id = config.get("workflow_id", "")
@@ -298,23 +296,21 @@ async def _dispatch_github_actions(config: dict, params: dict) -> str:
     url = f"https://api.github.com/repos/{owner}/{repo}/actions/workflows/{workflow_id}/dispatches"
     body = {"ref": ref, "inputs": params}
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(
-            url,
-            json=body,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
-        )
-        resp.raise_for_status()
-        return f"gh-{owner}/{repo}/{workflow_id}"
+    resp = await get_http_client(url).post(
+        url,
+        json=body,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        },
+    )
+    resp.raise_for_status()
+    return f"gh-{owner}/{repo}/{workflow_id}"
 
 
 async def _dispatch_http_webhook(config: dict, params: dict, execution: ActionExecution) -> str:
     """POST to an arbitrary HTTP webhook."""
-    import httpx
     url = config.get("url", "")
     if not url:
         raise ValueError("HTTP webhook executor requires url")
@@ -327,10 +323,9 @@ async def _dispatch_http_webhook(config: dict, params: dict, execution: ActionEx
         "parameters": params,
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(url, json=payload, headers=headers)
-        resp.raise_for_status()
-        return execution.id
+    resp = await get_http_client(url).post(url, json=payload, headers=headers)
+    resp.raise_for_status()
+    return execution.id
 
 
 async def _dispatch_azure_function(config: dict, params: dict, execution: ActionExecution) -> str:
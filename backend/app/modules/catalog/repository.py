@@ -1,9 +1,13 @@
+import builtins
 import json
 from typing import Any
 import structlog
 from app.clients.cosmos_gremlin import execute_query
 from app.clients.redis_client import get_redis
 from app.modules.catalog.models import ServiceCreate, ServiceEntity, ServiceUpdate
+from app.modules.entities.repository import BULK_CHUNK_SIZE, bulk_upsert
+from app.modules.relationships.repository import RelationshipRepository
+from app.modules.search.events import publish_change
 import uuid
 from datetime import datetime, timezone
 
@@ -94,8 +98,12 @@ class ServiceRepository:
         await redis.setex(cache_key, CACHE_TTL, entity.model_dump_json())
         return entity
 
-    async def create(self, data: ServiceCreate) -> ServiceEntity:
-        entity = ServiceEntity(**data.model_dump())
+    async def create(self, data: ServiceCreate, service_id: str | None = None) -> ServiceEntity:
+        """Create a service; ingestion passes make_deterministic_id(repository_url)."""
+        fields = data.model_dump()
+        if service_id:
+            fields["id"] = service_id
+        entity = ServiceEntity(**fields)
         now = _utcnow()
         tags_json = json.dumps(entity.tags)
 
@@ -126,6 +134,7 @@ class ServiceRepository:
                 "updated_at": now,
             },
         )
+        await publish_change("Service", entity.id, entity)
         return entity
 
     async def update(self, service_id: str, data: ServiceUpdate) -> ServiceEntity | None:
@@ -161,16 +170,62 @@ class ServiceRepository:
         )
         redis = await get_redis()
         await redis.delete(f"catalog:service:{service_id}")
-        return ServiceEntity(**{**existing.model_dump(), **data.model_dump(), "updated_at": datetime.fromisoformat(now)})
+        entity = ServiceEntity(
+            **{
+                **existing.model_dump(),
+                **data.model_dump(),
+                "updated_at": datetime.fromisoformat(now),
+            }
+        )
+        await publish_change("Service", entity.id, entity)
+        return entity
+
+    async def upsert(self, service_id: str, data: ServiceCreate) -> tuple[ServiceEntity, bool]:
+        """
+        Create or update the service with this id in one fold/coalesce traversal, so
+        repeated ingestion of a repo cannot create a duplicate. Returns (entity, created).
+        """
+        existing = await self.get(service_id)
+        prior = {service_id: existing} if existing else None
+        [entity] = await self.upsert_many([(service_id, data)], existing=prior)
+        return entity, existing is None
+
+    async def upsert_many(
+        self,
+        items: builtins.list[tuple[str, ServiceCreate]],
+        existing: dict[str, ServiceEntity] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> builtins.list[ServiceEntity]:
+        """
+        Create-or-update services with caller-chosen ids (see bulk_upsert); pass
+        `existing` to keep created_at accurate on the returned entities.
+        """
+        existing = existing or {}
+
+        def build(service_id: str, data: ServiceCreate, now: str) -> ServiceEntity:
+            prior = existing.get(service_id)
+            return ServiceEntity(
+                id=service_id,
+                **data.model_dump(),
+                created_at=prior.created_at if prior else datetime.fromisoformat(now),
+                updated_at=datetime.fromisoformat(now),
+            )
+
+        return await bulk_upsert(
+            "Service",
+            items,
+            lambda data: {**data.model_dump(), "tags": json.dumps(data.tags)},
+            build,
+            "catalog:service:",
+            chunk_size,
+        )
 
     async def delete(self, service_id: str) -> bool:
         existing = await self.get(service_id)
         if not existing:
             return False
-        execute_query(
-            "g.V().hasLabel('Service').has('id', %(id)s).drop()",
-            {"id": service_id},
-        )
+        await RelationshipRepository().drop_vertex("Service", service_id)
         redis = await get_redis()
         await redis.delete(f"catalog:service:{service_id}")
+        await publish_change("Service", service_id)
         return True
@@ -1,6 +1,9 @@
+import builtins
 import json
 import uuid
+import types
 import typing
+from collections.abc import Callable, Sequence
 from datetime import datetime, timezone
 from typing import Any, Generic, TypeVar, Type
 
@@ -9,11 +12,16 @@ from pydantic import BaseModel
 
 from app.clients.cosmos_gremlin import execute_query
 from app.clients.redis_client import get_redis
+from app.modules.relationships.repository import RelationshipRepository
+from app.modules.search.events import publish_change, publish_changes
 
 logger = structlog.get_logger()
 CACHE_TTL = 30
+# Vertices per bulk lookup / upsert query
+BULK_CHUNK_SIZE = 100
 
 T = TypeVar("T", bound=BaseModel)
+M = TypeVar("M", bound=BaseModel)
 
 
 def _utcnow() -> str:
@@ -38,11 +46,15 @@ def _gremlin_prop(props: dict, key: str, default: Any = "") -> Any:
     return default
 
 
+def _is_union(annotation: Any) -> bool:
+    # Optional[X] and X | None have different origins
+    return typing.get_origin(annotation) in (typing.Union, types.UnionType)
+
+
 def _is_list_annotation(annotation: Any) -> bool:
-    origin = typing.get_origin(annotation)
-    if origin is list:
+    if typing.get_origin(annotation) is list:
         return True
-    if origin is typing.Union:
+    if _is_union(annotation):
         return any(typing.get_origin(a) is list for a in typing.get_args(annotation))
     return False
 
@@ -50,11 +62,53 @@ def _is_list_annotation(annotation: Any) -> bool:
 def _is_datetime_annotation(annotation: Any) -> bool:
     if annotation is datetime:
         return True
-    if typing.get_origin(annotation) is typing.Union:
+    if _is_union(annotation):
         return datetime in typing.get_args(annotation)
     return False
 
 
+async def bulk_upsert(
+    label: str,
+    items: Sequence[tuple[str, M]],
+    properties: Callable[[M], dict[str, Any]],
+    build: Callable[[str, M, str], T],
+    cache_prefix: str,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> list[T]:
+    """
+    Create-or-update `label` vertices with caller-chosen ids, one query per chunk
+    (fold/coalesce upsert per vertex inside a union); created_at is only set on insert.
+    `properties` gives a model's vertex properties, `build` the entity for (id, model,
+    now). Cached copies (`{cache_prefix}{id}`) are dropped and each chunk's changes
+    published as one batch.
+    """
+    now = _utcnow()
+    entities: list[T] = []
+    redis = await get_redis()
+
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        parts: list[str] = []
+        params: dict[str, Any] = {"now": now}
+        for i, (eid, data) in enumerate(chunk):
+            props = {**properties(data), "updated_at": now}
+            params[f"id{i}"] = eid
+            params.update({f"p{i}_{k}": v for k, v in props.items()})
+            prop_str = "".join(f".property('{k}', %(p{i}_{k})s)" for k in props)
+            parts.append(
+                f"__.V().hasLabel('{label}').has('id', %(id{i})s).fold()"
+                f".coalesce(unfold(), addV('{label}').property('id', %(id{i})s)"
+                f".property('created_at', %(now)s)){prop_str}"
+            )
+        execute_query(f"g.inject(0).union({', '.join(parts)})", params)
+        await redis.delete(*(f"{cache_prefix}{eid}" for eid, _ in chunk))
+
+        changes = [(eid, build(eid, data, now)) for eid, data in chunk]
+        entities.extend(entity for _, entity in changes)
+        await publish_changes(label, changes)
+    return entities
+
+
 class EntityRepository(Generic[T]):
     def __init__(self, label: str, entity_class: Type[T]) -> None:
         self.label = label
@@ -85,9 +139,14 @@ class EntityRepository(Generic[T]):
                         fields[field_name] = None
                 else:
                     fields[field_name] = None
+            elif raw != "":
+                fields[field_name] = raw
             else:
-                default = field_info.default
-                fields[field_name] = raw if raw != "" else (default if default is not None else "")
+                # Unset properties are stored as "" — read them back as the field default
+                required = field_info.is_required()
+                fields[field_name] = (
+                    "" if required else field_info.get_default(call_default_factory=True)
+                )
 
         return self.entity_class(**fields)
 
@@ -130,8 +189,9 @@ class EntityRepository(Generic[T]):
         await redis.setex(cache_key, CACHE_TTL, entity.model_dump_json())
         return entity
 
-    async def create(self, data: BaseModel) -> T:
-        eid = str(uuid.uuid4())
+    async def create(self, data: BaseModel, entity_id: str | None = None) -> T:
+        """Create a vertex; ingestion passes an id derived from the source's natural key."""
+        eid = entity_id or str(uuid.uuid4())
         now = _utcnow()
         props = data.model_dump()
         props["id"] = eid
@@ -147,7 +207,9 @@ class EntityRepository(Generic[T]):
         entity_data["id"] = eid
         entity_data["created_at"] = now
         entity_data["updated_at"] = now
-        return self.entity_class(**entity_data)
+        entity = self.entity_class(**entity_data)
+        await publish_change(self.label, eid, entity)
+        return entity
 
     async def update(self, entity_id: str, data: BaseModel) -> T | None:
         existing = await self.get(entity_id)
@@ -172,21 +234,79 @@ class EntityRepository(Generic[T]):
         updated = existing.model_dump()
         updated.update(data.model_dump())
         updated["updated_at"] = now
-        return self.entity_class(**updated)
+        entity = self.entity_class(**updated)
+        await publish_change(self.label, entity_id, entity)
+        return entity
 
     async def delete(self, entity_id: str) -> bool:
         existing = await self.get(entity_id)
         if not existing:
             return False
-        execute_query(
-            f"g.V().hasLabel('{self.label}').has('id', %(id)s).drop()",
-            {"id": entity_id},
-        )
+        await RelationshipRepository().drop_vertex(self.label, entity_id)
         redis = await get_redis()
         await redis.delete(f"catalog:{self.label}:{entity_id}")
+        await publish_change(self.label, entity_id)
         return True
 
-    async def find_by_field(self, field: str, value: str, limit: int = 25) -> list[T]:
+    async def get_many(
+        self, entity_ids: builtins.list[str], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> dict[str, T]:
+        """Bulk lookup by id, one `within` query per chunk; missing ids are left out."""
+        found: dict[str, T] = {}
+        unique = list(dict.fromkeys(entity_ids))
+        for start in range(0, len(unique), chunk_size):
+            results = execute_query(
+                f"g.V().hasLabel('{self.label}').has('id', within(%(ids)s))",
+                {"ids": unique[start:start + chunk_size]},
+            )
+            for v in results:
+                found[v["id"]] = self._vertex_to_entity(v)
+        return found
+
+    async def upsert_many(
+        self,
+        items: Sequence[tuple[str, BaseModel]],
+        existing: dict[str, T] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> builtins.list[T]:
+        """
+        Create-or-update vertices with caller-chosen ids (see bulk_upsert); pass
+        `existing` to keep created_at accurate on the returned entities.
+        """
+        existing = existing or {}
+
+        def build(eid: str, data: BaseModel, now: str) -> T:
+            prior = existing.get(eid)
+            return self.entity_class(
+                **{
+                    **data.model_dump(),
+                    "id": eid,
+                    "created_at": getattr(prior, "created_at", None) or now,
+                    "updated_at": now,
+                }
+            )
+
+        return await bulk_upsert(
+            self.label,
+            items,
+            lambda data: {k: _serialize_prop(v) for k, v in data.model_dump().items()},
+            build,
+            f"catalog:{self.label}:",
+            chunk_size,
+        )
+
+    async def upsert(self, entity_id: str, data: BaseModel) -> tuple[T, bool]:
+        """
+        Create or update the vertex with this id in one fold/coalesce traversal, so
+        redelivered or concurrent ingestion of the same source record cannot create
+        a duplicate. Returns (entity, created).
+        """
+        existing = await self.get(entity_id)
+        prior = {entity_id: existing} if existing else None
+        [entity] = await self.upsert_many([(entity_id, data)], existing=prior)
+        return entity, existing is None
+
+    async def find_by_field(self, field: str, value: str, limit: int = 25) -> builtins.list[T]:
         """Find entities where a specific property matches a value."""
         results = execute_query(
             f"g.V().hasLabel('{self.label}').has(%(field)s, %(value)s).limit(%(limit)s)",
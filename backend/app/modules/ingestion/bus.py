@@ -0,0 +1,335 @@
+"""
+Ingestion event bus on Redis Streams.
+
+Webhook handlers append events to one stream per source (`ingest:events:{source}`)
+and return; IngestionBus consumers — one per API worker, all in the `ingestion`
+consumer group — drain the streams and hand each event to the coalescing dispatcher
+(see ingestion.coalesce), which queues the Celery task.
+
+  fairness      sources are read round-robin, each held to its own rate across every
+                consumer (a Redis counter per source and window, see SourceRateLimit),
+                so a push storm from one GitHub org cannot starve PagerDuty
+  backpressure  while the Celery queue is deeper than ingestion_bus_max_queue_depth,
+                consumers stop reading and events wait durably in the streams
+  delivery      entries are XACKed only once dispatched; entries left pending by a
+                crashed or failing consumer are reclaimed (XAUTOCLAIM) after
+                ingestion_bus_claim_idle_ms, and after ingestion_bus_max_deliveries
+                attempts are recorded in the ingestion dead-letter store (see
+                ingestion.dead_letters); replaying them appends them here again
+"""
+import asyncio
+import contextlib
+import json
+import math
+import os
+import socket
+import time
+from collections.abc import Callable
+from typing import Any
+
+import redis.asyncio as aioredis
+import structlog
+from celery import Task
+from redis.exceptions import ResponseError
+
+from app.clients.redis_client import get_redis
+from app.config import get_settings
+from app.modules.ingestion.coalesce import coalesce
+from app.workers.celery_app import celery_app
+
+logger = structlog.get_logger()
+
+SOURCES = ("github", "ado", "pagerduty", "opsgenie")
+STREAM_PREFIX = "ingest:events:"
+RATE_PREFIX = "ingest:rate:"
+GROUP = "ingestion"
+IDLE_SLEEP_SECONDS = 0.5
+
+class DeliveryError(Exception):
+    """Why the bus gave up on an event; recorded as its dead letter's exception."""
+
+
+# (stream entry id, fields) — fields is None for an entry trimmed while pending
+Entry = tuple[str, dict[str, str] | None]
+
+
+def stream_key(source: str) -> str:
+    return f"{STREAM_PREFIX}{source}"
+
+
+async def publish(source: str, task: Task, key: str, *args: Any) -> None:
+    """
+    Append an event for task(*args) about entity `key`. If the stream cannot be
+    written the event goes straight to the dispatcher instead of being lost.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown ingestion source {source!r}")
+    try:
+        await _append(source, task.name, key, list(args))
+    except Exception as e:
+        logger.warning(
+            "ingestion.bus.publish_failed", source=source, task=task.name, error=str(e)
+        )
+        await coalesce(task, key, *args)
+
+
+async def requeue(source: str, task_name: str, key: str, args: list[Any]) -> None:
+    """Append a dead-lettered event to its source stream again; raises if Redis is down."""
+    await _append(source, task_name, key, args)
+
+
+async def _append(source: str, task_name: str, key: str, args: list[Any]) -> None:
+    fields = {
+        "task": task_name,
+        "key": key,
+        "args": json.dumps(args),
+        "received_at": f"{time.time():.3f}",
+    }
+    redis = await get_redis()
+    await redis.xadd(
+        stream_key(source),
+        fields,
+        maxlen=get_settings().ingestion_bus_stream_maxlen,
+        approximate=True,
+    )
+
+
+async def dispatch(fields: dict[str, str]) -> None:
+    task = celery_app.tasks[fields["task"]]
+    await coalesce(task, fields["key"], *json.loads(fields["args"]))
+
+
+# ─── Rate limiting ────────────────────────────────────────────────────────────
+
+class SourceRateLimit:
+    """
+    Cluster-wide dispatch rate for one source: every consumer draws from a shared Redis
+    counter per fixed window (`ingest:rate:{source}:{window}`), so the configured rate
+    holds however many API replicas run. A window is one second, or 1/rate seconds for
+    rates below one event per second.
+    """
+
+    def __init__(
+        self, source: str, rate: float, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.source = source
+        self.window = 1.0 if rate >= 1 else math.ceil(1 / rate)
+        self.allowance = max(1, int(rate * self.window))
+        self._clock = clock
+        self._key = ""
+
+    async def take(self, wanted: int) -> int:
+        """Grant up to `wanted` dispatches from the current window."""
+        self._key = f"{RATE_PREFIX}{self.source}:{int(self._clock() // self.window)}"
+        redis = await get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incrby(self._key, wanted)
+            pipe.expire(self._key, int(self.window) + 1)
+            used, _ = await pipe.execute()
+        granted = max(0, min(wanted, self.allowance - (int(used) - wanted)))
+        if granted < wanted:
+            await redis.decrby(self._key, wanted - granted)
+        return granted
+
+    async def refund(self, unused: int) -> None:
+        """Return dispatches granted by the last take() that found no events."""
+        if unused > 0:
+            redis = await get_redis()
+            await redis.decrby(self._key, unused)
+
+
+# ─── Consumer ─────────────────────────────────────────────────────────────────
+
+class IngestionBus:
+    def __init__(
+        self,
+        consumer: str | None = None,
+        queue_depth: Callable[[], Any] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        settings = get_settings()
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = settings.ingestion_bus_batch_size
+        self.claim_idle_ms = settings.ingestion_bus_claim_idle_ms
+        self.max_deliveries = settings.ingestion_bus_max_deliveries
+        self.max_queue_depth = settings.ingestion_bus_max_queue_depth
+        rates = settings.ingestion_bus_source_rates
+        default_rate = settings.ingestion_bus_rate_per_second
+        self.limits = {
+            source: SourceRateLimit(source, rates.get(source, default_rate), clock)
+            for source in SOURCES
+        }
+        self._queue_depth = queue_depth or self._celery_queue_depth
+        self._claim_cursor = dict.fromkeys(SOURCES, "0-0")
+        self._rotation = 0
+        self._broker: aioredis.Redis[str] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def ensure_groups(self) -> None:
+        redis = await get_redis()
+        for source in SOURCES:
+            try:
+                await redis.xgroup_create(stream_key(source), GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def start(self) -> None:
+        try:
+            await self.ensure_groups()
+        except Exception as e:
+            logger.warning("ingestion.bus.group_setup_failed", error=str(e))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._broker is not None:
+            await self._broker.connection_pool.disconnect()
+            self._broker = None
+
+    async def poll_once(self) -> int:
+        """Dispatch one round of events across all sources; returns how many were handled."""
+        depth = await self._queue_depth()
+        if depth > self.max_queue_depth:
+            logger.debug("ingestion.bus.backpressure", queue_depth=depth)
+            return 0
+
+        order = SOURCES[self._rotation:] + SOURCES[:self._rotation]
+        self._rotation = (self._rotation + 1) % len(SOURCES)
+        handled = 0
+        for source in order:
+            budget = await self.limits[source].take(self.batch_size)
+            if not budget:
+                continue
+            entries = await self._reclaim(source, budget)
+            if len(entries) < budget:
+                entries += await self._read_new(source, budget - len(entries))
+            await self.limits[source].refund(budget - len(entries))
+            handled += await self._process(source, entries)
+        return handled
+
+    async def _reclaim(self, source: str, count: int) -> list[Entry]:
+        """Take over entries another consumer (or an earlier attempt) left unacknowledged."""
+        redis = await get_redis()
+        stream = stream_key(source)
+        cursor, claimed, *_ = await redis.xautoclaim(
+            stream, GROUP, self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id=self._claim_cursor[source],
+            count=count,
+        )
+        self._claim_cursor[source] = str(cursor)
+        if not claimed:
+            return []
+
+        # One exact lookup per claimed id: a range query could return other entries
+        # this consumer has pending and crowd claimed ones out of the count
+        async with redis.pipeline(transaction=False) as pipe:
+            for entry_id, _ in claimed:
+                pipe.xpending_range(stream, GROUP, min=entry_id, max=entry_id, count=1)
+            pending = await pipe.execute()
+        deliveries = {str(p["message_id"]): p["times_delivered"] for rows in pending for p in rows}
+        live: list[Entry] = []
+        for entry_id, fields in claimed:
+            delivered = deliveries.get(str(entry_id), 0)
+            if delivered > self.max_deliveries:
+                await self._dead_letter(
+                    source, str(entry_id), fields, "max deliveries exceeded", delivered - 1
+                )
+            else:
+                live.append((str(entry_id), fields))
+        return live
+
+    async def _read_new(self, source: str, count: int) -> list[Entry]:
+        redis = await get_redis()
+        batches = await redis.xreadgroup(
+            GROUP, self.consumer, {stream_key(source): ">"}, count=count
+        )
+        return [
+            (str(entry_id), fields)
+            for _stream, entries in batches or []
+            for entry_id, fields in entries
+        ]
+
+    async def _process(self, source: str, entries: list[Entry]) -> int:
+        if not entries:
+            return 0
+        acked: list[str] = []
+        for entry_id, fields in entries:
+            if not fields:
+                # Trimmed from the stream while pending — nothing left to dispatch
+                acked.append(entry_id)
+                continue
+            if fields.get("task") not in celery_app.tasks:
+                reason = f"unknown task {fields.get('task')!r}"
+                await self._dead_letter(source, entry_id, fields, reason, 1)
+                continue
+            try:
+                await dispatch(fields)
+            except Exception as e:
+                # Left pending; reclaimed and retried after claim_idle_ms
+                logger.warning(
+                    "ingestion.bus.dispatch_failed", source=source, id=entry_id, error=str(e)
+                )
+                continue
+            acked.append(entry_id)
+        if acked:
+            redis = await get_redis()
+            await redis.xack(stream_key(source), GROUP, *acked)  # type: ignore[no-untyped-call]
+        logger.debug(
+            "ingestion.bus.batch", source=source, events=len(entries), acked=len(acked)
+        )
+        return len(entries)
+
+    async def _dead_letter(
+        self,
+        source: str,
+        entry_id: str,
+        fields: dict[str, str] | None,
+        reason: str,
+        attempts: int,
+    ) -> None:
+        # dead_letters imports SOURCES from this module
+        from app.modules.ingestion.dead_letters import dead_letter
+
+        if fields:
+            await dead_letter(
+                fields.get("task", ""),
+                source,
+                json.loads(fields.get("args", "[]")),
+                {},
+                DeliveryError(reason),
+                attempts,
+                key=fields.get("key"),
+            )
+        redis = await get_redis()
+        await redis.xack(stream_key(source), GROUP, entry_id)  # type: ignore[no-untyped-call]
+        logger.warning("ingestion.bus.dead_lettered", source=source, id=entry_id, reason=reason)
+
+    async def _celery_queue_depth(self) -> int:
+        """Length of the default Celery queue; 0 if the broker is not Redis or unreachable."""
+        broker_url = get_settings().celery_broker_url
+        if not broker_url.startswith(("redis://", "rediss://")):
+            return 0
+        try:
+            if self._broker is None:
+                self._broker = aioredis.from_url(broker_url, decode_responses=True)
+            return int(await self._broker.llen(celery_app.conf.task_default_queue))
+        except Exception as e:
+            logger.debug("ingestion.bus.queue_depth_unavailable", error=str(e))
+            return 0
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if not await self.poll_once():
+                    await asyncio.sleep(IDLE_SLEEP_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("ingestion.bus.consume_error", error=str(e))
+                await asyncio.sleep(5)
@@ -1,5 +1,9 @@
 import re
 import uuid
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urljoin, urlsplit
+
 import yaml
 import structlog
 from app.modules.catalog.models import ServiceCreate
@@ -8,48 +12,129 @@ logger = structlog.get_logger()
 
 VALID_STATUSES = {"active", "deprecated", "experimental"}
 VALID_LIFECYCLES = {"production", "staging", "development", "end-of-life"}
+GITHUB_BLOB_RE = re.compile(r"^https://github\.com/([^/]+)/([^/]+)/(?:blob|tree)/(.+)$")
 
 
-def parse_catalog_info(content: str, repo_url: str = "") -> ServiceCreate | None:
-    """Parse catalog-info.yaml content into a ServiceCreate model."""
+@dataclass(slots=True)
+class CatalogDocuments:
+    """Everything a catalog-info file declares: components, and Location targets to follow."""
+    components: list[ServiceCreate] = field(default_factory=list)
+    targets: list[str] = field(default_factory=list)
+    skipped_kinds: dict[str, int] = field(default_factory=dict)   # kind → documents ignored
+
+
+def _component_from_doc(doc: dict[str, Any], repo_url: str) -> ServiceCreate | None:
+    metadata = doc.get("metadata") or {}
+    spec = doc.get("spec") or {}
+
+    name = metadata.get("name", "")
+    if not name:
+        logger.warning("catalog_parser.missing_name")
+        return None
+
+    status = spec.get("status", "active")
+    if status not in VALID_STATUSES:
+        status = "active"
+
+    lifecycle = spec.get("lifecycle", "development")
+    if lifecycle not in VALID_LIFECYCLES:
+        lifecycle = "development"
+
+    return ServiceCreate(
+        name=name,
+        description=metadata.get("description", ""),
+        team=spec.get("owner", ""),
+        status=status,
+        lifecycle=lifecycle,
+        repository_url=repo_url,
+        runbook_url=spec.get("runbookUrl", ""),
+        tags=metadata.get("tags", []),
+    )
+
+
+def parse_catalog_documents(content: str, repo_url: str = "") -> CatalogDocuments:
+    """
+    Parse a (possibly multi-document) catalog-info file. Component documents — and
+    documents without a kind, for older single-document files — become services;
+    Location documents contribute their spec.target / spec.targets. Other kinds are
+    not ingested and are counted in skipped_kinds. A YAML error keeps the documents
+    before it.
+    """
+    parsed = CatalogDocuments()
     try:
-        doc = yaml.safe_load(content)
-        if not isinstance(doc, dict):
-            logger.warning("catalog_parser.invalid_yaml")
-            return None
-
-        metadata = doc.get("metadata", {})
-        spec = doc.get("spec", {})
-
-        name = metadata.get("name", "")
-        if not name:
-            logger.warning("catalog_parser.missing_name")
-            return None
-
-        status = spec.get("status", "active")
-        if status not in VALID_STATUSES:
-            status = "active"
-
-        lifecycle = spec.get("lifecycle", "development")
-        if lifecycle not in VALID_LIFECYCLES:
-            lifecycle = "development"
-
-        return ServiceCreate(
-            name=name,
-            description=metadata.get("description", ""),
-            team=spec.get("owner", ""),
-            status=status,
-            lifecycle=lifecycle,
-            repository_url=repo_url,
-            runbook_url=spec.get("runbookUrl", ""),
-            tags=metadata.get("tags", []),
-        )
+        for doc in yaml.safe_load_all(content):
+            if not isinstance(doc, dict):
+                if doc is not None:
+                    logger.warning("catalog_parser.invalid_yaml")
+                continue
+            kind = doc.get("kind", "Component")
+            if kind == "Component":
+                if component := _component_from_doc(doc, repo_url):
+                    parsed.components.append(component)
+            elif kind == "Location":
+                spec = doc.get("spec") or {}
+                targets = [spec.get("target")] + list(spec.get("targets") or [])
+                parsed.targets.extend(t for t in targets if isinstance(t, str) and t)
+            else:
+                kind = str(kind)
+                parsed.skipped_kinds[kind] = parsed.skipped_kinds.get(kind, 0) + 1
     except yaml.YAMLError as e:
         logger.warning("catalog_parser.yaml_error", error=str(e))
+    return parsed
+
+
+def parse_catalog_info(content: str, repo_url: str = "") -> ServiceCreate | None:
+    """Parse catalog-info.yaml content into a ServiceCreate model (its first component)."""
+    components = parse_catalog_documents(content, repo_url).components
+    if not components:
         return None
+    return components[0]
 
 
 def make_deterministic_id(repo_url: str) -> str:
     """UUID v5 deterministic ID based on repo URL."""
     namespace = uuid.UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8")  # URL namespace
     return str(uuid.uuid5(namespace, repo_url))
+
+
+def catalog_info_url(repo_url: str) -> str:
+    """Where a repo's catalog-info.yaml is fetched from (raw content on the default branch)."""
+    url = repo_url.rstrip("/")
+    if "github.com" in url:
+        url = url.replace("https://github.com", "https://raw.githubusercontent.com")
+        return f"{url}/HEAD/catalog-info.yaml"
+    return f"{url}/catalog-info.yaml"
+
+
+def catalog_root_prefix(repo_url: str) -> str:
+    """URL prefix of every catalog file in the repo; Location targets must stay under it."""
+    url = repo_url.rstrip("/")
+    if "github.com" in url:
+        return catalog_info_url(url).removesuffix("HEAD/catalog-info.yaml")
+    return f"{url}/"
+
+
+def resolve_location_target(base_url: str, target: str, repo_url: str) -> str | None:
+    """
+    Absolute URL for a Location target declared in the file at base_url: relative
+    paths resolve against that file, github.com blob/tree URLs map to raw content.
+    Globs, and targets outside the repo, return None.
+    """
+    target = target.strip()
+    if not target or any(c in target for c in "*?["):
+        return None
+    if match := GITHUB_BLOB_RE.match(target):
+        owner, repo, path = match.groups()
+        target = f"https://raw.githubusercontent.com/{owner}/{repo}/{path}"
+    resolved = urljoin(base_url, target)
+    if urlsplit(resolved).fragment or not resolved.startswith(catalog_root_prefix(repo_url)):
+        return None
+    return resolved
+
+
+def component_id(repo_url: str, name: str, primary: bool) -> str:
+    """
+    The repo's primary component (first in its root catalog-info.yaml) keeps the
+    repo-level id that SBOM edges attach to; other components get repo_url#name.
+    """
+    return make_deterministic_id(repo_url if primary else f"{repo_url}#{name}")
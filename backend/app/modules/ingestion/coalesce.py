@@ -0,0 +1,96 @@
+"""
+Debounced dispatch of ingestion tasks.
+
+Webhook sources burst: a busy repo pushes several times a minute and PagerDuty sends
+an update per incident state change, but only the latest state needs ingesting.
+coalesce() replaces task.delay() in the webhook handlers:
+
+  coalesce:args:{task}:{key}     latest (args, kwargs) for the entity — overwritten by each event
+  coalesce:pending:{task}:{key}  SET NX when the first event of a window arrives; that event
+                                 schedules flush_coalesced with countdown=window
+
+When the flush runs it clears the pending marker and takes the latest args, so every
+event in the window collapses into one task run carrying the newest payload. An event
+that lands after the flush starts opens a new window. If Redis is unavailable the event
+is dispatched immediately — coalescing is an optimisation, never a reason to drop one.
+"""
+import json
+from typing import Any
+
+import structlog
+from celery import Task
+
+from app.clients.redis_client import get_redis
+from app.config import get_settings
+from app.workers.celery_app import celery_app
+from app.workers.runtime import async_task
+
+logger = structlog.get_logger()
+
+ARGS_PREFIX = "coalesce:args:"
+PENDING_PREFIX = "coalesce:pending:"
+
+# The pending marker outlives the countdown so a slow broker cannot open a second
+# window; it still expires if the flush task is lost, letting the next event reschedule.
+_PENDING_TTL_FACTOR = 3
+
+
+def _suffix(task_name: str, key: str) -> str:
+    return f"{task_name}:{key}"
+
+
+async def coalesce(task: Task, key: str, *args: Any, **kwargs: Any) -> bool:
+    """
+    Dispatch task(*args, **kwargs) once per debounce window per (task, key), with the
+    latest arguments. Returns True if this call scheduled the flush, False if it was
+    folded into an already-pending one.
+    """
+    window = get_settings().ingestion_coalesce_window_seconds
+    if window <= 0:
+        task.delay(*args, **kwargs)
+        return True
+
+    suffix = _suffix(task.name, key)
+    try:
+        redis = await get_redis()
+        payload = json.dumps({"args": list(args), "kwargs": kwargs})
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(f"{ARGS_PREFIX}{suffix}", payload, ex=2 * window * _PENDING_TTL_FACTOR)
+            pipe.set(f"{PENDING_PREFIX}{suffix}", "1", nx=True, ex=window * _PENDING_TTL_FACTOR)
+            _, opened = await pipe.execute()
+    except Exception as e:
+        logger.warning(
+            "ingestion.coalesce.redis_unavailable", task=task.name, key=key, error=str(e)
+        )
+        task.delay(*args, **kwargs)
+        return True
+
+    if not opened:
+        logger.debug("ingestion.coalesce.folded", task=task.name, key=key)
+        return False
+    flush_coalesced.apply_async((task.name, key), countdown=window)
+    return True
+
+
+async def take_latest(task_name: str, key: str) -> tuple[list[Any], dict[str, Any]] | None:
+    """Close the window for (task, key) and return its latest arguments, if any."""
+    suffix = _suffix(task_name, key)
+    redis = await get_redis()
+    # Clear the marker first: an event arriving from here on opens a fresh window
+    # rather than writing args that nobody will flush
+    await redis.delete(f"{PENDING_PREFIX}{suffix}")
+    raw = await redis.getdel(f"{ARGS_PREFIX}{suffix}")
+    if raw is None:
+        return None
+    payload = json.loads(raw)
+    return payload["args"], payload["kwargs"]
+
+
+@async_task(name="ingestion.flush_coalesced")
+async def flush_coalesced(task_name: str, key: str) -> None:
+    latest = await take_latest(task_name, key)
+    if latest is None:
+        return
+    args, kwargs = latest
+    celery_app.send_task(task_name, args=args, kwargs=kwargs)
+    logger.info("ingestion.coalesce.flushed", task=task_name, key=key)
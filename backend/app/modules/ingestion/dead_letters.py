@@ -0,0 +1,230 @@
+"""
+Dead-letter store and per-source outcome metrics for ingestion tasks.
+
+Ingestion tasks use IngestionTask as their Celery base class. Every final outcome is
+counted per source and hour; a task that fails for good (retries exhausted, or an
+error it does not retry) is recorded with its payload so it can be replayed once the
+cause — a Cosmos outage, an expired token — is fixed. Events the ingestion bus could
+not dispatch land here too, with their coalescing key.
+
+  ingestion:dlq                       hash: entry id → JSON DeadLetter
+  ingestion:dlq:by_time               zset: entry id by last failure time
+  ingestion:dlq:source:{source}       zset: same, per source
+  ingestion:outcomes:{source}:{hour}  hash: succeeded / retried / failed counters
+
+Entry ids hash the task and its arguments, so the same payload failing again updates
+one entry (attempts, last_failed_at) instead of piling up duplicates.
+"""
+import hashlib
+import json
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import structlog
+from celery import Task
+
+from app.clients.redis_client import get_redis
+from app.modules.ingestion.bus import SOURCES, requeue
+from app.modules.ingestion.models import DeadLetter, SourceFailureStats
+from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+
+logger = structlog.get_logger()
+
+DLQ_KEY = "ingestion:dlq"
+DLQ_BY_TIME = "ingestion:dlq:by_time"
+DLQ_SOURCE_PREFIX = "ingestion:dlq:source:"
+OUTCOMES_PREFIX = "ingestion:outcomes:"
+OUTCOMES_TTL = 8 * 86_400   # a week of hourly buckets, plus a day of slack
+OUTCOMES = ("succeeded", "retried", "failed")
+
+
+def _hour(at: datetime) -> str:
+    return at.strftime("%Y%m%d%H")
+
+
+def entry_id(task_name: str, args: Any, kwargs: Any) -> str:
+    payload = json.dumps([task_name, list(args or ()), kwargs or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+async def record_outcome(source: str, outcome: str, at: datetime | None = None) -> None:
+    redis = await get_redis()
+    key = f"{OUTCOMES_PREFIX}{source}:{_hour(at or datetime.now(UTC))}"
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hincrby(key, outcome, 1)
+        pipe.expire(key, OUTCOMES_TTL)
+        await pipe.execute()
+
+
+async def dead_letter(
+    task_name: str,
+    source: str,
+    args: Any,
+    kwargs: Any,
+    exc: BaseException,
+    attempts: int,
+    key: str | None = None,
+) -> DeadLetter:
+    """Record a final failure (creating or updating its entry) and count it."""
+    redis = await get_redis()
+    now = datetime.now(UTC)
+    eid = entry_id(task_name, args, kwargs)
+    raw = await redis.hget(DLQ_KEY, eid)
+    previous = DeadLetter.model_validate_json(raw) if raw else None
+    entry = DeadLetter(
+        id=eid,
+        task=task_name,
+        source=source,
+        args=list(args or ()),
+        kwargs=dict(kwargs or {}),
+        key=key,
+        exception=type(exc).__name__,
+        error=str(exc)[:2000],
+        attempts=attempts + (previous.attempts if previous else 0),
+        first_failed_at=previous.first_failed_at if previous else now,
+        last_failed_at=now,
+    )
+    score = now.timestamp()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(DLQ_KEY, eid, entry.model_dump_json())
+        pipe.zadd(DLQ_BY_TIME, {eid: score})
+        pipe.zadd(f"{DLQ_SOURCE_PREFIX}{source}", {eid: score})
+        await pipe.execute()
+    await record_outcome(source, "failed", now)
+    logger.error(
+        "ingestion.dead_lettered",
+        task=task_name, source=source, id=eid, exception=entry.exception, attempts=entry.attempts,
+    )
+    return entry
+
+
+async def list_dead_letters(source: str | None = None, limit: int = 100) -> list[DeadLetter]:
+    """Most recently failed first."""
+    redis = await get_redis()
+    index = f"{DLQ_SOURCE_PREFIX}{source}" if source else DLQ_BY_TIME
+    ids = await redis.zrevrange(index, 0, limit - 1)
+    if not ids:
+        return []
+    raws = await redis.hmget(DLQ_KEY, ids)
+    return [DeadLetter.model_validate_json(raw) for raw in raws if raw]
+
+
+async def count_dead_letters(source: str | None = None) -> int:
+    redis = await get_redis()
+    return await redis.zcard(f"{DLQ_SOURCE_PREFIX}{source}" if source else DLQ_BY_TIME)
+
+
+async def _remove(entries: list[DeadLetter]) -> None:
+    if not entries:
+        return
+    redis = await get_redis()
+    ids = [e.id for e in entries]
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hdel(DLQ_KEY, *ids)
+        pipe.zrem(DLQ_BY_TIME, *ids)
+        for entry in entries:
+            pipe.zrem(f"{DLQ_SOURCE_PREFIX}{entry.source}", entry.id)
+        await pipe.execute()
+
+
+async def _select(ids: list[str] | None, source: str | None, limit: int) -> list[DeadLetter]:
+    if not ids:
+        return await list_dead_letters(source, limit)
+    redis = await get_redis()
+    raws = await redis.hmget(DLQ_KEY, ids[:limit])
+    entries = [DeadLetter.model_validate_json(raw) for raw in raws if raw]
+    return [e for e in entries if not source or e.source == source]
+
+
+async def replay_dead_letters(
+    ids: list[str] | None = None, source: str | None = None, limit: int = 500
+) -> list[str]:
+    """
+    Re-queue the selected entries (by id, else the newest of `source`/all) and drop them.
+    Events the bus gave up on go back onto their source stream, so they are coalesced
+    and rate limited like new ones; failed tasks are sent straight to Celery.
+    """
+    entries = await _select(ids, source, limit)
+    replayed: list[DeadLetter] = []
+    for entry in entries:
+        try:
+            if entry.key is not None:
+                await requeue(entry.source, entry.task, entry.key, entry.args)
+            else:
+                celery_app.send_task(entry.task, args=entry.args, kwargs=entry.kwargs)
+        except Exception as e:
+            # Broker or Redis still down: keep this and the rest for the next replay
+            logger.warning("ingestion.dead_letter.replay_failed", id=entry.id, error=str(e))
+            break
+        replayed.append(entry)
+    await _remove(replayed)
+    if replayed:
+        logger.info("ingestion.dead_letter.replayed", count=len(replayed), source=source)
+    return [e.id for e in replayed]
+
+
+async def purge_dead_letters(
+    ids: list[str] | None = None, source: str | None = None, limit: int = 10_000
+) -> int:
+    entries = await _select(ids, source, limit)
+    await _remove(entries)
+    logger.info("ingestion.dead_letter.purged", count=len(entries), source=source)
+    return len(entries)
+
+
+async def failure_stats(hours: int = 24) -> list[SourceFailureStats]:
+    """Per-source outcome counts and failure rate over the last `hours` hourly buckets."""
+    redis = await get_redis()
+    now = datetime.now(UTC)
+    buckets = [_hour(now - timedelta(hours=h)) for h in range(hours)]
+    stats: list[SourceFailureStats] = []
+    for source in SOURCES:
+        async with redis.pipeline(transaction=False) as pipe:
+            for bucket in buckets:
+                pipe.hgetall(f"{OUTCOMES_PREFIX}{source}:{bucket}")
+            rows = await pipe.execute()
+        totals = {o: sum(int(row.get(o, 0)) for row in rows) for o in OUTCOMES}
+        finished = totals["succeeded"] + totals["failed"]
+        stats.append(SourceFailureStats(
+            source=source,
+            window_hours=hours,
+            **totals,
+            failure_rate=round(totals["failed"] / finished, 4) if finished else 0.0,
+            dead_letters=await count_dead_letters(source),
+        ))
+    return stats
+
+
+# ─── Celery base task ─────────────────────────────────────────────────────────
+
+class IngestionTask(Task):  # type: ignore[misc]
+    """
+    Base class for ingestion tasks (`base=IngestionTask, source="github"`): counts
+    outcomes per source and dead-letters final failures. Recording problems are
+    logged, never raised, so they cannot mask the task's own result.
+    """
+
+    abstract = True
+    source = "unknown"
+
+    def _record(self, coro: Any) -> None:
+        try:
+            run_async(coro)
+        except Exception as e:
+            coro.close()
+            logger.warning("ingestion.outcome.record_failed", task=self.name, error=str(e))
+
+    def on_success(self, retval: Any, task_id: str, args: Any, kwargs: Any) -> None:
+        self._record(record_outcome(self.source, "succeeded"))
+
+    def on_retry(
+        self, exc: BaseException, task_id: str, args: Any, kwargs: Any, einfo: Any
+    ) -> None:
+        self._record(record_outcome(self.source, "retried"))
+
+    def on_failure(
+        self, exc: BaseException, task_id: str, args: Any, kwargs: Any, einfo: Any
+    ) -> None:
+        attempts = (self.request.retries or 0) + 1
+        self._record(dead_letter(self.name, self.source, args, kwargs, exc, attempts))
@@ -0,0 +1,166 @@
+"""
+Catalog crawl for a repo: the root catalog-info.yaml plus every file reachable
+through Location targets (monorepos declaring one component per package).
+
+Files are fetched level by level, at most catalog_location_concurrency at a time,
+with conditional requests. A file answering 304 contributes no components, but its
+targets — cached in Redis when the file was last processed — are still followed, so
+a change to one nested file is found even when the root is unchanged. Parsing runs
+in worker threads, off the event loop.
+
+Nothing is remembered until commit(): callers upsert the components first, so a run
+that fails part-way refetches everything next time.
+"""
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+import structlog
+
+from app.clients.http_client import VALIDATORS_TTL, conditional_get, remember_validators
+from app.clients.redis_client import get_redis
+from app.config import get_settings
+from app.modules.catalog.models import ServiceCreate
+from app.modules.ingestion.catalog_parser import (
+    catalog_info_url,
+    component_id,
+    parse_catalog_documents,
+    resolve_location_target,
+)
+
+logger = structlog.get_logger()
+
+TARGETS_PREFIX = "catalog:locations:"
+MAX_LOCATION_DEPTH = 4
+
+Fetch = Callable[[str], Awaitable[httpx.Response]]
+
+
+@dataclass(slots=True)
+class CatalogCrawl:
+    repo_url: str
+    root_status: int = 0
+    components: list[tuple[str, ServiceCreate]] = field(default_factory=list)   # (id, data)
+    files: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    failed: int = 0
+    skipped_targets: int = 0
+    skipped_kinds: dict[str, int] = field(default_factory=dict)   # kind → documents ignored
+    # Processed 200 responses and their resolved targets, persisted by commit()
+    _processed: list[tuple[str, httpx.Response, list[str]]] = field(default_factory=list)
+
+    async def commit(self) -> None:
+        """Remember validators and targets of every processed file."""
+        redis = await get_redis()
+        for url, resp, targets in self._processed:
+            await remember_validators(url, resp)
+            await redis.setex(f"{TARGETS_PREFIX}{url}", VALIDATORS_TTL, json.dumps(targets))
+        self._processed.clear()
+
+
+async def _cached_targets(url: str) -> list[str]:
+    redis = await get_redis()
+    raw = await redis.get(f"{TARGETS_PREFIX}{url}")
+    return json.loads(raw) if raw else []
+
+
+async def crawl_catalog(
+    repo_url: str,
+    fetch: Fetch | None = None,
+    headers: dict[str, str] | None = None,
+) -> CatalogCrawl:
+    """
+    Collect the repo's new or changed components. Errors fetching the root file are
+    raised (the caller retries); errors on nested files are counted and skipped.
+    """
+    settings = get_settings()
+    get = fetch or (lambda url: conditional_get(url, headers=headers))
+    semaphore = asyncio.Semaphore(settings.catalog_location_concurrency)
+    root = catalog_info_url(repo_url)
+    crawl = CatalogCrawl(repo_url=repo_url)
+    seen = {root}
+    level = [root]
+
+    async def fetch_one(url: str) -> httpx.Response | None:
+        async with semaphore:
+            try:
+                return await get(url)
+            except httpx.HTTPError as e:
+                if url == root:
+                    raise
+                logger.warning("ingestion.location.fetch_failed", url=url, error=str(e))
+                return None
+
+    for depth in range(MAX_LOCATION_DEPTH + 1):
+        responses = await asyncio.gather(*(fetch_one(url) for url in level))
+        next_level: list[str] = []
+        for url, resp in zip(level, responses, strict=True):
+            crawl.files += 1
+            if url == root:
+                crawl.root_status = resp.status_code if resp is not None else 0
+                if resp is not None and resp.status_code not in (200, 304, 404):
+                    resp.raise_for_status()
+            targets = await _process_file(crawl, url, resp, primary_file=url == root)
+            for target in targets:
+                if target in seen:
+                    continue
+                if depth == MAX_LOCATION_DEPTH or len(seen) >= settings.catalog_max_location_files:
+                    crawl.skipped_targets += 1
+                    continue
+                seen.add(target)
+                next_level.append(target)
+        if not next_level:
+            break
+        level = next_level
+
+    # The same component declared twice must not become two vertices in one upsert batch
+    crawl.components = list(dict(crawl.components).items())
+    logger.debug(
+        "ingestion.catalog.crawled",
+        repo=repo_url,
+        files=crawl.files,
+        components=len(crawl.components),
+        unchanged=crawl.unchanged,
+        missing=crawl.missing,
+        failed=crawl.failed,
+        skipped_targets=crawl.skipped_targets,
+    )
+    if crawl.skipped_kinds:
+        logger.info("ingestion.catalog.kinds_skipped", repo=repo_url, kinds=crawl.skipped_kinds)
+    return crawl
+
+
+async def _process_file(
+    crawl: CatalogCrawl, url: str, resp: httpx.Response | None, primary_file: bool
+) -> list[str]:
+    """Record the file's components; return the Location targets to follow from it."""
+    if resp is None or resp.status_code >= 500:
+        crawl.failed += 1
+        return []
+    if resp.status_code == 304:
+        crawl.unchanged += 1
+        return await _cached_targets(url)
+    if resp.status_code != 200:
+        crawl.missing += 1
+        return []
+
+    docs = await asyncio.to_thread(parse_catalog_documents, resp.text, crawl.repo_url)
+    for i, component in enumerate(docs.components):
+        primary = primary_file and i == 0
+        crawl.components.append((component_id(crawl.repo_url, component.name, primary), component))
+    for kind, count in docs.skipped_kinds.items():
+        crawl.skipped_kinds[kind] = crawl.skipped_kinds.get(kind, 0) + count
+
+    targets: list[str] = []
+    for target in docs.targets:
+        resolved = resolve_location_target(url, target, crawl.repo_url)
+        if resolved is None:
+            logger.debug("ingestion.location.skipped", url=url, target=target)
+            crawl.skipped_targets += 1
+        else:
+            targets.append(resolved)
+    crawl._processed.append((url, resp, targets))
+    return targets
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from datetime import datetime
 from typing import Any
 
+from pydantic import BaseModel, Field
+
 
 class GitHubWebhookPayload(BaseModel):
     action: str = ""
@@ -55,3 +57,37 @@ class GitHubDependencyManifest(BaseModel):
     name: str = ""
     file: dict[str, Any] = {}
     resolved: dict[str, Any] = {}   # package name → {package_url, relationship, scope}
+
+
+# ─── Dead letters / failure metrics ──────────────────────────────────────────
+
+class DeadLetter(BaseModel):
+    """An ingestion task that failed for good, with everything needed to replay it."""
+    id: str
+    task: str
+    source: str
+    args: list[Any] = []
+    kwargs: dict[str, Any] = {}
+    key: str | None = None       # coalescing key, for events dead-lettered by the bus
+    exception: str
+    error: str = ""
+    attempts: int
+    first_failed_at: datetime
+    last_failed_at: datetime
+
+
+class DeadLetterSelection(BaseModel):
+    """Entries to replay or purge: explicit ids, else the newest `limit` (of one source if set)."""
+    ids: list[str] = []
+    source: str | None = None
+    limit: int = Field(500, ge=1, le=10_000)
+
+
+class SourceFailureStats(BaseModel):
+    source: str
+    window_hours: int
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+    failure_rate: float = 0.0       # failed / (succeeded + failed)
+    dead_letters: int = 0
@@ -0,0 +1,292 @@
+"""
+Scheduled full-org catalog sync.
+
+Webhooks only cover repos whose pushes reach us; a nightly beat job re-ingests every
+repo of the configured GitHub orgs so missed events do not drift forever.
+
+Per org, page by page (100 repos, ordered by name so pages are stable):
+
+  list     GET /orgs/{org}/repos, archived repos skipped
+  fetch    catalog-info.yaml for each repo and the files its Location targets reach
+           (see ingestion.locations), at most github_org_sync_concurrency requests
+           in flight, every one paced by GitHubRateLimiter; conditional requests
+           (see http_client.conditional_get) make unchanged repos a cheap 304
+  upsert   parsed components written in bulk (ServiceRepository.upsert_many)
+  commit   validators and Location targets remembered, then the page number checkpointed in Redis
+
+A crashed or retried sync resumes after the last checkpointed page. A per-org lock
+keeps two syncs of the same org from running at once.
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import httpx
+import structlog
+from celery import Task
+
+from app.clients.http_client import conditional_get, get_http_client
+from app.clients.redis_client import get_redis
+from app.config import get_settings
+from app.modules.catalog.models import ServiceCreate
+from app.modules.catalog.repository import ServiceRepository
+from app.modules.ingestion.dead_letters import IngestionTask
+from app.modules.ingestion.locations import CatalogCrawl, crawl_catalog
+from app.workers.runtime import async_task
+
+logger = structlog.get_logger()
+
+GITHUB_API = "https://api.github.com"
+REPOS_PER_PAGE = 100
+CHECKPOINT_PREFIX = "ingestion:org_sync:"
+CHECKPOINT_TTL = 7 * 86_400
+LOCK_TTL = 900               # refreshed after every page
+MAX_RATE_LIMITED_ATTEMPTS = 3
+
+
+@dataclass(slots=True)
+class OrgSyncResult:
+    org: str
+    pages: int = 0
+    repos: int = 0
+    upserted: int = 0       # components, so a monorepo can count more than once
+    unchanged: int = 0      # 304 Not Modified
+    missing: int = 0        # no catalog-info.yaml, or unparseable
+    failed: int = 0         # fetch errors; picked up again by the next sync
+    resumed_from_page: int = 1
+
+
+# ─── Rate limiting ────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    def __init__(
+        self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def take(self, wanted: int) -> int:
+        """Grant up to `wanted` whole tokens."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        granted = min(wanted, int(self._tokens))
+        self._tokens -= granted
+        return granted
+
+
+class GitHubRateLimiter:
+    """
+    Paces requests with a token bucket and honours GitHub's budget headers: once
+    X-RateLimit-Remaining drops to `reserve` (or a 403/429 carries Retry-After),
+    every caller waits until the reset time.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        reserve: int,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.rate = rate
+        self.reserve = reserve
+        self._bucket = TokenBucket(rate, max(1, int(rate)), clock)
+        self._wall_clock = wall_clock
+        self._sleep = sleep
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            delay = self._resume_at - self._wall_clock()
+            if delay > 0:
+                logger.info("ingestion.org_sync.rate_limited", wait_seconds=round(delay, 1))
+                await self._sleep(delay)
+            while not self._bucket.take(1):
+                await self._sleep(1 / self.rate)
+
+    def observe(self, response: httpx.Response) -> None:
+        headers = response.headers
+        remaining, reset = headers.get("X-RateLimit-Remaining"), headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None and int(remaining) <= self.reserve:
+            self._resume_at = max(self._resume_at, float(reset))
+        retry_after = headers.get("Retry-After")
+        if response.status_code in (403, 429) and retry_after is not None:
+            self._resume_at = max(self._resume_at, self._wall_clock() + float(retry_after))
+
+    def is_rate_limited(self, response: httpx.Response) -> bool:
+        return response.status_code == 429 or (
+            response.status_code == 403
+            and (
+                response.headers.get("X-RateLimit-Remaining") == "0"
+                or "Retry-After" in response.headers
+            )
+        )
+
+
+async def _paced(
+    limiter: GitHubRateLimiter, send: Callable[[], Awaitable[httpx.Response]]
+) -> httpx.Response:
+    """Send through the limiter, waiting out and retrying rate-limit rejections."""
+    for _ in range(MAX_RATE_LIMITED_ATTEMPTS):
+        await limiter.acquire()
+        resp = await send()
+        limiter.observe(resp)
+        if not limiter.is_rate_limited(resp):
+            return resp
+    return resp
+
+
+# ─── Checkpoints ──────────────────────────────────────────────────────────────
+
+def _checkpoint_key(org: str) -> str:
+    return f"{CHECKPOINT_PREFIX}{org}"
+
+
+async def load_checkpoint(org: str) -> dict[str, str]:
+    redis = await get_redis()
+    return await redis.hgetall(_checkpoint_key(org))
+
+
+async def _save_checkpoint(org: str, page: int, result: OrgSyncResult, started_at: str) -> None:
+    redis = await get_redis()
+    key = _checkpoint_key(org)
+    fields: dict[str | bytes, str] = {"page": str(page), "started_at": started_at}
+    fields.update((k, str(v)) for k, v in asdict(result).items() if k != "org")
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, CHECKPOINT_TTL)
+        pipe.expire(f"{key}:lock", LOCK_TTL)
+        await pipe.execute()
+
+
+# ─── Sync ─────────────────────────────────────────────────────────────────────
+
+async def _list_repos(
+    org: str, page: int, headers: dict[str, str], limiter: GitHubRateLimiter
+) -> tuple[list[dict[str, Any]], bool]:
+    url = f"{GITHUB_API}/orgs/{org}/repos"
+    params: dict[str, str | int] = {
+        "type": "all", "sort": "full_name", "direction": "asc",
+        "per_page": REPOS_PER_PAGE, "page": page,
+    }
+    client = get_http_client(url)
+    resp = await _paced(limiter, lambda: client.get(url, params=params, headers=headers))
+    resp.raise_for_status()
+    return resp.json(), "next" in resp.links
+
+
+async def _crawl_repo(
+    repo_url: str,
+    headers: dict[str, str],
+    limiter: GitHubRateLimiter,
+    semaphore: asyncio.Semaphore,
+) -> CatalogCrawl | None:
+    """catalog-info.yaml plus its Location targets; the org-wide semaphore bounds every fetch."""
+    async def fetch(url: str) -> httpx.Response:
+        async with semaphore:
+            return await _paced(limiter, lambda: conditional_get(url, headers=headers))
+
+    try:
+        return await crawl_catalog(repo_url, fetch=fetch)
+    except httpx.HTTPError as e:
+        logger.warning("ingestion.org_sync.fetch_failed", repo=repo_url, error=str(e))
+        return None
+
+
+async def sync_org(org: str, token: str = "") -> OrgSyncResult:
+    settings = get_settings()
+    redis = await get_redis()
+    lock_key = f"{_checkpoint_key(org)}:lock"
+    if not await redis.set(lock_key, "1", nx=True, ex=LOCK_TTL):
+        logger.info("ingestion.org_sync.already_running", org=org)
+        return OrgSyncResult(org=org)
+
+    headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    limiter = GitHubRateLimiter(
+        settings.github_org_sync_requests_per_second, settings.github_rate_limit_reserve
+    )
+    semaphore = asyncio.Semaphore(settings.github_org_sync_concurrency)
+    repo = ServiceRepository()
+
+    checkpoint = await load_checkpoint(org)
+    page = int(checkpoint.get("page", 0)) + 1
+    started_at = checkpoint.get("started_at") or datetime.now(UTC).isoformat()
+    result = OrgSyncResult(org=org, resumed_from_page=page)
+    for field in ("pages", "repos", "upserted", "unchanged", "missing", "failed"):
+        setattr(result, field, int(checkpoint.get(field, 0)))
+    if page > 1:
+        logger.info("ingestion.org_sync.resumed", org=org, page=page)
+
+    try:
+        while True:
+            repos, has_next = await _list_repos(org, page, headers, limiter)
+            repo_urls = [
+                r["html_url"] for r in repos if not r.get("archived") and r.get("html_url")
+            ]
+            crawls = await asyncio.gather(
+                *(_crawl_repo(url, headers, limiter, semaphore) for url in repo_urls)
+            )
+
+            items: list[tuple[str, ServiceCreate]] = []
+            for crawl in crawls:
+                if crawl is None:
+                    result.failed += 1
+                elif crawl.components:
+                    items.extend(crawl.components)
+                elif crawl.root_status == 304:
+                    result.unchanged += 1
+                else:
+                    result.missing += 1
+
+            if items:
+                await repo.upsert_many(items)
+            for crawl in crawls:
+                if crawl is not None:
+                    await crawl.commit()
+
+            result.pages += 1
+            result.repos += len(repo_urls)
+            result.upserted += len(items)
+            await _save_checkpoint(org, page, result, started_at)
+            if not has_next:
+                break
+            page += 1
+    finally:
+        await redis.delete(lock_key)
+
+    await redis.delete(_checkpoint_key(org))
+    logger.info("ingestion.org_sync.done", **asdict(result), started_at=started_at)
+    return result
+
+
+# ─── Tasks ────────────────────────────────────────────────────────────────────
+
+@async_task(
+    name="ingestion.sync_github_org", bind=True, max_retries=3, base=IngestionTask, source="github"
+)
+async def sync_github_org(self: Task, org: str) -> dict[str, Any]:
+    """Re-ingest every repo in a GitHub org; retries resume from the checkpoint."""
+    try:
+        return asdict(await sync_org(org, get_settings().github_token))
+    except httpx.HTTPError as e:
+        logger.error("ingestion.org_sync.failed", org=org, error=str(e))
+        raise self.retry(exc=e, countdown=300) from e
+
+
+@async_task(name="ingestion.sync_github_orgs")
+async def sync_github_orgs() -> None:
+    for org in get_settings().github_sync_orgs:
+        sync_github_org.delay(org)
@@ -1,9 +1,16 @@
 import hashlib
 import hmac
+from typing import Any
+
 import structlog
-from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
 from app.config import get_settings
+from app.core.deps import AdminUser
+from app.core.exceptions import ValidationError
+from app.modules.ingestion import dead_letters
+from app.modules.ingestion.bus import SOURCES, publish
 from app.modules.ingestion.models import (
+    DeadLetterSelection,
     GitHubWebhookPayload,
     ADOWebhookPayload,
     PagerDutyWebhookPayload,
@@ -42,10 +49,10 @@ async def github_webhook(
         ref_branch = payload.ref.replace("refs/heads/", "")
 
         if ref_branch == default_branch and repo_url:
-            tasks.ingest_github_repo.delay(repo_url)
+            await publish("github", tasks.ingest_github_repo, repo_url, repo_url)
             if owner and repo_name:
-                tasks.ingest_github_dependencies.delay(
-                    repo_url, owner, repo_name, settings.github_token
+                await publish(
+                    "github", tasks.ingest_github_dependencies, repo_url, repo_url, owner, repo_name
                 )
             logger.info("ingestion.github.queued", repo=repo_url)
 
@@ -66,7 +73,7 @@ async def ado_webhook(
     if payload.eventType == "git.push":
         repo_url = payload.resource.get("repository", {}).get("remoteUrl", "")
         if repo_url:
-            tasks.ingest_github_repo.delay(repo_url)
+            await publish("ado", tasks.ingest_github_repo, repo_url, repo_url)
 
     return {"data": {"accepted": True}, "meta": {}, "error": None}
 
@@ -80,7 +87,10 @@ async def pagerduty_webhook(
     event_type = payload.event_type
     incident_data = payload.incident_data
     if event_type and incident_data.get("id"):
-        tasks.ingest_pagerduty_incident.delay(event_type, incident_data)
+        await publish(
+            "pagerduty", tasks.ingest_pagerduty_incident,
+            incident_data["id"], event_type, incident_data,
+        )
         logger.info("ingestion.pagerduty.queued", event_type=event_type)
     return {"data": {"accepted": True}, "meta": {}, "error": None}
 
@@ -92,7 +102,10 @@ async def opsgenie_webhook(
 ) -> dict:
     """OpsGenie webhook — create/update Incident entities."""
     if payload.alert.get("alertId"):
-        tasks.ingest_opsgenie_alert.delay(payload.action, payload.alert)
+        await publish(
+            "opsgenie", tasks.ingest_opsgenie_alert,
+            payload.alert["alertId"], payload.action, payload.alert,
+        )
         logger.info("ingestion.opsgenie.queued", action=payload.action)
     return {"data": {"accepted": True}, "meta": {}, "error": None}
 
@@ -110,7 +123,58 @@ async def ado_workitem_webhook(
         raise HTTPException(status_code=401, detail="Invalid secret")
 
     if payload.eventType in ("workitem.created", "workitem.updated") and payload.resource.get("id"):
-        tasks.ingest_ado_work_item.delay(payload.eventType, payload.resource)
+        await publish(
+            "ado", tasks.ingest_ado_work_item,
+            str(payload.resource["id"]), payload.eventType, payload.resource,
+        )
         logger.info("ingestion.ado_workitem.queued", event_type=payload.eventType)
 
     return {"data": {"accepted": True}, "meta": {}, "error": None}
+
+
+# ─── Dead letters (admin) ────────────────────────────────────────────────────
+
+def _check_source(source: str | None) -> None:
+    if source and source not in SOURCES:
+        raise ValidationError(f"Unknown source '{source}'. Expected one of: {', '.join(SOURCES)}.")
+
+
+@router.get("/dead-letters")
+async def list_dead_letters(
+    _: AdminUser,
+    source: str | None = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+) -> dict[str, Any]:
+    """Ingestion tasks that exhausted their retries, most recent failure first."""
+    _check_source(source)
+    entries = await dead_letters.list_dead_letters(source, limit)
+    total = await dead_letters.count_dead_letters(source)
+    return {
+        "data": [e.model_dump(mode="json") for e in entries],
+        "meta": {"total": total},
+        "error": None,
+    }
+
+
+@router.post("/dead-letters/replay")
+async def replay_dead_letters(body: DeadLetterSelection, _: AdminUser) -> dict[str, Any]:
+    """Re-queue dead-lettered tasks and bus events in one batch; replayed entries are removed."""
+    _check_source(body.source)
+    replayed = await dead_letters.replay_dead_letters(body.ids, body.source, body.limit)
+    return {"data": {"replayed": replayed}, "meta": {"count": len(replayed)}, "error": None}
+
+
+@router.post("/dead-letters/purge")
+async def purge_dead_letters(body: DeadLetterSelection, _: AdminUser) -> dict[str, Any]:
+    _check_source(body.source)
+    purged = await dead_letters.purge_dead_letters(body.ids, body.source, body.limit)
+    return {"data": {"purged": purged}, "meta": {}, "error": None}
+
+
+@router.get("/metrics/failures")
+async def ingestion_failure_stats(
+    _: AdminUser, hours: int = Query(24, ge=1, le=168)
+) -> dict[str, Any]:
+    """Per-source task outcomes and failure rate over the last `hours`."""
+    stats = await dead_letters.failure_stats(hours)
+    return {"data": [s.model_dump() for s in stats], "meta": {"window_hours": hours}, "error": None}
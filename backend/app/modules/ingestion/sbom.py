@@ -0,0 +1,169 @@
+"""
+SBOM → Package entities + `consumes` edges, in bulk.
+
+Pipeline for one service's SPDX SBOM (GitHub dependency-graph export):
+
+  parse    stream SBOM packages into (id, name, version, license), de-duplicated
+  diff     per chunk: one bulk lookup of the stored packages, keep only new/changed
+  upsert   changed packages written in chunks (EntityRepository.upsert_many)
+  edges    service --consumes--> package reconciled against the SBOM, including
+           removal of packages that were dropped (and the service from their consumers)
+
+Each phase's wall time is reported in SbomSyncResult.timings and the summary log.
+"""
+import hashlib
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from app.modules.entities.models import PackageCreate, PackageEntity
+from app.modules.entities.repository import BULK_CHUNK_SIZE, EntityRepository
+from app.modules.relationships.repository import RelationshipRepository
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True, slots=True)
+class SbomPackage:
+    id: str
+    name: str
+    version: str
+    license: str
+
+
+@dataclass(slots=True)
+class SbomSyncResult:
+    packages: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    edges_added: int = 0
+    edges_removed: int = 0
+    timings: dict[str, float] = field(default_factory=dict)   # phase → seconds
+
+
+def package_id(name: str, version: str) -> str:
+    """Deterministic Package vertex id from name + version."""
+    return hashlib.sha256(f"package:{name}:{version}".encode()).hexdigest()[:32]
+
+
+def iter_sbom_packages(sbom: dict[str, Any]) -> Iterator[SbomPackage]:
+    seen: set[str] = set()
+    for pkg in sbom.get("sbom", {}).get("packages", []):
+        name = pkg.get("name", "")
+        if not name:
+            continue
+        version = pkg.get("versionInfo", "")
+        pid = package_id(name, version)
+        if pid in seen:
+            continue
+        seen.add(pid)
+        license_str = (
+            " AND ".join(pkg.get("licenseConcluded", "").split())
+            or pkg.get("licenseDeclared", "")
+        )
+        yield SbomPackage(id=pid, name=name, version=version, license=license_str)
+
+
+def _chunks(items: Iterator[SbomPackage], size: int) -> Iterator[list[SbomPackage]]:
+    chunk: list[SbomPackage] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@contextmanager
+def _timed(timings: dict[str, float], phase: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def _desired(
+    pkg: SbomPackage, service_id: str, existing: PackageEntity | None
+) -> PackageCreate | None:
+    """The package state to write, or None when the stored vertex is already current."""
+    if existing is None:
+        return PackageCreate(
+            name=pkg.name, version=pkg.version, license=pkg.license, consumers=[service_id]
+        )
+    if service_id in existing.consumers and existing.license == pkg.license:
+        return None
+    consumers = existing.consumers
+    if service_id not in consumers:
+        consumers = [*consumers, service_id]
+    return PackageCreate(**{**existing.model_dump(include=set(PackageCreate.model_fields)),
+                            "license": pkg.license, "consumers": consumers})
+
+
+async def sync_sbom(
+    service_id: str,
+    sbom: dict[str, Any],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> SbomSyncResult:
+    pkg_repo: EntityRepository[PackageEntity] = EntityRepository("Package", PackageEntity)
+    rel_repo = RelationshipRepository()
+    result = SbomSyncResult()
+    timings = result.timings
+    wanted: dict[str, str] = {}
+
+    chunks = _chunks(iter_sbom_packages(sbom), chunk_size)
+    while True:
+        with _timed(timings, "parse"):
+            chunk = next(chunks, None)
+        if not chunk:
+            break
+        result.packages += len(chunk)
+        wanted.update((p.id, "Package") for p in chunk)
+
+        with _timed(timings, "diff"):
+            stored = await pkg_repo.get_many([p.id for p in chunk])
+            writes = [
+                (p.id, data)
+                for p in chunk
+                if (data := _desired(p, service_id, stored.get(p.id)))
+            ]
+        result.unchanged += len(chunk) - len(writes)
+        result.created += sum(1 for pid, _ in writes if pid not in stored)
+        result.updated += sum(1 for pid, _ in writes if pid in stored)
+
+        with _timed(timings, "upsert"):
+            await pkg_repo.upsert_many(writes, existing=stored, chunk_size=chunk_size)
+
+    with _timed(timings, "edges"):
+        added, removed = await rel_repo.reconcile_outgoing(
+            service_id, "Service", "consumes", wanted
+        )
+        result.edges_added, result.edges_removed = len(added), len(removed)
+        no_longer_consumed = await pkg_repo.get_many(removed)
+        dropped = [
+            (pid, PackageCreate(**{**pkg.model_dump(include=set(PackageCreate.model_fields)),
+                                   "consumers": [c for c in pkg.consumers if c != service_id]}))
+            for pid, pkg in no_longer_consumed.items()
+            if service_id in pkg.consumers
+        ]
+        if dropped:
+            await pkg_repo.upsert_many(dropped, existing=no_longer_consumed, chunk_size=chunk_size)
+
+    logger.info(
+        "ingestion.sbom.synced",
+        service_id=service_id,
+        packages=result.packages,
+        created=result.created,
+        updated=result.updated,
+        unchanged=result.unchanged,
+        edges_added=result.edges_added,
+        edges_removed=result.edges_removed,
+        timings_ms={phase: round(sec * 1000, 1) for phase, sec in timings.items()},
+    )
+    return result
@@ -1,5 +1,8 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends, Query
-from app.core.security import get_current_user
+from app.core.deps import get_current_user
+from app.core.exceptions import NotFoundError
 from app.modules.ops.service import OpsService
 from app.modules.ops.models import OpsHealthResponse, ChangeLogResponse, ImpactAnalysisResponse
 
@@ -40,3 +43,14 @@ async def get_impact_analysis(
     """Blast-radius analysis: which entities are affected if this entity has an incident."""
     result = await _svc.get_impact_analysis(entity_id=entity_id, depth=depth)
     return _ok(result.model_dump(mode="json"))
+
+
+@router.get("/graph-hotspots", response_model=None)
+async def get_graph_hotspots(
+    _: dict[str, Any] = Depends(get_current_user),
+) -> dict[str, Any]:
+    """Dependency cycles, top-degree vertices and fan-out outliers from the last analytics run."""
+    result = await _svc.get_graph_analytics()
+    if result is None:
+        raise NotFoundError("Graph analytics have not been computed yet.")
+    return _ok(result.model_dump(mode="json"))
@@ -15,6 +15,7 @@ from app.modules.entities.models import (
     AzureResourceEntity,
 )
 from app.modules.entities.repository import EntityRepository
+from app.modules.relationships.models import GraphAnalytics
 from app.modules.relationships.repository import RelationshipRepository
 from app.modules.ops.models import (
     ServiceHealthSummary,
@@ -155,6 +156,12 @@ class OpsService:
         sliced = events[:limit]
         return ChangeLogResponse(events=sliced, total=len(events))
 
+    # ── Graph Hotspots ─────────────────────────────────────────────────────────
+
+    async def get_graph_analytics(self) -> GraphAnalytics | None:
+        """Precomputed by the relationships.analyse_graph beat job — a single Redis read."""
+        return await RelationshipRepository().get_analytics()
+
     # ── Impact Analysis ────────────────────────────────────────────────────────
 
     async def get_impact_analysis(self, entity_id: str, depth: int = 3) -> ImpactAnalysisResponse:
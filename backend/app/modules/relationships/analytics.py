@@ -0,0 +1,141 @@
+"""
+Offline analytics over the relationship graph: dependency cycles and hotspots.
+
+Runs on a bulk edge export (see relationships.tasks.analyse_graph), never on the
+request path. Results are stored in Redis and read by /api/v1/ops/graph-hotspots
+and by get_graph to stop expanding known super-nodes.
+"""
+import math
+from collections import Counter
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from app.modules.relationships.models import DegreeStat, GraphAnalytics, GraphEdge
+
+# Edge types whose cycles are reported (circular dependency chains)
+CYCLE_EDGE_TYPES: frozenset[str] = frozenset({"depends_on"})
+TOP_DEGREE_LIMIT = 20
+# A vertex is a hotspot when its degree is an outlier AND at least this large
+HOTSPOT_MIN_DEGREE = 50
+OUTLIER_STDDEVS = 3.0
+
+
+def strongly_connected_components(adjacency: dict[str, set[str]]) -> list[list[str]]:
+    """Tarjan's algorithm, iterative so deep dependency chains can't hit the recursion limit."""
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+    counter = 0
+
+    for root in adjacency:
+        if root in index:
+            continue
+        work: list[tuple[str, list[str]]] = [(root, sorted(adjacency.get(root, ())))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            v, successors = work[-1]
+            if successors:
+                w = successors.pop()
+                if w not in index:
+                    index[w] = lowlink[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, sorted(adjacency.get(w, ()))))
+                elif w in on_stack:
+                    lowlink[v] = min(lowlink[v], index[w])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[v])
+            if lowlink[v] == index[v]:
+                component: list[str] = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+
+    return components
+
+
+def _outlier_threshold(values: list[int]) -> float:
+    if not values:
+        return math.inf
+    mean = sum(values) / len(values)
+    stddev = math.sqrt(sum((x - mean) ** 2 for x in values) / len(values))
+    return mean + OUTLIER_STDDEVS * stddev
+
+
+def _degree_bucket(degree: int) -> str:
+    """Power-of-two histogram buckets: "0", "1", "2-3", "4-7", ..."""
+    if degree <= 1:
+        return str(degree)
+    lo = 1 << (degree.bit_length() - 1)
+    return f"{lo}-{2 * lo - 1}"
+
+
+def analyse_edges(edges: Iterable[GraphEdge]) -> GraphAnalytics:
+    out_degree: Counter[str] = Counter()
+    in_degree: Counter[str] = Counter()
+    cycle_adjacency: dict[str, set[str]] = {}
+    self_loops: set[str] = set()
+    edge_count = 0
+
+    for e in edges:
+        edge_count += 1
+        out_degree[e.source_id] += 1
+        in_degree[e.target_id] += 1
+        if e.relationship_type in CYCLE_EDGE_TYPES:
+            cycle_adjacency.setdefault(e.source_id, set()).add(e.target_id)
+            cycle_adjacency.setdefault(e.target_id, set())
+            if e.source_id == e.target_id:
+                self_loops.add(e.source_id)
+
+    vertices = set(out_degree) | set(in_degree)
+    total_degree = {v: out_degree[v] + in_degree[v] for v in vertices}
+
+    cycles = [
+        sorted(c)
+        for c in strongly_connected_components(cycle_adjacency)
+        if len(c) > 1 or c[0] in self_loops
+    ]
+    cycles.sort(key=len, reverse=True)
+
+    top_degree = [
+        DegreeStat(entity_id=v, in_degree=in_degree[v], out_degree=out_degree[v])
+        for v in sorted(vertices, key=lambda v: (-total_degree[v], v))[:TOP_DEGREE_LIMIT]
+    ]
+
+    fan_out_limit = _outlier_threshold(list(out_degree.values()))
+    fan_out_outliers = [
+        DegreeStat(entity_id=v, in_degree=in_degree[v], out_degree=d)
+        for v, d in out_degree.most_common()
+        if d > fan_out_limit
+    ]
+
+    degree_limit = max(_outlier_threshold(list(total_degree.values())), HOTSPOT_MIN_DEGREE)
+    hotspot_ids = sorted(v for v, d in total_degree.items() if d >= degree_limit)
+
+    histogram = Counter(_degree_bucket(d) for d in total_degree.values())
+
+    return GraphAnalytics(
+        computed_at=datetime.now(UTC),
+        vertex_count=len(vertices),
+        edge_count=edge_count,
+        cycles=cycles,
+        top_degree=top_degree,
+        fan_out_outliers=fan_out_outliers,
+        degree_histogram=dict(sorted(histogram.items(), key=lambda kv: int(kv[0].split("-")[0]))),
+        hotspot_ids=hotspot_ids,
+    )
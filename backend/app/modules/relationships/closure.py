@@ -0,0 +1,221 @@
+"""
+Materialised reachability index over dependency edges.
+
+The transitive closure of `depends_on` / `consumes` edges is kept in Redis so that
+"does A transitively depend on B?" is a single SISMEMBER instead of a graph walk.
+
+Key layout (all ids are entity vertex ids):
+  reach:edges          hash   edge_id → "src|tgt"
+  reach:pairs          hash   "src|tgt" → number of parallel edges
+  reach:out:{id}       set    direct successors
+  reach:down:{id}      set    every vertex reachable from id
+  reach:up:{id}        set    every vertex that reaches id
+  reach:rebuild:active string  set while a full rebuild is exporting edges
+  reach:rebuild:log    list   edge adds/removes made while the rebuild runs
+
+Edge inserts are applied incrementally (ancestors × descendants). Edge removals
+recompute the descendant sets of the affected ancestors only. A periodic full
+rebuild (see relationships.tasks) reconciles any drift; changes made while its
+export runs are logged and replayed on top of the rebuilt index.
+"""
+import json
+from collections.abc import Iterable
+
+import structlog
+
+from app.clients.redis_client import get_redis
+
+logger = structlog.get_logger()
+
+# Relationship types that contribute to the dependency closure
+CLOSURE_EDGE_TYPES: tuple[str, ...] = ("depends_on", "consumes")
+
+_EDGES = "reach:edges"
+_PAIRS = "reach:pairs"
+_REBUILD_ACTIVE = "reach:rebuild:active"
+_REBUILD_LOG = "reach:rebuild:log"
+# Upper bound on an export; a crashed rebuild stops logging changes after this
+REBUILD_TTL_SECONDS = 3600
+
+
+def _out(vid: str) -> str:
+    return f"reach:out:{vid}"
+
+
+def _down(vid: str) -> str:
+    return f"reach:down:{vid}"
+
+
+def _up(vid: str) -> str:
+    return f"reach:up:{vid}"
+
+
+def _pair(src: str, tgt: str) -> str:
+    return f"{src}|{tgt}"
+
+
+def compute_closure(adjacency: dict[str, set[str]]) -> dict[str, set[str]]:
+    """Return vertex → set of all vertices reachable from it (BFS per vertex)."""
+    closure: dict[str, set[str]] = {}
+    for start in adjacency:
+        seen: set[str] = set()
+        stack = list(adjacency.get(start, ()))
+        while stack:
+            v = stack.pop()
+            if v in seen:
+                continue
+            seen.add(v)
+            stack.extend(n for n in adjacency.get(v, ()) if n not in seen)
+        closure[start] = seen
+    return closure
+
+
+class ReachabilityIndex:
+    async def add_edge(self, edge_id: str, source_id: str, target_id: str) -> None:
+        redis = await get_redis()
+        await self._log_during_rebuild(["add", edge_id, source_id, target_id])
+        if await redis.hexists(_EDGES, edge_id):
+            return  # already indexed — replays must not double-count the pair
+        pair = _pair(source_id, target_id)
+        await redis.hset(_EDGES, edge_id, pair)
+        if await redis.hincrby(_PAIRS, pair, 1) > 1:
+            return  # parallel edge — closure unchanged
+
+        ancestors = set(await redis.smembers(_up(source_id))) | {source_id}
+        descendants = set(await redis.smembers(_down(target_id))) | {target_id}
+
+        pipe = redis.pipeline(transaction=False)
+        pipe.sadd(_out(source_id), target_id)
+        for a in ancestors:
+            pipe.sadd(_down(a), *descendants)
+        for d in descendants:
+            pipe.sadd(_up(d), *ancestors)
+        await pipe.execute()
+        logger.debug("reachability.edge_added", edge_id=edge_id, affected=len(ancestors))
+
+    async def remove_edge(self, edge_id: str) -> None:
+        redis = await get_redis()
+        await self._log_during_rebuild(["remove", edge_id])
+        pair = await redis.hget(_EDGES, edge_id)
+        if not pair:
+            return
+        await redis.hdel(_EDGES, edge_id)
+        if await redis.hincrby(_PAIRS, pair, -1) > 0:
+            return  # another parallel edge still connects the pair
+        await redis.hdel(_PAIRS, pair)
+
+        source_id, target_id = pair.split("|", 1)
+        await redis.srem(_out(source_id), target_id)
+
+        # Only ancestors of the source (and the source itself) can lose reachability
+        affected = set(await redis.smembers(_up(source_id))) | {source_id}
+        adjacency: dict[str, set[str]] = {}
+
+        async def successors(vid: str) -> set[str]:
+            if vid not in adjacency:
+                adjacency[vid] = set(await redis.smembers(_out(vid)))
+            return adjacency[vid]
+
+        pipe = redis.pipeline(transaction=False)
+        for a in affected:
+            seen: set[str] = set()
+            stack = list(await successors(a))
+            while stack:
+                v = stack.pop()
+                if v in seen:
+                    continue
+                seen.add(v)
+                stack.extend(n for n in await successors(v) if n not in seen)
+
+            lost = set(await redis.smembers(_down(a))) - seen
+            if not lost:
+                continue
+            pipe.srem(_down(a), *lost)
+            for d in lost:
+                pipe.srem(_up(d), a)
+        await pipe.execute()
+        logger.debug("reachability.edge_removed", edge_id=edge_id, affected=len(affected))
+
+    async def reaches(self, source_id: str, target_id: str) -> bool:
+        """O(1): does source transitively depend on / consume target?"""
+        redis = await get_redis()
+        return bool(await redis.sismember(_down(source_id), target_id))
+
+    async def descendants(self, entity_id: str) -> set[str]:
+        """Everything the entity transitively depends on or consumes."""
+        redis = await get_redis()
+        return set(await redis.smembers(_down(entity_id)))
+
+    async def ancestors(self, entity_id: str) -> set[str]:
+        """Every entity that transitively depends on or consumes this one."""
+        redis = await get_redis()
+        return set(await redis.smembers(_up(entity_id)))
+
+    async def begin_rebuild(self) -> None:
+        """Start logging edge changes; call before exporting the edges for `rebuild`."""
+        redis = await get_redis()
+        pipe = redis.pipeline(transaction=True)
+        pipe.delete(_REBUILD_LOG)
+        pipe.set(_REBUILD_ACTIVE, "1", ex=REBUILD_TTL_SECONDS)
+        await pipe.execute()
+
+    async def _log_during_rebuild(self, change: list[str]) -> None:
+        redis = await get_redis()
+        if await redis.exists(_REBUILD_ACTIVE):
+            await redis.rpush(_REBUILD_LOG, json.dumps(change))
+
+    async def rebuild(self, edges: Iterable[tuple[str, str, str]]) -> int:
+        """
+        Replace the whole index from (edge_id, source_id, target_id) tuples, then replay
+        the edge changes logged since `begin_rebuild`, which the export may have missed.
+        """
+        # Keyed str | bytes to match the redis hset(mapping=...) signature
+        edge_pairs: dict[str | bytes, str] = {}
+        pair_counts: dict[str | bytes, int] = {}
+        adjacency: dict[str, set[str]] = {}
+        for edge_id, src, tgt in edges:
+            pair = _pair(src, tgt)
+            edge_pairs[edge_id] = pair
+            pair_counts[pair] = pair_counts.get(pair, 0) + 1
+            adjacency.setdefault(src, set()).add(tgt)
+
+        down = compute_closure(adjacency)
+        up: dict[str, set[str]] = {}
+        for a, reachable in down.items():
+            for d in reachable:
+                up.setdefault(d, set()).add(a)
+
+        redis = await get_redis()
+        stale = [
+            key async for key in redis.scan_iter(match="reach:*", count=1000)
+            if not key.startswith("reach:rebuild:")
+        ]
+        pipe = redis.pipeline(transaction=True)
+        pipe.delete(_EDGES, _PAIRS, *stale)
+        if edge_pairs:
+            pipe.hset(_EDGES, mapping=edge_pairs)
+            pipe.hset(_PAIRS, mapping=pair_counts)
+        for vid, succ in adjacency.items():
+            pipe.sadd(_out(vid), *succ)
+        for vid, reachable in down.items():
+            if reachable:
+                pipe.sadd(_down(vid), *reachable)
+        for vid, reaching in up.items():
+            pipe.sadd(_up(vid), *reaching)
+        # Stop logging and take the log in the same transaction: later changes apply directly
+        pipe.lrange(_REBUILD_LOG, 0, -1)
+        pipe.delete(_REBUILD_LOG, _REBUILD_ACTIVE)
+        logged = (await pipe.execute())[-2]
+
+        for entry in logged:
+            change = json.loads(entry)
+            if change[0] == "add":
+                await self.add_edge(*change[1:])
+            else:
+                await self.remove_edge(change[1])
+
+        logger.info(
+            "reachability.rebuilt",
+            edges=len(edge_pairs), vertices=len(down), replayed=len(logged),
+        )
+        return len(edge_pairs)
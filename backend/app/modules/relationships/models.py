@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
-from typing import Literal
-from pydantic import BaseModel, Field
+from typing import Literal, TypedDict
+from pydantic import BaseModel, Field, model_validator
 import uuid
 
 
@@ -21,6 +21,30 @@ RelationshipType = Literal[
     "monitors",
 ]
 
+Criticality = Literal["low", "medium", "high", "critical"]
+
+# Typed edge properties — stored as individual edge properties so Gremlin can filter on them
+TYPED_EDGE_PROPERTIES: tuple[str, ...] = ("version_constraint", "criticality", "environment")
+
+# Which typed properties each relationship type may carry
+EDGE_PROPERTY_SCHEMA: dict[str, frozenset[str]] = {
+    "depends_on": frozenset({"version_constraint", "criticality", "environment"}),
+    "owned_by": frozenset(),
+    "deployed_to": frozenset({"environment"}),
+    "exposes": frozenset({"criticality", "environment"}),
+    "consumes": frozenset({"version_constraint", "criticality", "environment"}),
+    "causes": frozenset({"criticality"}),
+    "fixes": frozenset(),
+    "part_of": frozenset(),
+    "monitors": frozenset({"environment"}),
+}
+
+
+class TypedEdgeProperties(TypedDict, total=False):
+    version_constraint: str
+    criticality: Criticality
+    environment: str
+
 
 class EdgeCreate(BaseModel):
     source_id: str
@@ -28,7 +52,33 @@ class EdgeCreate(BaseModel):
     target_id: str
     target_label: str
     relationship_type: RelationshipType
-    properties: dict = {}
+    version_constraint: str | None = Field(None, max_length=128)   # e.g. ">=2.1,<3"
+    criticality: Criticality | None = None
+    environment: str | None = Field(None, max_length=64)
+    properties: dict = {}   # free-form extras (stored as JSON, not filterable)
+
+    @model_validator(mode="after")
+    def _check_typed_properties(self) -> "EdgeCreate":
+        allowed = EDGE_PROPERTY_SCHEMA.get(self.relationship_type, frozenset())
+        invalid = [
+            k for k in TYPED_EDGE_PROPERTIES if getattr(self, k) is not None and k not in allowed
+        ]
+        if invalid:
+            raise ValueError(
+                f"Relationship type '{self.relationship_type}' does not support: "
+                f"{', '.join(invalid)}"
+            )
+        return self
+
+    def typed_properties(self) -> TypedEdgeProperties:
+        props: TypedEdgeProperties = {}
+        if self.version_constraint is not None:
+            props["version_constraint"] = self.version_constraint
+        if self.criticality is not None:
+            props["criticality"] = self.criticality
+        if self.environment is not None:
+            props["environment"] = self.environment
+        return props
 
 
 class EdgeEntity(BaseModel):
@@ -38,6 +88,9 @@ class EdgeEntity(BaseModel):
     target_id: str
     target_label: str
     relationship_type: str
+    version_constraint: str | None = None
+    criticality: str | None = None
+    environment: str | None = None
     properties: dict = {}
     created_at: datetime = Field(default_factory=utcnow)
 
@@ -49,6 +102,7 @@ class GraphNode(BaseModel):
     label: str
     name: str
     entity_type: str
+    truncated: bool = False  # known hotspot — neighbours not expanded
 
 
 class GraphEdge(BaseModel):
@@ -56,6 +110,8 @@ class GraphEdge(BaseModel):
     source_id: str
     target_id: str
     relationship_type: str
+    criticality: str | None = None
+    environment: str | None = None
 
 
 class EntityGraph(BaseModel):
@@ -63,3 +119,21 @@ class EntityGraph(BaseModel):
     root_id: str
     nodes: list[GraphNode]
     edges: list[GraphEdge]
+
+
+class DegreeStat(BaseModel):
+    entity_id: str
+    in_degree: int
+    out_degree: int
+
+
+class GraphAnalytics(BaseModel):
+    """Cycle and hotspot report computed offline over a full edge export."""
+    computed_at: datetime
+    vertex_count: int
+    edge_count: int
+    cycles: list[list[str]]                 # depends_on SCCs with more than one vertex
+    top_degree: list[DegreeStat]
+    fan_out_outliers: list[DegreeStat]
+    degree_histogram: dict[str, int]        # power-of-two bucket → vertex count
+    hotspot_ids: list[str]
@@ -1,5 +1,7 @@
+import asyncio
 import json
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from typing import Any
 
@@ -7,16 +9,33 @@ import structlog
 
 from app.clients.cosmos_gremlin import execute_query
 from app.clients.redis_client import get_redis
-from app.modules.relationships.models import EdgeCreate, EdgeEntity, EntityGraph, GraphEdge, GraphNode
+from app.modules.relationships.closure import CLOSURE_EDGE_TYPES, ReachabilityIndex
+from app.modules.relationships.models import (
+    EdgeCreate,
+    EdgeEntity,
+    EntityGraph,
+    GraphAnalytics,
+    GraphEdge,
+    GraphNode,
+)
 
 logger = structlog.get_logger()
 EDGE_CACHE_TTL = 60
+EDGE_PAGE_SIZE = 1000
+HYDRATE_BATCH_SIZE = 500
+ANALYTICS_KEY = "graph:analytics"
 
 
 def _utcnow() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _last_id(results: list[Any]) -> str:
+    """Keyset cursor for the next page: the id of the page's last row."""
+    last = results[-1] if results else None
+    return str(last.get("id", "")) if isinstance(last, dict) else ""
+
+
 def _edge_from_result(result: Any) -> EdgeEntity | None:
     if not isinstance(result, dict):
         return None
@@ -29,10 +48,12 @@ def _edge_from_result(result: Any) -> EdgeEntity | None:
         return v or d
 
     raw_props = p("edge_properties", "{}")
-    try:
-        extra = json.loads(raw_props)
-    except Exception:
-        extra = {}
+    extra: dict = {}
+    if raw_props and raw_props != "{}":
+        try:
+            extra = json.loads(raw_props)
+        except Exception:
+            extra = {}
 
     return EdgeEntity(
         id=result.get("id", ""),
@@ -41,16 +62,39 @@ def _edge_from_result(result: Any) -> EdgeEntity | None:
         target_id=p("target_id"),
         target_label=p("target_label"),
         relationship_type=result.get("label", ""),
+        version_constraint=p("version_constraint", None),
+        criticality=p("criticality", None),
+        environment=p("environment", None),
         properties=extra,
         created_at=datetime.fromisoformat(p("created_at", _utcnow())),
     )
 
 
+def _node_from_projection(result: Any) -> GraphNode | None:
+    """Build a GraphNode from a project('id','label','props') row with valueMap('name','title')."""
+    if not isinstance(result, dict) or not result.get("id"):
+        return None
+    props = result.get("props") or {}
+    name = props.get("name") or props.get("title") or [result["id"]]
+    label = str(result.get("label", ""))
+    return GraphNode(
+        id=str(result["id"]),
+        label=label,
+        name=str(name[0] if isinstance(name, list) and name else name),
+        entity_type=label,
+    )
+
+
 class RelationshipRepository:
+    def __init__(self) -> None:
+        self.reachability = ReachabilityIndex()
+
     async def create(self, data: EdgeCreate) -> EdgeEntity:
         eid = str(uuid.uuid4())
         now = _utcnow()
         props_json = json.dumps(data.properties)
+        typed = data.typed_properties()
+        typed_str = "".join(f".property('{k}', %({k})s)" for k in typed)
 
         execute_query(
             "g.V().has('id', %(source_id)s)"
@@ -62,7 +106,7 @@ class RelationshipRepository:
             ".property('target_id', %(target_id)s)"
             ".property('target_label', %(target_label)s)"
             ".property('edge_properties', %(props)s)"
-            ".property('created_at', %(created_at)s)",
+            f".property('created_at', %(created_at)s){typed_str}",
             {
                 "source_id": data.source_id,
                 "target_id": data.target_id,
@@ -72,6 +116,7 @@ class RelationshipRepository:
                 "target_label": data.target_label,
                 "props": props_json,
                 "created_at": now,
+                **typed,
             },
         )
 
@@ -79,6 +124,9 @@ class RelationshipRepository:
         await redis.delete(f"graph:{data.source_id}")
         await redis.delete(f"graph:{data.target_id}")
 
+        if data.relationship_type in CLOSURE_EDGE_TYPES:
+            await self.reachability.add_edge(eid, data.source_id, data.target_id)
+
         return EdgeEntity(
             id=eid,
             source_id=data.source_id,
@@ -86,6 +134,7 @@ class RelationshipRepository:
             target_id=data.target_id,
             target_label=data.target_label,
             relationship_type=data.relationship_type,
+            **typed,
             properties=data.properties,
             created_at=datetime.fromisoformat(now),
         )
@@ -113,8 +162,169 @@ class RelationshipRepository:
             await redis.delete(f"graph:{source_id}")
         if target_id:
             await redis.delete(f"graph:{target_id}")
+        await self.reachability.remove_edge(edge_id)
         return True
 
+    async def drop_vertex(self, label: str, vertex_id: str) -> None:
+        """Drop a vertex with its edges and take its dependency edges out of the closure."""
+        edge_ids = execute_query(
+            f"g.V().hasLabel('{label}').has('id', %(id)s)"
+            ".bothE().hasLabel(within(%(types)s)).id()",
+            {"id": vertex_id, "types": list(CLOSURE_EDGE_TYPES)},
+        )
+        execute_query(f"g.V().hasLabel('{label}').has('id', %(id)s).drop()", {"id": vertex_id})
+        for eid in edge_ids:
+            await self.reachability.remove_edge(str(eid))
+
+    async def reconcile_outgoing(
+        self,
+        source_id: str,
+        source_label: str,
+        relationship_type: str,
+        targets: dict[str, str],
+        chunk_size: int = HYDRATE_BATCH_SIZE,
+    ) -> tuple[list[str], list[str]]:
+        """
+        Make the source's outgoing edges of one type point at exactly `targets`
+        (target id → label): missing edges are added in chunked union queries, edges to
+        targets no longer listed are dropped in one query. Returns (added, removed)
+        target ids.
+        """
+        rows = execute_query(
+            "g.V().has('id', %(src)s).outE(%(rel_type)s)"
+            ".project('id','tgt').by(id).by(inV().id())",
+            {"src": source_id, "rel_type": relationship_type},
+        )
+        current: dict[str, list[str]] = {}
+        for r in rows:
+            if isinstance(r, dict) and r.get("tgt"):
+                current.setdefault(str(r["tgt"]), []).append(str(r.get("id", "")))
+
+        added = [t for t in targets if t not in current]
+        removed = [t for t in current if t not in targets]
+        stale_edges = [eid for t in removed for eid in current[t]]
+        now = _utcnow()
+        new_edges: list[tuple[str, str]] = []
+
+        for start in range(0, len(added), chunk_size):
+            chunk = added[start:start + chunk_size]
+            params: dict[str, Any] = {
+                "src": source_id,
+                "rel_type": relationship_type,
+                "source_label": source_label,
+                "props": "{}",
+                "created_at": now,
+            }
+            parts: list[str] = []
+            for i, target_id in enumerate(chunk):
+                eid = str(uuid.uuid4())
+                new_edges.append((eid, target_id))
+                params.update({f"t{i}": target_id, f"e{i}": eid, f"tl{i}": targets[target_id]})
+                parts.append(
+                    f"addE(%(rel_type)s).to(g.V().has('id', %(t{i})s))"
+                    f".property('id', %(e{i})s)"
+                    ".property('source_id', %(src)s)"
+                    ".property('source_label', %(source_label)s)"
+                    f".property('target_id', %(t{i})s)"
+                    f".property('target_label', %(tl{i})s)"
+                    ".property('edge_properties', %(props)s)"
+                    ".property('created_at', %(created_at)s)"
+                )
+            execute_query(f"g.V().has('id', %(src)s).union({', '.join(parts)})", params)
+
+        for start in range(0, len(stale_edges), chunk_size):
+            execute_query(
+                "g.E().has('id', within(%(eids)s)).drop()",
+                {"eids": stale_edges[start:start + chunk_size]},
+            )
+
+        if added or removed:
+            redis = await get_redis()
+            await redis.delete(f"graph:{source_id}", *(f"graph:{t}" for t in added + removed))
+        if relationship_type in CLOSURE_EDGE_TYPES:
+            for eid, target_id in new_edges:
+                await self.reachability.add_edge(eid, source_id, target_id)
+            for eid in stale_edges:
+                await self.reachability.remove_edge(eid)
+        return added, removed
+
+    async def iter_edge_endpoints(
+        self,
+        relationship_types: tuple[str, ...] | list[str],
+        page_size: int = EDGE_PAGE_SIZE,
+    ) -> AsyncIterator[tuple[str, str, str]]:
+        """Yield (edge_id, source_id, target_id) for every edge of the given types, paged."""
+        async for edge in self.iter_edges(
+            relationship_types=relationship_types, page_size=page_size
+        ):
+            yield edge.id, edge.source_id, edge.target_id
+
+    async def iter_nodes(
+        self,
+        labels: list[str] | None = None,
+        page_size: int = EDGE_PAGE_SIZE,
+    ) -> AsyncIterator[GraphNode]:
+        """Yield lightweight nodes for every vertex (optionally restricted to labels), by id."""
+        traversal = "g.V().hasLabel(within(%(labels)s))" if labels else "g.V()"
+        after = ""
+        while True:
+            results = await asyncio.to_thread(
+                execute_query,
+                f"{traversal}.has('id', gt(%(after)s)).order().by(id).limit(%(limit)s)"
+                ".project('id','label','props').by(id).by(label).by(valueMap('name','title'))",
+                {"labels": labels or [], "after": after, "limit": page_size},
+            )
+            for r in results:
+                node = _node_from_projection(r)
+                if node:
+                    yield node
+            after = _last_id(results)
+            if len(results) < page_size or not after:
+                return
+
+    async def iter_edges(
+        self,
+        relationship_types: tuple[str, ...] | list[str] | None = None,
+        labels: list[str] | None = None,
+        page_size: int = EDGE_PAGE_SIZE,
+    ) -> AsyncIterator[GraphEdge]:
+        """
+        Yield edges as (id, type, source, target) tuples, paged by id.
+        When labels are given, only edges whose endpoints both carry one of them are returned.
+        """
+        traversal = "g.E()"
+        if relationship_types:
+            traversal += ".hasLabel(within(%(types)s))"
+        if labels:
+            traversal += (
+                ".where(outV().hasLabel(within(%(labels)s)))"
+                ".where(inV().hasLabel(within(%(labels)s)))"
+            )
+        after = ""
+        while True:
+            results = await asyncio.to_thread(
+                execute_query,
+                f"{traversal}.has('id', gt(%(after)s)).order().by(id).limit(%(limit)s)"
+                ".project('id','label','src','tgt').by(id).by(label).by(outV().id()).by(inV().id())",
+                {
+                    "types": list(relationship_types or []),
+                    "labels": labels or [],
+                    "after": after,
+                    "limit": page_size,
+                },
+            )
+            for r in results:
+                if isinstance(r, dict) and r.get("src") and r.get("tgt"):
+                    yield GraphEdge(
+                        id=str(r.get("id", "")),
+                        source_id=str(r["src"]),
+                        target_id=str(r["tgt"]),
+                        relationship_type=str(r.get("label", "")),
+                    )
+            after = _last_id(results)
+            if len(results) < page_size or not after:
+                return
+
     async def get_edges_for_entity(self, entity_id: str) -> list[EdgeEntity]:
         """Return all edges (in + out) connected to an entity vertex."""
         results = execute_query(
@@ -128,77 +338,114 @@ class RelationshipRepository:
                 edges.append(e)
         return edges
 
-    async def get_graph(self, entity_id: str, depth: int = 2) -> EntityGraph:
-        """Build a subgraph around the given entity up to `depth` hops."""
+    async def save_analytics(self, analytics: GraphAnalytics) -> None:
+        redis = await get_redis()
+        await redis.set(ANALYTICS_KEY, analytics.model_dump_json())
+
+    async def get_analytics(self) -> GraphAnalytics | None:
+        redis = await get_redis()
+        cached = await redis.get(ANALYTICS_KEY)
+        return GraphAnalytics.model_validate_json(cached) if cached else None
+
+    async def _hydrate_nodes(self, vertex_ids: list[str]) -> list[GraphNode]:
+        """Resolve id → (label, name) once per vertex, in batches, instead of once per edge."""
+        nodes: list[GraphNode] = []
+        for i in range(0, len(vertex_ids), HYDRATE_BATCH_SIZE):
+            results = execute_query(
+                "g.V().has('id', within(%(ids)s))"
+                ".project('id','label','props').by(id).by(label).by(valueMap('name','title'))",
+                {"ids": vertex_ids[i:i + HYDRATE_BATCH_SIZE]},
+            )
+            for r in results:
+                node = _node_from_projection(r)
+                if node:
+                    nodes.append(node)
+        return nodes
+
+    async def get_graph(
+        self,
+        entity_id: str,
+        depth: int = 2,
+        criticality: list[str] | None = None,
+        environment: str | None = None,
+    ) -> EntityGraph:
+        """
+        Build a subgraph around the given entity up to `depth` hops.
+        criticality / environment prune edges inside the traversal (typed edge properties).
+        """
         cache_key = f"graph:{entity_id}:{depth}"
+        if criticality or environment:
+            cache_key += f":{','.join(sorted(criticality or []))}:{environment or ''}"
+        edge_filter = ""
+        if criticality:
+            edge_filter += ".has('criticality', within(%(criticality)s))"
+        if environment:
+            edge_filter += ".has('environment', %(environment)s)"
         redis = await get_redis()
 
         cached = await redis.get(cache_key)
         if cached:
             return EntityGraph(**json.loads(cached))
 
-        # Collect vertices and edges via BFS
-        visited_vertices: dict[str, GraphNode] = {}
+        # Known super-nodes (from the offline analytics job) are shown but not expanded
+        analytics = await self.get_analytics()
+        hotspots = set(analytics.hotspot_ids) if analytics else set()
+
+        # BFS over edge tuples only — endpoint vertices are hydrated once, at the end
+        visited: set[str] = {entity_id}
         collected_edges: list[GraphEdge] = []
+        seen_edges: set[str] = set()
         frontier = [entity_id]
 
         for _ in range(depth):
             if not frontier:
                 break
             results = execute_query(
-                "g.V().has('id', within(%(ids)s)).bothE().project('edge','src','tgt')"
-                ".by().by(outV()).by(inV())",
-                {"ids": frontier},
+                f"g.V().has('id', within(%(ids)s)).bothE(){edge_filter}.dedup()"
+                ".project('id','label','src','tgt','props')"
+                ".by(id).by(label).by(outV().id()).by(inV().id())"
+                ".by(valueMap('criticality','environment'))",
+                {
+                    "ids": frontier,
+                    "criticality": criticality or [],
+                    "environment": environment or "",
+                },
             )
             next_frontier: list[str] = []
             for item in results:
                 if not isinstance(item, dict):
                     continue
-                edge = item.get("edge", {})
-                src = item.get("src", {})
-                tgt = item.get("tgt", {})
-
-                def _node_name(v: dict) -> str:
-                    p = v.get("properties", {})
-                    n = p.get("name", [{}])
-                    return n[0].get("value", v.get("id", "?")) if isinstance(n, list) and n else "?"
-
-                src_id = src.get("id", "")
-                tgt_id = tgt.get("id", "")
-
-                if src_id and src_id not in visited_vertices:
-                    visited_vertices[src_id] = GraphNode(
-                        id=src_id,
-                        label=src.get("label", ""),
-                        name=_node_name(src),
-                        entity_type=src.get("label", ""),
-                    )
-                    next_frontier.append(src_id)
-
-                if tgt_id and tgt_id not in visited_vertices:
-                    visited_vertices[tgt_id] = GraphNode(
-                        id=tgt_id,
-                        label=tgt.get("label", ""),
-                        name=_node_name(tgt),
-                        entity_type=tgt.get("label", ""),
-                    )
-                    next_frontier.append(tgt_id)
-
-                eid = edge.get("id", str(uuid.uuid4()))
+                eid = str(item.get("id") or uuid.uuid4())
+                if eid in seen_edges:
+                    continue
+                seen_edges.add(eid)
+                src_id = str(item.get("src", ""))
+                tgt_id = str(item.get("tgt", ""))
+                edge_props = item.get("props") or {}
                 collected_edges.append(
                     GraphEdge(
                         id=eid,
                         source_id=src_id,
                         target_id=tgt_id,
-                        relationship_type=edge.get("label", ""),
+                        relationship_type=str(item.get("label", "")),
+                        criticality=edge_props.get("criticality"),
+                        environment=edge_props.get("environment"),
                     )
                 )
+                for vid in (src_id, tgt_id):
+                    if vid and vid not in visited:
+                        visited.add(vid)
+                        next_frontier.append(vid)
+
+            frontier = [v for v in next_frontier if v not in hotspots]
 
-            frontier = [v for v in next_frontier if v not in visited_vertices]
+        nodes = await self._hydrate_nodes(list(visited))
+        for node in nodes:
+            node.truncated = node.id in hotspots and node.id != entity_id
 
         graph = EntityGraph(
             root_id=entity_id,
-            nodes=list(visited_vertices.values()),
+            nodes=nodes,
             edges=collected_edges,
         )
         await redis.setex(cache_key, EDGE_CACHE_TTL, graph.model_dump_json())
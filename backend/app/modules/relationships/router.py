@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from app.core.deps import get_current_user
 from app.core.exceptions import NotFoundError
-from app.modules.relationships.models import EdgeCreate
+from app.modules.relationships.models import Criticality, EdgeCreate
 from app.modules.relationships.repository import RelationshipRepository
 
 router = APIRouter(prefix="/api/v1/relationships", tags=["relationships"])
@@ -32,11 +37,67 @@ async def get_entity_relationships(entity_id: str, _=Depends(get_current_user)):
     return _ok([e.model_dump() for e in edges])
 
 
+@router.get("/reachability")
+async def check_reachability(
+    source_id: str, target_id: str, _: dict[str, Any] = Depends(get_current_user)
+) -> dict[str, Any]:
+    """Does source transitively depend on / consume target? Answered from the closure index."""
+    reachable = await _repo.reachability.reaches(source_id, target_id)
+    return _ok({"source_id": source_id, "target_id": target_id, "reachable": reachable})
+
+
+@router.get("/closure/{entity_id}")
+async def get_dependency_closure(
+    entity_id: str,
+    direction: Literal["downstream", "upstream"] = "downstream",
+    _: dict[str, Any] = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    downstream: everything the entity transitively depends on or consumes.
+    upstream: every entity that transitively depends on or consumes it.
+    """
+    if direction == "downstream":
+        ids = await _repo.reachability.descendants(entity_id)
+    else:
+        ids = await _repo.reachability.ancestors(entity_id)
+    return _ok(sorted(ids), {"direction": direction, "total": len(ids)})
+
+
 @router.get("/graph/{entity_id}")
 async def get_entity_graph(
     entity_id: str,
     depth: int = 2,
+    criticality: list[Criticality] | None = Query(
+        default=None, description="Only follow edges with these criticalities"
+    ),
+    environment: str | None = Query(
+        default=None, description="Only follow edges for this environment"
+    ),
     _=Depends(get_current_user),
 ):
-    graph = await _repo.get_graph(entity_id, depth=min(depth, 3))
+    graph = await _repo.get_graph(
+        entity_id,
+        depth=min(depth, 3),
+        criticality=list(criticality) if criticality else None,
+        environment=environment,
+    )
     return _ok(graph.model_dump())
+
+
+@router.get("/export")
+async def export_graph(
+    labels: list[str] | None = Query(default=None, description="Restrict to these vertex labels"),
+    _: dict[str, Any] = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream the catalog graph as NDJSON: one {"type": "node", ...} line per vertex,
+    followed by one {"type": "edge", ...} line per edge. Generated page by page,
+    so memory stays bounded regardless of graph size.
+    """
+    async def _lines() -> AsyncIterator[str]:
+        async for node in _repo.iter_nodes(labels=labels):
+            yield json.dumps({"type": "node", **node.model_dump()}) + "\n"
+        async for edge in _repo.iter_edges(labels=labels):
+            yield json.dumps({"type": "edge", **edge.model_dump()}) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
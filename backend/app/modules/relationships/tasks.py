@@ -0,0 +1,45 @@
+import structlog
+from celery import Task
+
+from app.modules.relationships.analytics import analyse_edges
+from app.modules.relationships.closure import CLOSURE_EDGE_TYPES
+from app.modules.relationships.repository import RelationshipRepository
+from app.workers.runtime import async_task
+
+logger = structlog.get_logger()
+
+
+# ─── Reachability index reconciliation ───────────────────────────────────────
+
+@async_task(name="relationships.rebuild_reachability", bind=True, max_retries=2)
+async def rebuild_reachability(self: Task) -> int:
+    """Rebuild the dependency closure from a full export of depends_on/consumes edges."""
+    try:
+        repo = RelationshipRepository()
+        await repo.reachability.begin_rebuild()
+        edges = [e async for e in repo.iter_edge_endpoints(CLOSURE_EDGE_TYPES)]
+        return await repo.reachability.rebuild(edges)
+    except Exception as e:
+        logger.error("reachability.rebuild_failed", error=str(e))
+        raise self.retry(exc=e, countdown=120) from e
+
+
+# ─── Cycle / hotspot analytics ───────────────────────────────────────────────
+
+@async_task(name="relationships.analyse_graph", bind=True, max_retries=2)
+async def analyse_graph(self: Task) -> None:
+    """Export every edge, compute SCCs and degree outliers, and store the report."""
+    try:
+        repo = RelationshipRepository()
+        edges = [e async for e in repo.iter_edges()]
+        analytics = analyse_edges(edges)
+        await repo.save_analytics(analytics)
+        logger.info(
+            "graph.analytics.done",
+            edges=analytics.edge_count,
+            cycles=len(analytics.cycles),
+            hotspots=len(analytics.hotspot_ids),
+        )
+    except Exception as e:
+        logger.error("graph.analytics.failed", error=str(e))
+        raise self.retry(exc=e, countdown=300) from e
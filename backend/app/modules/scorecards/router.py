@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from app.core.security import get_current_user
+from app.core.deps import get_current_user
 from app.modules.scorecards.service import ScorecardService
 
 router = APIRouter(prefix="/api/v1/scorecards", tags=["scorecards"])
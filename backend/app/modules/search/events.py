@@ -0,0 +1,226 @@
+"""
+Catalog change events and search index synchronisation.
+
+Every entity write (EntityRepository, ServiceRepository — and therefore every ingestion
+task, which writes through them) appends an event to the `catalog:changes` Redis stream.
+Each API worker runs a SearchIndexSync that tails the stream and applies events to its
+in-process index, with a periodic reconcile to repair anything missed.
+
+Full rebuilds are persisted as a snapshot (see search.snapshot); a starting worker
+loads it and replays the stream from the snapshot's offset instead of scanning Cosmos.
+Per reconcile interval one worker, holding a Redis lock, rescans Cosmos and rewrites
+the snapshot; the others reload that snapshot and replay the stream from its offset.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import time
+from collections.abc import Sequence
+from dataclasses import asdict
+from typing import Any
+
+import structlog
+from pydantic import BaseModel
+
+from app.clients.redis_client import get_redis
+from app.config import get_settings
+from app.modules.search.index import (
+    IndexedDocument,
+    SearchIndex,
+    document_from_entity,
+    get_search_index,
+)
+from app.modules.search.models import SEARCHABLE_LABELS
+from app.modules.search.snapshot import read_snapshot, write_snapshot
+
+logger = structlog.get_logger()
+
+CHANGE_STREAM = "catalog:changes"
+STREAM_READ_COUNT = 500
+STREAM_BLOCK_MS = 1000
+RECONCILE_LOCK = "search:reconcile:lock"
+
+
+async def publish_change(label: str, entity_id: str, entity: BaseModel | None = None) -> None:
+    """
+    Record an upsert (entity given) or delete (entity None). The local index is updated
+    immediately so the writing worker reads its own writes; other workers catch up from
+    the stream. A Redis failure is logged, not raised — reconciliation repairs the gap.
+    """
+    await publish_changes(label, [(entity_id, entity)])
+
+
+async def publish_changes(
+    label: str, changes: Sequence[tuple[str, BaseModel | None]]
+) -> None:
+    """publish_change for a batch of (id, entity) pairs, appended in one pipeline."""
+    if label not in SEARCHABLE_LABELS or not changes:
+        return
+    index = get_search_index()
+    events: list[dict[str, str]] = []
+    for entity_id, entity in changes:
+        doc = document_from_entity(label, entity) if entity is not None else None
+        if index.ready:
+            if doc is not None:
+                index.upsert(doc)
+            else:
+                index.remove(entity_id)
+        fields = {"op": "upsert" if doc else "delete", "label": label, "id": entity_id}
+        if doc is not None:
+            fields["doc"] = json.dumps(asdict(doc))
+        events.append(fields)
+
+    maxlen = get_settings().search_change_stream_maxlen
+    try:
+        redis = await get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for fields in events:
+                pipe.xadd(CHANGE_STREAM, fields, maxlen=maxlen, approximate=True)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(
+            "catalog.change_event.failed", label=label, count=len(events), error=str(e)
+        )
+
+
+def apply_change(index: SearchIndex, fields: dict[str, Any]) -> None:
+    if fields.get("op") == "delete":
+        index.remove(str(fields.get("id", "")))
+        return
+    raw = fields.get("doc")
+    if raw:
+        index.upsert(IndexedDocument(**json.loads(raw)))
+
+
+async def stream_tail() -> str:
+    """Id of the newest event, or "0-0" when the stream is empty."""
+    redis = await get_redis()
+    latest = await redis.xrevrange(CHANGE_STREAM, count=1)
+    return str(latest[0][0]) if latest else "0-0"
+
+
+async def stream_covers(stream_id: str) -> bool:
+    """True if every event after stream_id is still retained (not trimmed away)."""
+    redis = await get_redis()
+    if stream_id == "0-0":
+        return await redis.xlen(CHANGE_STREAM) < get_settings().search_change_stream_maxlen
+    return bool(await redis.xrange(CHANGE_STREAM, min=stream_id, max=stream_id))
+
+
+class SearchIndexSync:
+    def __init__(
+        self,
+        index: SearchIndex | None = None,
+        reconcile_interval: float | None = None,
+        snapshot_path: str | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.index = index if index is not None else get_search_index()
+        self.reconcile_interval = (
+            reconcile_interval
+            if reconcile_interval is not None
+            else settings.search_reconcile_interval_seconds
+        )
+        self.snapshot_path = (
+            snapshot_path if snapshot_path is not None else settings.search_snapshot_path
+        )
+        self.last_id = "0-0"
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._last_rebuild = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    async def rebuild(self, snapshot: bool = True) -> None:
+        """Full catalog scan; events after last_id are re-applied on the next poll."""
+        from app.modules.search.service import load_catalog_documents
+
+        docs = await asyncio.to_thread(load_catalog_documents)
+        self.index.replace_all(docs)
+        self._last_rebuild = time.monotonic()
+        logger.info("search.index.rebuilt", documents=len(docs), stream_id=self.last_id)
+        if snapshot and self.snapshot_path:
+            try:
+                size = await asyncio.to_thread(
+                    write_snapshot, self.snapshot_path, docs, self.last_id
+                )
+                logger.info("search.snapshot.written", path=self.snapshot_path, bytes=size)
+            except OSError as e:
+                logger.warning(
+                    "search.snapshot.write_failed", path=self.snapshot_path, error=str(e)
+                )
+
+    async def reconcile(self) -> None:
+        """Rescan Cosmos if this worker wins the interval's lock, else reload the snapshot."""
+        self._last_rebuild = time.monotonic()
+        if not self.snapshot_path or await self._claim_reconcile():
+            await self.rebuild()
+        elif not await self.load_snapshot():
+            logger.info("search.index.reconcile_skipped", reason="no usable snapshot")
+
+    async def _claim_reconcile(self) -> bool:
+        """SET NX for one reconcile interval: the winner is the cluster's only scanner."""
+        redis = await get_redis()
+        ttl_ms = max(1000, int(self.reconcile_interval * 1000))
+        return bool(await redis.set(RECONCILE_LOCK, self.worker_id, nx=True, px=ttl_ms))
+
+    async def load_snapshot(self) -> bool:
+        """Seed the index from disk; False if there is no usable snapshot."""
+        if not self.snapshot_path:
+            return False
+        snapshot = await asyncio.to_thread(read_snapshot, self.snapshot_path)
+        if snapshot is None:
+            return False
+        if not await stream_covers(snapshot.stream_id):
+            logger.info("search.snapshot.stale", stream_id=snapshot.stream_id)
+            return False
+        self.index.replace_all(snapshot.documents)
+        self.last_id = snapshot.stream_id
+        self._last_rebuild = time.monotonic()
+        logger.info(
+            "search.snapshot.loaded", documents=len(snapshot.documents), stream_id=self.last_id
+        )
+        return True
+
+    async def start(self) -> None:
+        try:
+            if not await self.load_snapshot():
+                # Note the tail first so writes racing the scan are replayed afterwards
+                self.last_id = await stream_tail()
+                await self.rebuild(snapshot=await self._claim_reconcile())
+        except Exception as e:
+            logger.warning("search.index.build_failed", error=str(e))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def poll_once(self, block_ms: int | None = STREAM_BLOCK_MS) -> int:
+        """Apply the next batch of events; returns how many were applied."""
+        redis = await get_redis()
+        batches = await redis.xread(
+            {CHANGE_STREAM: self.last_id}, count=STREAM_READ_COUNT, block=block_ms
+        )
+        applied = 0
+        for _stream, entries in batches or []:
+            for entry_id, fields in entries:
+                apply_change(self.index, fields)
+                self.last_id = str(entry_id)
+                applied += 1
+        return applied
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if time.monotonic() - self._last_rebuild >= self.reconcile_interval:
+                    await self.reconcile()
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("search.index.sync_error", error=str(e))
+                await asyncio.sleep(5)
@@ -0,0 +1,977 @@
+"""
+In-process inverted index over catalog entities, used by /api/v1/search.
+
+There is one index per worker process. It is loaded at startup from a snapshot or
+a full catalog scan and kept current from catalog change events (see search.events).
+Queries are parsed by search.query and evaluated as bitset operations.
+
+Top-k ranking (SearchIndex.score_top) follows Fagin's threshold algorithm: each
+term's posting list and the name-bonus list are read round robin in impact order,
+and every newly seen match is scored in full. An unseen match scores at most the
+sum of the list heads' impacts, so reading stops once the limit-th best hit ranks
+ahead of that bound. It is skipped, in favour of scoring every match, when more than
+_TOP_K_MAX_LISTS lists make the bound too loose or the lists are mostly non-matches.
+"""
+import bisect
+import heapq
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.modules.search.models import NAME_PROPERTY
+from app.modules.search.query import (
+    TOKEN_RE,
+    And,
+    Filter,
+    Node,
+    Not,
+    Or,
+    Text,
+    parse_query,
+    scoring_tokens,
+    tokenize,
+)
+
+SEARCH_FIELDS: tuple[str, ...] = ("name", "tags", "description")
+# Facets reported with every search; team/lifecycle/status come from document attributes
+FACET_FIELDS: tuple[str, ...] = ("entity_type", "tag", "team", "lifecycle", "status")
+FACET_VALUE_LIMIT = 20
+
+# Entity fields that are never exposed as filterable attributes
+_NON_ATTRIBUTE_FIELDS = frozenset(
+    {"id", "entity_type", "name", "title", "description", "tags", "created_at", "updated_at"}
+)
+
+# Compact the document table once this fraction of slots are tombstones
+_COMPACT_RATIO = 0.5
+
+# Completion entry kinds in the sorted typeahead array
+COMPLETION_NAME = 0
+COMPLETION_TAG = 1
+# Upper bound on completion entries inspected per suggest call
+_SUGGEST_SCAN_LIMIT = 2000
+# Top-k pruning pays off for many matches over few posting lists that are mostly matches
+# (not, say, two common words that rarely co-occur); otherwise every match is scored
+_TOP_K_MIN_MATCHES = 256
+_TOP_K_MAX_LISTS = 8
+_TOP_K_MIN_DENSITY = 0.25
+# Cached posting-list bitsets and impact orders (oldest evicted first)
+_TERM_CACHE_SIZE = 2048
+
+# Tie-break order for equal scores: tokenised name, lower-cased name, id
+RankKey = tuple[str, str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class RankingParams:
+    """BM25 parameters, per-field boosts and whole-name bonuses."""
+    k1: float = 1.2
+    b: float = 0.75
+    name_boost: float = 3.0
+    tag_boost: float = 2.0
+    description_boost: float = 1.0
+    prefix_weight: float = 0.7        # weight of a prefix expansion relative to an exact token
+    exact_name_bonus: float = 5.0     # normalised name == normalised query
+    name_prefix_bonus: float = 2.0    # normalised name starts with normalised query
+    fuzzy_weight: float = 0.5         # weight of a typo-corrected term (times its similarity)
+    fuzzy_min_dice: float = 0.35      # trigram overlap needed to consider a term at all
+
+    def boost(self, field_name: str) -> float:
+        if field_name == "name":
+            return self.name_boost
+        if field_name == "tags":
+            return self.tag_boost
+        return self.description_boost
+
+
+@dataclass(slots=True)
+class IndexedDocument:
+    id: str
+    entity_type: str
+    name: str
+    description: str = ""
+    tags: list[str] = field(default_factory=list)
+    attributes: dict[str, Any] = field(default_factory=dict)   # team, lifecycle, cve_count, …
+
+
+def document_from_entity(label: str, entity: BaseModel) -> IndexedDocument:
+    data = entity.model_dump(mode="json")
+    return IndexedDocument(
+        id=str(data.get("id", "")),
+        entity_type=label,
+        name=str(data.get(NAME_PROPERTY.get(label, "name"), "")),
+        description=str(data.get("description", "") or ""),
+        tags=[str(t) for t in data.get("tags", []) or []],
+        attributes={
+            k: v
+            for k, v in data.items()
+            if k not in _NON_ATTRIBUTE_FIELDS and isinstance(v, str | int | float) and v != ""
+        },
+    )
+
+
+class SearchIndex:
+    def __init__(self) -> None:
+        self.ready = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._docs: list[IndexedDocument | None] = []
+        self._slots: dict[str, int] = {}
+        # field → token → {doc slot: term frequency}
+        self._postings: dict[str, dict[str, dict[int, int]]] = {f: {} for f in SEARCH_FIELDS}
+        # Sorted vocabulary (prefix expansion), per-term field count, trigram → terms (fuzzy)
+        self._vocab: list[str] = []
+        self._term_refs: dict[str, int] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        # field → per-slot token count, and running totals for the average field length
+        self._lengths: dict[str, list[int]] = {f: [] for f in SEARCH_FIELDS}
+        self._length_totals: dict[str, int] = dict.fromkeys(SEARCH_FIELDS, 0)
+        # Cached BM25 length normalisation per slot, invalidated by writes
+        self._norms: tuple[tuple[float, float], dict[str, list[float]]] | None = None
+        # (field, token) → [(tf / (tf + norm), slot)] in rank order; dropped with _norms
+        self._impacts: dict[tuple[str, str], list[tuple[float, int]]] = {}
+        # Per-slot tie-break key (tokenised name, lower-cased name, id), and the same keys
+        # sorted with their slots: names equal to / starting with a phrase are one range
+        self._rank_keys: list[RankKey] = []
+        self._name_keys: list[tuple[str, str, str, int]] = []
+        # Sorted (completion key, kind, slot) entries for prefix typeahead
+        self._completions: list[tuple[str, int, int]] = []
+        # facet → value → bitset of slots (Python int, bit i = slot i)
+        self._facets: dict[str, dict[str, int]] = {f: {} for f in FACET_FIELDS}
+        # Bitset of live (non-tombstoned) slots — the universe for negation
+        self._live = 0
+        # (field, token) → bitset of its posting list, built on first use, dropped by writes
+        self._term_bits: dict[tuple[str, str], int] = {}
+        # attribute → lower-cased value → slots, and its bitset cached like _term_bits
+        self._attr_postings: dict[str, dict[str, set[int]]] = {}
+        self._attr_bits: dict[tuple[str, str], int] = {}
+        # attribute → sorted (numeric value, slot) for range filters, and the bitsets of
+        # ranges already asked for (dropped whenever a number of that attribute changes)
+        self._numeric: dict[str, list[tuple[float, int]]] = {}
+        self._range_bits: dict[str, dict[tuple[str, float], int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._slots
+
+    # ── Maintenance ──────────────────────────────────────────────────────────
+
+    def replace_all(self, docs: list[IndexedDocument]) -> None:
+        """Rebuild from scratch (startup / reconciliation)."""
+        self._load(docs)
+        self.ready = True
+
+    def _load(self, docs: list[IndexedDocument]) -> None:
+        """Bulk load: completion entries are appended and sorted once at the end."""
+        self._reset()
+        for doc in docs:
+            if doc.id in self._slots:
+                self.remove(doc.id)
+            self._add(doc, bulk=True)
+        self._vocab.sort()
+        self._completions.sort()
+        self._name_keys.sort()
+        for values in self._numeric.values():
+            values.sort()
+
+    def upsert(self, doc: IndexedDocument) -> None:
+        if doc.id in self._slots:
+            self.remove(doc.id)
+        self._add(doc, bulk=False)
+
+    def _add(self, doc: IndexedDocument, bulk: bool) -> None:
+        slot = len(self._docs)
+        self._docs.append(doc)
+        self._slots[doc.id] = slot
+        self._norms = None
+        for fname, tokens in _field_tokens(doc).items():
+            self._lengths[fname].append(len(tokens))
+            self._length_totals[fname] += len(tokens)
+            postings = self._postings[fname]
+            for tok in tokens:
+                p = postings.get(tok)
+                if p is None:
+                    postings[tok] = p = {}
+                    self._term_added(tok, bulk)
+                p[slot] = p.get(slot, 0) + 1
+                self._term_bits.pop((fname, tok), None)
+        rank_key = (" ".join(tokenize(doc.name)), doc.name.lower(), doc.id)
+        self._rank_keys.append(rank_key)
+        if bulk:
+            self._name_keys.append((*rank_key, slot))
+        else:
+            bisect.insort(self._name_keys, (*rank_key, slot))
+        bit = 1 << slot
+        self._live |= bit
+        for facet, value in _facet_values(doc):
+            values = self._facets[facet]
+            values[value] = values.get(value, 0) | bit
+        for attr, value, number in _attribute_values(doc):
+            self._attr_postings.setdefault(attr, {}).setdefault(value, set()).add(slot)
+            self._attr_bits.pop((attr, value), None)
+            if number is None:
+                continue
+            self._range_bits.pop(attr, None)
+            if bulk:
+                self._numeric.setdefault(attr, []).append((number, slot))
+            else:
+                bisect.insort(self._numeric.setdefault(attr, []), (number, slot))
+        for key, kind in _completion_keys(doc):
+            if bulk:
+                self._completions.append((key, kind, slot))
+            else:
+                bisect.insort(self._completions, (key, kind, slot))
+
+    def remove(self, entity_id: str) -> bool:
+        slot = self._slots.pop(entity_id, None)
+        if slot is None:
+            return False
+        doc = self._docs[slot]
+        self._docs[slot] = None
+        self._norms = None
+        self._live &= ~(1 << slot)
+        for fname in SEARCH_FIELDS:
+            self._length_totals[fname] -= self._lengths[fname][slot]
+            self._lengths[fname][slot] = 0
+        entry = (*self._rank_keys[slot], slot)
+        i = bisect.bisect_left(self._name_keys, entry)
+        if i < len(self._name_keys) and self._name_keys[i] == entry:
+            del self._name_keys[i]
+        if doc is not None:
+            for fname, tokens in _field_tokens(doc).items():
+                postings = self._postings[fname]
+                for tok in set(tokens):
+                    p = postings.get(tok)
+                    if p is None:
+                        continue
+                    p.pop(slot, None)
+                    self._term_bits.pop((fname, tok), None)
+                    if not p:
+                        del postings[tok]
+                        self._term_removed(tok)
+            clear = ~(1 << slot)
+            for facet, value in _facet_values(doc):
+                values = self._facets[facet]
+                remaining = values.get(value, 0) & clear
+                if remaining:
+                    values[value] = remaining
+                else:
+                    values.pop(value, None)
+            for attr, value, number in _attribute_values(doc):
+                by_value = self._attr_postings[attr]
+                by_value[value].discard(slot)
+                if not by_value[value]:
+                    del by_value[value]
+                self._attr_bits.pop((attr, value), None)
+                if number is not None:
+                    self._range_bits.pop(attr, None)
+                    numbers = self._numeric[attr]
+                    del numbers[bisect.bisect_left(numbers, (number, slot))]
+            for key, kind in _completion_keys(doc):
+                i = bisect.bisect_left(self._completions, (key, kind, slot))
+                if i < len(self._completions) and self._completions[i] == (key, kind, slot):
+                    del self._completions[i]
+        if len(self._docs) - len(self._slots) > _COMPACT_RATIO * max(len(self._docs), 1):
+            self._compact()
+        return True
+
+    def _term_added(self, term: str, bulk: bool) -> None:
+        refs = self._term_refs.get(term, 0)
+        self._term_refs[term] = refs + 1
+        if refs:
+            return
+        if bulk:
+            self._vocab.append(term)
+        else:
+            bisect.insort(self._vocab, term)
+        for gram in trigrams(term):
+            self._trigrams.setdefault(gram, set()).add(term)
+
+    def _term_removed(self, term: str) -> None:
+        refs = self._term_refs.get(term, 0) - 1
+        if refs > 0:
+            self._term_refs[term] = refs
+            return
+        self._term_refs.pop(term, None)
+        i = bisect.bisect_left(self._vocab, term)
+        if i < len(self._vocab) and self._vocab[i] == term:
+            del self._vocab[i]
+        for gram in trigrams(term):
+            terms = self._trigrams.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._trigrams[gram]
+
+    def _compact(self) -> None:
+        self._load([d for d in self._docs if d is not None])
+
+    # ── Lookup ───────────────────────────────────────────────────────────────
+
+    def get(self, entity_id: str) -> IndexedDocument | None:
+        slot = self._slots.get(entity_id)
+        return self._docs[slot] if slot is not None else None
+
+    def documents(self) -> list[IndexedDocument]:
+        return [d for d in self._docs if d is not None]
+
+    def expand_prefix(self, prefix: str) -> list[str]:
+        """All indexed terms starting with prefix (binary search over the sorted vocabulary)."""
+        lo = bisect.bisect_left(self._vocab, prefix)
+        hi = bisect.bisect_left(self._vocab, prefix + "\uffff")
+        return self._vocab[lo:hi]
+
+    def fuzzy_terms(self, token: str, params: RankingParams) -> list[tuple[str, float]]:
+        """
+        Typo candidates for a token: terms sharing enough trigrams (Dice ≥ fuzzy_min_dice),
+        verified with a bounded edit distance. Returns (term, similarity in 0..1).
+        """
+        max_edits = 1 if len(token) <= 5 else 2
+        if len(token) < 3:
+            return []
+        grams = trigrams(token)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        matches: list[tuple[str, float]] = []
+        for term, count in shared.items():
+            if abs(len(term) - len(token)) > max_edits:
+                continue
+            if 2 * count / (len(grams) + len(trigrams(term))) < params.fuzzy_min_dice:
+                continue
+            dist = edit_distance(token, term, max_edits)
+            if dist <= max_edits:
+                matches.append((term, 1 - dist / max(len(token), len(term))))
+        return matches
+
+    def expand(
+        self, token: str, params: RankingParams, fuzzy: bool = False
+    ) -> list[tuple[str, float]]:
+        """
+        Weighted index terms for a query token: exact, prefix expansions, and typo
+        corrections only when fuzzy is on and nothing matches by prefix.
+        """
+        terms = [
+            (t, 1.0 if t == token else params.prefix_weight) for t in self.expand_prefix(token)
+        ]
+        if not terms and fuzzy:
+            terms = [(t, params.fuzzy_weight * sim) for t, sim in self.fuzzy_terms(token, params)]
+        return terms
+
+    def _term_bitset(self, fname: str, term: str) -> int:
+        bits = self._term_bits.get((fname, term))
+        if bits is None:
+            bits = self.bitset(self._postings[fname].get(term, ()))
+            _cache_put(self._term_bits, (fname, term), bits)
+        return bits
+
+    def _match_bits(
+        self, terms: list[tuple[str, float]], fields: tuple[str, ...] = SEARCH_FIELDS
+    ) -> int:
+        bits = 0
+        for term, _ in terms:
+            for fname in fields:
+                if term in self._postings[fname]:
+                    bits |= self._term_bitset(fname, term)
+        return bits
+
+    def _length_norms(self, params: RankingParams) -> dict[str, list[float]]:
+        """k1 · (1 − b + b · len/avg_len) per field and slot — the BM25 denominator term."""
+        key = (params.k1, params.b)
+        if self._norms is None or self._norms[0] != key:
+            n = max(len(self._slots), 1)
+            norms: dict[str, list[float]] = {}
+            for fname in SEARCH_FIELDS:
+                avg = (self._length_totals[fname] / n) or 1.0
+                base = params.k1 * (1 - params.b)
+                scale = params.k1 * params.b / avg
+                norms[fname] = [base + scale * length for length in self._lengths[fname]]
+            self._norms = (key, norms)
+            self._impacts = {}
+        return self._norms[1]
+
+    def filter_types(self, bits: int, entity_types: list[str] | None) -> int:
+        """Restrict a match bitset to entity types; returns `bits` itself if none is excluded."""
+        by_type = self._facets["entity_type"]
+        if not entity_types or set(entity_types) >= set(by_type):
+            return bits
+        allowed = 0
+        for entity_type in entity_types:
+            allowed |= by_type.get(entity_type, 0)
+        return bits & allowed
+
+    def score(
+        self,
+        tokens: list[str],
+        expansions: list[list[tuple[str, float]]],
+        slots: set[int],
+        params: RankingParams,
+    ) -> dict[int, float]:
+        """
+        BM25 per field, summed with field boosts, accumulated one posting list at a time
+        over the candidate slots. Each expanded term counts at its expansion weight.
+        """
+        scores = dict.fromkeys(slots, 0.0)
+        if not scores:
+            return scores
+        norms = self._length_norms(params)
+        for w, fname, _, postings in self._scored_lists(expansions, params):
+            norm = norms[fname]
+            if len(postings) <= len(scores):
+                for slot, tf in postings.items():
+                    if slot in scores:
+                        scores[slot] += w * (tf / (tf + norm[slot]))
+            else:
+                for slot in scores:
+                    count = postings.get(slot)
+                    if count:
+                        scores[slot] += w * (count / (count + norm[slot]))
+
+        if not tokens:
+            return scores
+        phrase = " ".join(tokens)
+        keys = self._rank_keys
+        for slot in scores:
+            scores[slot] += self._name_bonus(keys[slot][0], phrase, params)
+        return scores
+
+    def score_top(
+        self,
+        tokens: list[str],
+        expansions: list[list[tuple[str, float]]],
+        bits: int,
+        params: RankingParams,
+        limit: int,
+    ) -> dict[int, float] | None:
+        """
+        Scores of a superset of the top `limit` matches in `bits` (threshold algorithm,
+        see the module docstring); None when scoring every match is the better plan.
+        """
+        scored = self._scored_lists(expansions, params)
+        if not scored or len(scored) > _TOP_K_MAX_LISTS:
+            return None
+        if bits.bit_count() < _TOP_K_MIN_DENSITY * min(len(postings) for *_, postings in scored):
+            return None
+        norms = self._length_norms(params)
+        lists = [
+            (w, postings, norms[fname], self._impact_order(fname, term, postings, norms[fname]))
+            for w, fname, term, postings in scored
+        ]
+        phrase = " ".join(tokens)
+        lists.append((1.0, {}, [], self._name_bonuses(phrase, params) if tokens else []))
+        keys = self._rank_keys
+        members = format(bits, f"0{len(self._docs)}b")[::-1]
+        positions = [0] * len(lists)
+        best: list[tuple[float, _Desc]] = []   # min-heap: the worst of the best at best[0]
+        scores: dict[int, float] = {}
+
+        while True:
+            for i, (_, _, _, ordered) in enumerate(lists):
+                pos = positions[i]
+                if pos == len(ordered):
+                    continue
+                positions[i] = pos + 1
+                slot = ordered[pos][1]
+                if slot in scores or members[slot] != "1":
+                    continue
+                sc = 0.0
+                for w, postings, norm, _ in lists[:-1]:
+                    tf = postings.get(slot)
+                    if tf:
+                        sc += w * (tf / (tf + norm[slot]))
+                if tokens:
+                    sc += self._name_bonus(keys[slot][0], phrase, params)
+                scores[slot] = sc
+                hit = (sc, _Desc(keys[slot]))
+                if len(best) < limit:
+                    heapq.heappush(best, hit)
+                elif best[0] < hit:
+                    heapq.heapreplace(best, hit)
+
+            threshold = 0.0
+            heads: list[int] = []
+            for (w, _, _, ordered), pos in zip(lists, positions, strict=True):
+                if pos < len(ordered):
+                    threshold += w * ordered[pos][0]
+                    heads.append(ordered[pos][1])
+            if not heads:
+                # Every listed match is scored; the rest score 0
+                return scores if len(best) == limit and best[0][0] > 0 else None
+            if len(best) == limit:
+                worst_score, worst = best[0]
+                if worst_score > threshold or (
+                    worst_score == threshold and worst.key < max(keys[h] for h in heads)
+                ):
+                    return scores
+
+    def _first_by_name(self, bits: int, limit: int) -> dict[int, float]:
+        members = format(bits, f"0{len(self._docs)}b")[::-1]
+        scores: dict[int, float] = {}
+        for *_, slot in self._name_keys:
+            if members[slot] == "1":
+                scores[slot] = 0.0
+                if len(scores) == limit:
+                    break
+        return scores
+
+    def _scored_lists(
+        self, expansions: list[list[tuple[str, float]]], params: RankingParams
+    ) -> list[tuple[float, str, str, dict[int, int]]]:
+        """(BM25 weight, field, term, postings) for every expanded term present in a field."""
+        n = len(self._slots)
+        lists: list[tuple[float, str, str, dict[int, int]]] = []
+        for terms in expansions:
+            for term, weight in terms:
+                for fname in SEARCH_FIELDS:
+                    postings = self._postings[fname].get(term)
+                    if not postings:
+                        continue
+                    df = len(postings)
+                    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                    w = weight * params.boost(fname) * idf * (params.k1 + 1)
+                    lists.append((w, fname, term, postings))
+        return lists
+
+    def _impact_order(
+        self, fname: str, term: str, postings: dict[int, int], norm: list[float]
+    ) -> list[tuple[float, int]]:
+        """(tf / (tf + norm), slot) in rank order; cached until the next write."""
+        ordered = self._impacts.get((fname, term))
+        if ordered is None:
+            keys = self._rank_keys
+            ordered = [(tf / (tf + norm[slot]), slot) for slot, tf in postings.items()]
+            ordered.sort(key=lambda e: (-e[0], keys[e[1]]))
+            _cache_put(self._impacts, (fname, term), ordered)
+        return ordered
+
+    def _name_bonus(self, name: str, phrase: str, params: RankingParams) -> float:
+        if name == phrase:
+            return params.exact_name_bonus
+        if name.startswith(phrase):
+            return params.name_prefix_bonus
+        return 0.0
+
+    def _name_bonuses(self, phrase: str, params: RankingParams) -> list[tuple[float, int]]:
+        """
+        (bonus, slot) for names equal to, then starting with, the phrase. _name_keys holds
+        both runs already in rank-key order, so this is two slices of a bisected range.
+        """
+        keys = self._name_keys
+        lo = bisect.bisect_left(keys, (phrase,))
+        mid = bisect.bisect_left(keys, (phrase + "\x00",), lo)
+        hi = bisect.bisect_left(keys, (phrase + "\uffff",), mid)
+        exact = [(params.exact_name_bonus, k[3]) for k in keys[lo:mid]]
+        prefix = [(params.name_prefix_bonus, k[3]) for k in keys[mid:hi]]
+        if params.exact_name_bonus >= params.name_prefix_bonus:
+            return exact + prefix
+        return prefix + exact
+
+    def rank(
+        self, scores: dict[int, float], limit: int | None = None
+    ) -> list[tuple[IndexedDocument, float]]:
+        """
+        Score desc, then name (tokenised, then as written), then id — stable across identical
+        scores. With a limit only the top `limit` are selected (a heap, not a full sort).
+        """
+        keys = self._rank_keys
+
+        def order(item: tuple[int, float]) -> tuple[float, RankKey]:
+            return -item[1], keys[item[0]]
+
+        live = [(slot, sc) for slot, sc in scores.items() if self._docs[slot] is not None]
+        if limit is not None and limit < len(live):
+            top = heapq.nsmallest(limit, live, key=order)
+        else:
+            top = sorted(live, key=order)
+        return [(self._docs[slot], sc) for slot, sc in top]  # type: ignore[misc]
+
+    def suggest(
+        self,
+        prefix: str,
+        entity_types: list[str] | None = None,
+        limit: int = 5,
+    ) -> tuple[dict[str, list[IndexedDocument]], list[str]]:
+        """
+        Up to `limit` entity names per type and `limit` tags starting with `prefix`,
+        in lexicographic order, so an exact match comes first.
+        """
+        key = prefix.lower().strip()
+        if not key:
+            return {}, []
+        allowed = set(entity_types) if entity_types else None
+        by_type: dict[str, list[IndexedDocument]] = {}
+        seen: set[int] = set()
+        tags: list[str] = []
+        tag_seen: set[str] = set()
+
+        lo = bisect.bisect_left(self._completions, (key,))
+        hi = bisect.bisect_left(self._completions, (key + "\uffff",))
+        for completion, kind, slot in self._completions[lo:min(hi, lo + _SUGGEST_SCAN_LIMIT)]:
+            doc = self._docs[slot]
+            if doc is None:
+                continue
+            if kind == COMPLETION_TAG:
+                if len(tags) < limit and completion not in tag_seen:
+                    tag_seen.add(completion)
+                    tags.append(next(t for t in doc.tags if t.lower().strip() == completion))
+                continue
+            if slot in seen or (allowed is not None and doc.entity_type not in allowed):
+                continue
+            bucket = by_type.setdefault(doc.entity_type, [])
+            if len(bucket) < limit:
+                bucket.append(doc)
+                seen.add(slot)
+            if (
+                len(tags) >= limit
+                and allowed is not None
+                and all(len(by_type.get(t, [])) >= limit for t in allowed)
+            ):
+                break
+        return by_type, tags
+
+    # ── Query evaluation ─────────────────────────────────────────────────────
+
+    def evaluate(
+        self,
+        node: Node,
+        params: RankingParams,
+        fuzzy: bool = True,
+        memo: dict[str, list[tuple[str, float]]] | None = None,
+    ) -> int:
+        """Bitset of slots matching a parsed query: AND/OR/NOT are &, |, and live & ~."""
+        memo = {} if memo is None else memo
+        if isinstance(node, And):
+            bits = self._live
+            for child in node.nodes:
+                bits &= self.evaluate(child, params, fuzzy, memo)
+                if not bits:
+                    break
+            return bits
+        if isinstance(node, Or):
+            bits = 0
+            for child in node.nodes:
+                bits |= self.evaluate(child, params, fuzzy, memo)
+            return bits
+        if isinstance(node, Not):
+            return self._live & ~self.evaluate(node.node, params, fuzzy, memo)
+        if isinstance(node, Text):
+            return self._text_bits(node, params, fuzzy, memo)
+        return self._filter_bits(node)
+
+    def _expansions(
+        self,
+        token: str,
+        exact: bool,
+        params: RankingParams,
+        fuzzy: bool,
+        memo: dict[str, list[tuple[str, float]]],
+    ) -> list[tuple[str, float]]:
+        if exact:
+            return [(token, 1.0)]
+        if token not in memo:
+            memo[token] = self.expand(token, params, fuzzy)
+        return memo[token]
+
+    def _text_bits(
+        self,
+        node: Text,
+        params: RankingParams,
+        fuzzy: bool,
+        memo: dict[str, list[tuple[str, float]]],
+    ) -> int:
+        fields = (node.field,) if node.field else SEARCH_FIELDS
+        bits = self._live
+        for tok in node.tokens:
+            terms = self._expansions(tok, node.phrase, params, fuzzy, memo)
+            bits &= self._match_bits(terms, fields)
+            if not bits:
+                return 0
+        if not node.phrase or len(node.tokens) < 2:
+            return bits
+        # Every word is present; keep documents where they are adjacent within one field value
+        phrase = f" {' '.join(node.tokens)} "
+        adjacent: set[int] = set()
+        for slot in slots_from_bitset(bits):
+            doc = self._docs[slot]
+            if doc is not None and any(
+                phrase in f" {' '.join(tokenize(text))} " for text in _field_texts(doc, fields)
+            ):
+                adjacent.add(slot)
+        return self.bitset(adjacent)
+
+    def _filter_bits(self, node: Filter) -> int:
+        """
+        Attribute equality is a lookup in the attribute's value postings (entity type and
+        tags in their facets); a range is a slice of the attribute's sorted numbers.
+        """
+        if node.op != "=":
+            return self._range_bitset(node.field, node.op, float(node.value))
+        want = str(node.value).lower()
+        if node.field in self._attr_postings:
+            bits = self._attr_bits.get((node.field, want))
+            if bits is None:
+                bits = self.bitset(self._attr_postings[node.field].get(want, ()))
+                _cache_put(self._attr_bits, (node.field, want), bits)
+            return bits
+        bits = 0
+        for value, value_bits in self._facets.get(node.field, {}).items():
+            if value.lower() == want:
+                bits |= value_bits
+        return bits
+
+    def _range_bitset(self, attr: str, op: str, value: float) -> int:
+        ranges = self._range_bits.setdefault(attr, {})
+        bits = ranges.get((op, value))
+        if bits is None:
+            numbers = self._numeric.get(attr, [])
+            lo, hi = 0, len(numbers)
+            if op == ">":
+                lo = bisect.bisect_right(numbers, (value, math.inf))
+            elif op == ">=":
+                lo = bisect.bisect_left(numbers, (value, -1))
+            elif op == "<":
+                hi = bisect.bisect_left(numbers, (value, -1))
+            else:
+                hi = bisect.bisect_right(numbers, (value, math.inf))
+            bits = self.bitset(slot for _, slot in numbers[lo:hi])
+            _cache_put(ranges, (op, value), bits)
+        return bits
+
+    def bitset(self, slots: Iterable[int]) -> int:
+        buf = bytearray((len(self._docs) >> 3) + 1)
+        for slot in slots:
+            buf[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(buf, "little")
+
+    def facet_counts(
+        self,
+        matched: int,
+        type_matched: int | None = None,
+        limit: int = FACET_VALUE_LIMIT,
+    ) -> dict[str, dict[str, int]]:
+        """
+        Per-facet value counts; entity_type over `matched` (before the type filter),
+        the rest over `type_matched` when given.
+        """
+        facets: dict[str, dict[str, int]] = {}
+        for facet in FACET_FIELDS:
+            mask = matched if facet == "entity_type" or type_matched is None else type_matched
+            counts = [
+                (v, n)
+                for v, bits in self._facets[facet].items()
+                if (n := (bits & mask).bit_count())
+            ]
+            counts.sort(key=lambda vc: (-vc[1], vc[0]))
+            facets[facet] = dict(counts[:limit])
+        return facets
+
+    def execute(
+        self,
+        query: str | Node | None,
+        entity_types: list[str] | None = None,
+        params: RankingParams | None = None,
+        fuzzy: bool = True,
+        with_facets: bool = False,
+        limit: int | None = None,
+    ) -> "SearchResults":
+        """
+        Ranked hits (the top `limit`, or all) with the total match count and optional
+        facets. Raises QuerySyntaxError for malformed queries.
+        """
+        params = params or RankingParams()
+        node = parse_query(query) if isinstance(query, str) else query
+        if node is None:
+            empty: dict[str, dict[str, int]] = (
+                {f: {} for f in FACET_FIELDS} if with_facets else {}
+            )
+            return SearchResults(hits=[], total=0, facets=empty)
+        memo: dict[str, list[tuple[str, float]]] = {}
+        matched_bits = self.evaluate(node, params, fuzzy, memo)
+        typed_bits = self.filter_types(matched_bits, entity_types)
+        facets: dict[str, dict[str, int]] = {}
+        if with_facets:
+            typed = typed_bits if typed_bits is not matched_bits else None
+            facets = self.facet_counts(matched_bits, typed)
+        positive = scoring_tokens(node)
+        tokens = [tok for tok, _ in positive]
+        expansions = [self._expansions(tok, exact, params, fuzzy, memo) for tok, exact in positive]
+        total = typed_bits.bit_count()
+        scores = None
+        if limit is not None and not positive and total * total >= limit * len(self._name_keys):
+            # Filters only: every score is 0, so the hits are the first matches in name order
+            scores = self._first_by_name(typed_bits, limit)
+        elif (
+            limit is not None
+            and positive
+            and total > max(_TOP_K_MIN_MATCHES, limit)
+            and _text_required(node)
+        ):
+            scores = self.score_top(tokens, expansions, typed_bits, params, limit)
+        if scores is None:
+            slots = set(slots_from_bitset(typed_bits))
+            scores = self.score(tokens, expansions, slots, params)
+        return SearchResults(hits=self.rank(scores, limit), total=total, facets=facets)
+
+    def search(
+        self,
+        query: str,
+        entity_types: list[str] | None = None,
+        limit: int = 20,
+        params: RankingParams | None = None,
+        fuzzy: bool = True,
+    ) -> list[tuple[IndexedDocument, float]]:
+        """
+        BM25-ranked matches: every free-text word must match name, tags or description
+        (by prefix, or typo correction when fuzzy) and every field filter must hold.
+        """
+        return self.execute(query, entity_types, params, fuzzy, limit=limit).hits
+
+
+@dataclass(slots=True)
+class SearchResults:
+    hits: list[tuple[IndexedDocument, float]]   # ranked; every match unless a limit was given
+    total: int                                  # matches, regardless of any limit
+    facets: dict[str, dict[str, int]] = field(default_factory=dict)
+
+
+class _Desc:
+    """Reverses a rank key's order, so a min-heap of (score, _Desc(key)) pops the worst hit."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: RankKey) -> None:
+        self.key = key
+
+    def __lt__(self, other: "_Desc") -> bool:
+        return other.key < self.key
+
+
+def _text_required(node: Node) -> bool:
+    """
+    True when every match contains every scoring token (no OR over free text). Only then
+    do the best matches surface near the head of every posting list, as top-k pruning needs.
+    """
+    if isinstance(node, Or):
+        return not scoring_tokens(node)
+    if isinstance(node, And):
+        return all(_text_required(child) for child in node.nodes)
+    return True
+
+
+def _cache_put(cache: dict[Any, Any], key: Any, value: Any) -> None:
+    if len(cache) >= _TERM_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+def slots_from_bitset(bits: int) -> list[int]:
+    """Set bit positions in ascending order; runs of zeros are skipped by str.find."""
+    digits = format(bits, "b")[::-1]
+    slots: list[int] = []
+    i = digits.find("1")
+    while i >= 0:
+        slots.append(i)
+        i = digits.find("1", i + 1)
+    return slots
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, max_dist: int) -> int:
+    """Optimal-string-alignment distance (adjacent swaps count once); max_dist + 1 if over."""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > max_dist:
+            return max_dist + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= max_dist else max_dist + 1
+
+
+def _completion_keys(doc: IndexedDocument) -> set[tuple[str, int]]:
+    """Full lower-cased name, each later word-start of the name, and each tag."""
+    keys: set[tuple[str, int]] = set()
+    name = doc.name.lower().strip()
+    if name:
+        keys.add((name, COMPLETION_NAME))
+        for m in TOKEN_RE.finditer(name):
+            if m.start() > 0:
+                keys.add((name[m.start():], COMPLETION_NAME))
+    for tag in doc.tags:
+        if tag.strip():
+            keys.add((tag.lower().strip(), COMPLETION_TAG))
+    return keys
+
+
+def _facet_values(doc: IndexedDocument) -> list[tuple[str, str]]:
+    pairs = [("entity_type", doc.entity_type)]
+    pairs.extend(("tag", t) for t in set(doc.tags) if t)
+    for facet in ("team", "lifecycle", "status"):
+        value = doc.attributes.get(facet)
+        if value not in (None, ""):
+            pairs.append((facet, str(value)))
+    return pairs
+
+
+def _field_texts(doc: IndexedDocument, fields: tuple[str, ...]) -> list[str]:
+    texts: list[str] = []
+    if "name" in fields:
+        texts.append(doc.name)
+    if "tags" in fields:
+        texts.extend(doc.tags)
+    if "description" in fields:
+        texts.append(doc.description)
+    return texts
+
+
+def _attribute_values(doc: IndexedDocument) -> list[tuple[str, str, float | None]]:
+    """(attribute, lower-cased value, numeric value if it parses as a number) per attribute."""
+    values: list[tuple[str, str, float | None]] = []
+    for attr, raw in doc.attributes.items():
+        if raw is None:
+            continue
+        try:
+            number: float | None = float(raw)
+        except (TypeError, ValueError):
+            number = None
+        if number is not None and math.isnan(number):
+            number = None
+        values.append((attr, str(raw).lower(), number))
+    return values
+
+
+def _field_tokens(doc: IndexedDocument) -> dict[str, list[str]]:
+    return {
+        "name": tokenize(doc.name),
+        "tags": [tok for tag in doc.tags for tok in tokenize(tag)],
+        "description": tokenize(doc.description),
+    }
+
+
+_index: SearchIndex | None = None
+
+
+def get_search_index() -> SearchIndex:
+    global _index
+    if _index is None:
+        _index = SearchIndex()
+    return _index
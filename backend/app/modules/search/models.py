@@ -31,11 +31,26 @@ class SearchHit(BaseModel):
     entity_type: str
     name: str          # display name (resolved from name or title field)
     description: str = ""
-    score: float = 1.0  # relevance (1.0 = name match, 0.5 = description match)
+    score: float = 1.0  # BM25 relevance with name/tag/description boosts
     tags: list[str] = []
 
 
 class SearchResponse(BaseModel):
     query: str
-    total: int
+    total: int                               # every match, not just this page
     hits: list[SearchHit]
+    facets: dict[str, dict[str, int]] = {}   # facet → value → matching count
+    next_cursor: str | None = None
+    has_more: bool = False
+
+
+class Suggestion(BaseModel):
+    id: str
+    entity_type: str
+    name: str
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: dict[str, list[Suggestion]]   # entity_type → top completions
+    tags: list[str] = []
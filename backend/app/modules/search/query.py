@@ -0,0 +1,208 @@
+"""
+Catalog search query language.
+
+    payments api                  every word must match (prefix / typo-tolerant)
+    "payments api"                phrase: exact words, adjacent, in one field
+    team:payments tag:pci         field filters (facets are exact, case-insensitive)
+    name:pay description:"card"   restrict text matching to one field
+    cve_count:>0  tier:<=2        numeric ranges over document attributes
+    -lifecycle:deprecated         negation (also NOT …)
+    team:payments OR team:billing alternatives; AND binds tighter, parentheses group
+
+A query is parsed once into a small AST that SearchIndex.evaluate runs as bitset
+intersections/unions over the index.
+"""
+import re
+from dataclasses import dataclass
+
+TEXT_FIELDS: frozenset[str] = frozenset({"name", "description"})
+FIELD_ALIASES: dict[str, str] = {"type": "entity_type", "tags": "tag", "title": "name"}
+RANGE_OPS: tuple[str, ...] = (">=", "<=", ">", "<")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_LEX = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\()
+      | (?P<rparen>\))
+      | (?P<neg>-)(?=[^\s-])
+      | (?P<field>[A-Za-z_][\w.]*):(?P<fvalue>"[^"]*"?|[^\s()"]*)
+      | (?P<phrase>"[^"]*"?)
+      | (?P<word>[^\s()"]+)
+    )""",
+    re.VERBOSE,
+)
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case alphanumeric runs: "payments-API v2" → ["payments", "api", "v2"]."""
+    return TOKEN_RE.findall(text.lower())
+
+
+@dataclass(frozen=True, slots=True)
+class Text:
+    tokens: tuple[str, ...]
+    phrase: bool = False
+    field: str | None = None    # None: name, tags and description
+
+
+@dataclass(frozen=True, slots=True)
+class Filter:
+    field: str
+    op: str                     # "=" or one of RANGE_OPS
+    value: str | float
+
+
+@dataclass(frozen=True, slots=True)
+class Not:
+    node: "Node"
+
+
+@dataclass(frozen=True, slots=True)
+class And:
+    nodes: tuple["Node", ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Or:
+    nodes: tuple["Node", ...]
+
+
+Node = Text | Filter | Not | And | Or
+
+
+def _lex(query: str) -> list[tuple[str, str, str]]:
+    """(kind, text, field value) triples; OR / AND / NOT are keywords only in upper case."""
+    out: list[tuple[str, str, str]] = []
+    pos = 0
+    while pos < len(query):
+        m = _LEX.match(query, pos)
+        if m is None or m.end() == pos:
+            break
+        pos = m.end()
+        kind = m.lastgroup or ""
+        if kind == "fvalue":
+            out.append(("field", m.group("field"), m.group("fvalue")))
+        elif kind == "word" and m.group("word") in ("OR", "AND", "NOT"):
+            out.append((m.group("word"), "", ""))
+        elif kind:
+            out.append((kind, m.group(kind), ""))
+    return out
+
+
+def _unquote(text: str) -> tuple[str, bool]:
+    if text.startswith('"'):
+        return text[1:-1] if len(text) > 1 and text.endswith('"') else text[1:], True
+    return text, False
+
+
+class _Parser:
+    def __init__(self, tokens: list[tuple[str, str, str]]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> tuple[str, str, str]:
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def parse_or(self) -> Node | None:
+        branches = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            branches.append(self.parse_and())
+        nodes = tuple(b for b in branches if b is not None)
+        if not nodes:
+            return None
+        return nodes[0] if len(nodes) == 1 else Or(nodes)
+
+    def parse_and(self) -> Node | None:
+        nodes: list[Node] = []
+        while self.peek() not in (None, "OR", "rparen"):
+            if self.peek() == "AND":
+                self.take()
+                continue
+            node = self.parse_unary()
+            if node is not None:
+                nodes.append(node)
+        if not nodes:
+            return None
+        return nodes[0] if len(nodes) == 1 else And(tuple(nodes))
+
+    def parse_unary(self) -> Node | None:
+        if self.peek() in ("neg", "NOT"):
+            self.take()
+            if self.peek() in (None, "OR", "rparen"):
+                return None
+            node = self.parse_unary()
+            return Not(node) if node is not None else None
+        return self.parse_atom()
+
+    def parse_atom(self) -> Node | None:
+        kind, text, value = self.take()
+        if kind == "lparen":
+            node = self.parse_or()
+            if self.peek() != "rparen":
+                raise QuerySyntaxError("Unbalanced parenthesis in query")
+            self.take()
+            return node
+        if kind == "rparen":
+            raise QuerySyntaxError("Unbalanced parenthesis in query")
+        if kind == "field":
+            return _field_node(text, value)
+        raw, quoted = _unquote(text)
+        return _text_node(raw, quoted)
+
+
+def _text_node(raw: str, phrase: bool, field: str | None = None) -> Node | None:
+    tokens = tuple(tokenize(raw))
+    if not tokens:
+        return None
+    if phrase and len(tokens) > 1:
+        return Text(tokens, phrase=True, field=field)
+    if len(tokens) == 1:
+        return Text(tokens, phrase=phrase, field=field)
+    # "payments-api" unquoted: each part must match on its own
+    return And(tuple(Text((t,), field=field) for t in tokens))
+
+
+def _field_node(name: str, raw_value: str) -> Node | None:
+    field = FIELD_ALIASES.get(name.lower(), name.lower())
+    value, quoted = _unquote(raw_value)
+    if not value.strip():
+        raise QuerySyntaxError(f"Missing value for '{name}:'")
+    if field in TEXT_FIELDS:
+        return _text_node(value, quoted, field)
+    if not quoted:
+        for op in RANGE_OPS:
+            if value.startswith(op):
+                try:
+                    return Filter(field, op, float(value[len(op):]))
+                except ValueError:
+                    raise QuerySyntaxError(f"'{name}:{value}' needs a number after {op}") from None
+    return Filter(field, "=", value.strip())
+
+
+def parse_query(query: str) -> Node | None:
+    """Parse a search string; None when it contains nothing searchable."""
+    parser = _Parser(_lex(query))
+    node = parser.parse_or()
+    if parser.peek() is not None:
+        raise QuerySyntaxError("Unbalanced parenthesis in query")
+    return node
+
+
+def scoring_tokens(node: Node | None) -> list[tuple[str, bool]]:
+    """Positive (non-negated) text tokens in query order, with whether each is exact."""
+    if node is None or isinstance(node, Filter | Not):
+        return []
+    if isinstance(node, Text):
+        return [(t, node.phrase) for t in node.tokens]
+    return [tok for child in node.nodes for tok in scoring_tokens(child)]
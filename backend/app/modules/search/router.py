@@ -1,3 +1,5 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends, Query
 
 from app.core.deps import get_current_user
@@ -9,14 +11,36 @@ _svc = SearchService()
 
 @router.get("")
 async def search_catalog(
-    q: str = Query(..., min_length=1, max_length=256, description="Search query"),
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=256,
+        description='Search query: words, "phrases", field:value, -negation, OR, cve_count:>0',
+    ),
     types: list[str] | None = Query(default=None, description="Filter by entity types"),
     limit: int = Query(default=20, ge=1, le=100),
+    fuzzy: bool = Query(default=True, description="Correct misspelled terms that match nothing"),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
     _=Depends(get_current_user),
 ):
     """
-    Full-text search across all catalog entity types.
-    Returns ranked hits with entity_type, name, description, and tags.
+    Full-text search across all catalog entity types, with field filters such as
+    `team:payments lifecycle:production tag:pci -status:deprecated cve_count:>0`.
+    Returns ranked hits with entity_type, name, description, and tags; pass
+    next_cursor back with the same q/types/fuzzy to get the following page. Cursors
+    live for SEARCH_RESULT_TTL_SECONDS; an expired one is rejected with 422.
     """
-    result = await _svc.search(query=q, types=types, limit=limit)
+    result = await _svc.search(query=q, types=types, limit=limit, fuzzy=fuzzy, cursor=cursor)
+    return {"data": result.model_dump(), "meta": {}, "error": None}
+
+
+@router.get("/suggest")
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=128, description="Prefix typed so far"),
+    types: list[str] | None = Query(default=None, description="Filter by entity types"),
+    limit: int = Query(default=5, ge=1, le=20, description="Completions per entity type"),
+    _: dict[str, Any] = Depends(get_current_user),
+) -> dict[str, Any]:
+    """Typeahead: top name completions per entity type plus matching tags."""
+    result = await _svc.suggest(prefix=q, types=types, limit=limit)
     return {"data": result.model_dump(), "meta": {}, "error": None}
@@ -1,3 +1,6 @@
+import asyncio
+import base64
+import hashlib
 import json
 from typing import Any
 
@@ -5,10 +8,24 @@ import structlog
 
 from app.clients.cosmos_gremlin import execute_query
 from app.clients.redis_client import get_redis
-from app.modules.search.models import SEARCHABLE_LABELS, NAME_PROPERTY, SearchHit, SearchResponse
+from app.config import get_settings
+from app.core.exceptions import ValidationError
+from app.modules.search.index import IndexedDocument, RankingParams, SearchIndex, get_search_index
+from app.modules.search.models import (
+    NAME_PROPERTY,
+    SEARCHABLE_LABELS,
+    SearchHit,
+    SearchResponse,
+    Suggestion,
+    SuggestResponse,
+)
+from app.modules.search.query import QuerySyntaxError, parse_query
 
 logger = structlog.get_logger()
-SEARCH_CACHE_TTL = 10  # seconds — short TTL so catalog changes are visible quickly
+INDEX_PAGE_SIZE = 1000
+
+# Vertex properties that are not copied into document attributes
+_SKIP_PROPERTIES = frozenset({"name", "title", "description", "tags", "created_at", "updated_at"})
 
 
 def _extract_prop(props: dict, key: str) -> str:
@@ -18,13 +35,10 @@ def _extract_prop(props: dict, key: str) -> str:
     return ""
 
 
-def _vertex_to_hit(vertex: Any, entity_type: str, query_lower: str) -> SearchHit | None:
-    if not isinstance(vertex, dict):
+def _vertex_to_document(vertex: Any, entity_type: str) -> IndexedDocument | None:
+    if not isinstance(vertex, dict) or not vertex.get("id"):
         return None
     props = vertex.get("properties", {})
-    name_key = NAME_PROPERTY.get(entity_type, "name")
-    name = _extract_prop(props, name_key)
-    description = _extract_prop(props, "description")
 
     tags_raw = _extract_prop(props, "tags")
     try:
@@ -32,70 +46,230 @@ def _vertex_to_hit(vertex: Any, entity_type: str, query_lower: str) -> SearchHit
     except Exception:
         tags = []
 
-    # Relevance scoring: name match = 1.0, description match = 0.5
-    name_lower = name.lower()
-    desc_lower = description.lower()
-    if query_lower in name_lower:
-        score = 1.0
-    elif query_lower in desc_lower:
-        score = 0.5
-    else:
-        return None  # No match — shouldn't happen with hasTextContains but be safe
-
-    return SearchHit(
-        id=vertex.get("id", ""),
+    attributes: dict[str, Any] = {}
+    for key, val in props.items():
+        if key in _SKIP_PROPERTIES or not isinstance(val, list) or not val:
+            continue
+        raw = val[0].get("value")
+        # JSON-encoded lists/dicts are not filterable attributes
+        if isinstance(raw, int | float) or (isinstance(raw, str) and raw and raw[0] not in "[{"):
+            attributes[key] = raw
+
+    return IndexedDocument(
+        id=str(vertex["id"]),
         entity_type=entity_type,
-        name=name,
-        description=description,
-        score=score,
-        tags=tags,
+        name=_extract_prop(props, NAME_PROPERTY.get(entity_type, "name")),
+        description=_extract_prop(props, "description"),
+        tags=[str(t) for t in tags] if isinstance(tags, list) else [],
+        attributes=attributes,
+    )
+
+
+def load_catalog_documents(page_size: int = INDEX_PAGE_SIZE) -> list[IndexedDocument]:
+    """Full scan of every searchable label, paged by id."""
+    docs: list[IndexedDocument] = []
+    for label in SEARCHABLE_LABELS:
+        start = 0
+        while True:
+            results = execute_query(
+                f"g.V().hasLabel('{label}').order().by(id).range(%(start)s, %(end)s)",
+                {"start": start, "end": start + page_size},
+            )
+            for v in results:
+                doc = _vertex_to_document(v, label)
+                if doc:
+                    docs.append(doc)
+            if len(results) < page_size:
+                break
+            start += page_size
+    return docs
+
+
+def result_set_key(query: str, labels: list[str], fuzzy: bool) -> str:
+    canonical = json.dumps(
+        {"q": query, "types": sorted(labels), "fuzzy": fuzzy}, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def encode_cursor(result_key: str, offset: int) -> str:
+    raw = json.dumps({"h": result_key, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(data["o"])
+        if offset < 0:
+            raise ValueError
+        return str(data["h"]), offset
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValidationError("Invalid search cursor", details={"cursor": cursor}) from e
+
+
+def ranking_params() -> RankingParams:
+    settings = get_settings()
+    return RankingParams(
+        name_boost=settings.search_name_boost,
+        tag_boost=settings.search_tag_boost,
+        description_boost=settings.search_description_boost,
+        exact_name_bonus=settings.search_exact_name_bonus,
+        name_prefix_bonus=settings.search_name_prefix_bonus,
     )
 
 
 class SearchService:
+    def __init__(self, index: SearchIndex | None = None) -> None:
+        self._index = index
+        self._params = ranking_params()
+        self._rebuild_lock = asyncio.Lock()
+
+    @property
+    def index(self) -> SearchIndex:
+        return self._index if self._index is not None else get_search_index()
+
+    async def rebuild_index(self) -> int:
+        docs = await asyncio.to_thread(load_catalog_documents)
+        self.index.replace_all(docs)
+        logger.info("search.index.rebuilt", documents=len(docs))
+        return len(docs)
+
+    async def _ensure_index(self) -> None:
+        """Build the index on first use; concurrent first requests wait for one rebuild."""
+        if self.index.ready:
+            return
+        async with self._rebuild_lock:
+            if not self.index.ready:
+                await self.rebuild_index()
+
     async def search(
         self,
         query: str,
         types: list[str] | None = None,
         limit: int = 20,
+        fuzzy: bool = True,
+        cursor: str | None = None,
     ) -> SearchResponse:
+        """
+        One page of ranked hits. The first page is always ranked from the live index;
+        when the ranking runs past it, it is cached in Redis under a hash of (query,
+        types, fuzzy) and later pages are served from it without re-scoring. A cursor
+        whose result set has expired raises ValidationError: recomputing it could shift
+        hits across the page boundary, so the client starts again from the first page.
+        """
         q = query.strip()
-        if not q:
+        try:
+            node = parse_query(q)
+        except QuerySyntaxError as e:
+            raise ValidationError(str(e), details={"query": q}) from e
+        if node is None:
             return SearchResponse(query=q, total=0, hits=[])
 
         labels = [t for t in (types or SEARCHABLE_LABELS) if t in SEARCHABLE_LABELS]
-        cache_key = f"search:{q.lower()}:{'|'.join(sorted(labels))}:{limit}"
-        redis = await get_redis()
-
-        cached = await redis.get(cache_key)
-        if cached:
-            return SearchResponse(**json.loads(cached))
-
-        q_lower = q.lower()
-        hits: list[SearchHit] = []
-
-        for label in labels:
-            name_key = NAME_PROPERTY.get(label, "name")
-            # Gremlin: match vertices whose name/title contains the query string (case-insensitive)
-            # Cosmos DB Gremlin supports TextP.containing for full-text, but we use has() with
-            # within() for exact; for contains we filter post-fetch on small sets.
-            # In production upgrade to Azure AI Search for proper full-text.
-            try:
-                results = execute_query(
-                    f"g.V().hasLabel('{label}').has('{name_key}').limit(200)",
-                    {},
+        if not labels:
+            # Only unknown types requested; an empty filter would match every type
+            return SearchResponse(query=q, total=0, hits=[])
+        key = result_set_key(q, labels, fuzzy)
+        offset = 0
+        if cursor:
+            cursor_key, offset = decode_cursor(cursor)
+            if cursor_key != key:
+                raise ValidationError(
+                    "Search cursor does not match this query", details={"cursor": cursor}
                 )
-                for v in results:
-                    hit = _vertex_to_hit(v, label, q_lower)
-                    if hit:
-                        hits.append(hit)
-            except Exception as exc:
-                logger.warning("search.label.error", label=label, error=str(exc))
-
-        # Sort by score desc, then name asc
-        hits.sort(key=lambda h: (-h.score, h.name.lower()))
-        hits = hits[:limit]
-
-        response = SearchResponse(query=q, total=len(hits), hits=hits)
-        await redis.setex(cache_key, SEARCH_CACHE_TTL, response.model_dump_json())
-        return response
+
+        await self._ensure_index()
+        result_set = await self._cached_result_set(key) if cursor else None
+        if result_set is None and cursor:
+            raise ValidationError(
+                "Search cursor has expired; repeat the search without a cursor",
+                details={"cursor": cursor},
+            )
+        if result_set is None:
+            results = self.index.execute(
+                node,
+                entity_types=labels,
+                params=self._params,
+                fuzzy=fuzzy,
+                with_facets=True,
+                limit=limit,
+            )
+            ranking = results.hits
+            if results.total > limit:
+                # Later pages slice the full ranking; its head is this page
+                ranking = self.index.execute(
+                    node, entity_types=labels, params=self._params, fuzzy=fuzzy
+                ).hits
+            result_set = {
+                "ranked": [[doc.id, round(score, 4)] for doc, score in ranking],
+                "total": results.total,
+                "facets": results.facets,
+            }
+            if len(ranking) > limit:
+                await self._cache_result_set(key, result_set)
+
+        ranked = result_set["ranked"]
+        page = ranked[offset:offset + limit]
+        hits = [
+            SearchHit(
+                id=doc.id,
+                entity_type=doc.entity_type,
+                name=doc.name,
+                description=doc.description,
+                score=score,
+                tags=doc.tags,
+            )
+            for entity_id, score in page
+            if (doc := self.index.get(entity_id)) is not None   # skip entities deleted since
+        ]
+        has_more = offset + limit < len(ranked)
+        return SearchResponse(
+            query=q,
+            total=result_set["total"],
+            hits=hits,
+            facets=result_set["facets"],
+            next_cursor=encode_cursor(key, offset + limit) if has_more else None,
+            has_more=has_more,
+        )
+
+    async def _cached_result_set(self, key: str) -> dict[str, Any] | None:
+        try:
+            redis = await get_redis()
+            cached = await redis.get(f"search:results:{key}")
+        except Exception as e:
+            logger.warning("search.result_cache.read_failed", error=str(e))
+            return None
+        return json.loads(cached) if cached else None
+
+    async def _cache_result_set(self, key: str, result_set: dict[str, Any]) -> None:
+        try:
+            redis = await get_redis()
+            await redis.setex(
+                f"search:results:{key}",
+                get_settings().search_result_ttl_seconds,
+                json.dumps(result_set, separators=(",", ":")),
+            )
+        except Exception as e:
+            logger.warning("search.result_cache.write_failed", error=str(e))
+
+    async def suggest(
+        self,
+        prefix: str,
+        types: list[str] | None = None,
+        limit: int = 5,
+    ) -> SuggestResponse:
+        """Typeahead completions from the in-process index — never touches Cosmos once built."""
+        labels = [t for t in (types or SEARCHABLE_LABELS) if t in SEARCHABLE_LABELS]
+        if not labels:
+            return SuggestResponse(query=prefix, suggestions={})
+        await self._ensure_index()
+        by_type, tags = self.index.suggest(prefix, entity_types=labels, limit=limit)
+        return SuggestResponse(
+            query=prefix,
+            suggestions={
+                label: [Suggestion(id=d.id, entity_type=d.entity_type, name=d.name) for d in docs]
+                for label, docs in by_type.items()
+            },
+            tags=tags,
+        )
@@ -0,0 +1,107 @@
+"""
+On-disk snapshots of the search index.
+
+A snapshot lets a worker start from a disk read instead of a full Cosmos scan, then
+catch up from the change stream at the recorded offset.
+
+Layout (all integers big-endian):
+  magic      4 bytes   b"NXSI"
+  version    uint16
+  offset     uint16 length + utf-8 stream id (last catalog:changes event included)
+  checksum   32 bytes  sha256 of the payload
+  length     uint64    payload size
+  payload    zlib-compressed JSON array of documents
+
+Files are written to a temp file and renamed into place, so readers never see a
+partial snapshot. Loading reads the whole file, verifies the checksum, then inflates
+and parses every document — the index is rebuilt in memory from them either way.
+
+The default path is under /tmp, which only the container that wrote it can see. To
+let a new replica start from a snapshot another one wrote, point SEARCH_SNAPSHOT_PATH
+at a volume they share (docker-compose mounts one at /var/lib/nexus).
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zlib
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import structlog
+
+from app.modules.search.index import IndexedDocument
+
+logger = structlog.get_logger()
+
+MAGIC = b"NXSI"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct(">4sHH")
+_TRAILER = struct.Struct(">32sQ")
+
+
+@dataclass(slots=True)
+class IndexSnapshot:
+    stream_id: str
+    documents: list[IndexedDocument]
+
+
+def write_snapshot(path: str | Path, documents: Iterable[IndexedDocument], stream_id: str) -> int:
+    """Atomically replace the snapshot at path; returns the bytes written."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    raw = json.dumps([asdict(d) for d in documents], separators=(",", ":")).encode()
+    payload = zlib.compress(raw, 6)
+    offset = stream_id.encode()
+    header = (
+        _PREFIX.pack(MAGIC, FORMAT_VERSION, len(offset))
+        + offset
+        + _TRAILER.pack(hashlib.sha256(payload).digest(), len(payload))
+    )
+
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return len(header) + len(payload)
+
+
+def read_snapshot(path: str | Path) -> IndexSnapshot | None:
+    """Load a snapshot, or None if it is missing, from another format version, or corrupt."""
+    try:
+        return _decode(Path(path).read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error, zlib.error, TypeError) as e:
+        logger.warning("search.snapshot.unreadable", path=str(path), error=str(e))
+        return None
+
+
+def _decode(buf: bytes) -> IndexSnapshot | None:
+    magic, version, offset_len = _PREFIX.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a search index snapshot")
+    if version != FORMAT_VERSION:
+        logger.info("search.snapshot.version_mismatch", found=version, expected=FORMAT_VERSION)
+        return None
+    pos = _PREFIX.size
+    stream_id = buf[pos:pos + offset_len].decode()
+    pos += offset_len
+    checksum, length = _TRAILER.unpack_from(buf, pos)
+    pos += _TRAILER.size
+
+    payload = buf[pos:pos + length]
+    if len(payload) != length or hashlib.sha256(payload).digest() != checksum:
+        raise ValueError("checksum mismatch")
+    docs = json.loads(zlib.decompress(payload))
+    return IndexSnapshot(stream_id=stream_id, documents=[IndexedDocument(**d) for d in docs])
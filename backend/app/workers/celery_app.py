@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 from app.config import get_settings
 
 settings = get_settings()
@@ -7,7 +8,12 @@ celery_app = Celery(
     "nexus",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
-    include=["app.modules.ingestion.tasks"],
+    include=[
+        "app.modules.ingestion.tasks",
+        "app.modules.ingestion.coalesce",
+        "app.modules.ingestion.org_sync",
+        "app.modules.relationships.tasks",
+    ],
 )
 
 celery_app.conf.update(
@@ -19,4 +25,20 @@ celery_app.conf.update(
     task_track_started=True,
     task_acks_late=True,
     worker_prefetch_multiplier=1,
+    beat_schedule={
+        # Reconcile the incrementally-maintained dependency closure
+        "rebuild-reachability": {
+            "task": "relationships.rebuild_reachability",
+            "schedule": crontab(minute="*/30"),
+        },
+        "analyse-graph": {
+            "task": "relationships.analyse_graph",
+            "schedule": crontab(minute=15),
+        },
+        # Catch repos whose webhooks were missed
+        "sync-github-orgs": {
+            "task": "ingestion.sync_github_orgs",
+            "schedule": crontab(hour=2, minute=30),
+        },
+    },
 )
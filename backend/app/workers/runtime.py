@@ -0,0 +1,101 @@
+"""
+Async runtime for Celery workers.
+
+Each worker process owns one long-lived event loop, created when the process starts
+(worker_process_init) and closed when it exits. Async tasks run on it via @async_task,
+so module-global clients (the get_redis() pool, get_http_client() pools) stay bound to
+a live loop and keep their connections between tasks — unlike asyncio.run(), which
+builds and tears down a loop per task.
+
+The loop is per process, which matches the prefork (default) and solo pools.
+"""
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable, Coroutine
+from typing import Any, ParamSpec, TypeVar
+
+import structlog
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.clients.http_client import close_http_clients
+from app.clients.redis_client import close_redis
+from app.workers.celery_app import celery_app
+
+logger = structlog.get_logger()
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_loop: asyncio.AbstractEventLoop | None = None
+
+# Awaited, in order, before the loop closes at worker shutdown
+_shutdown_hooks: list[Callable[[], Awaitable[None]]] = [close_http_clients, close_redis]
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """The process's event loop; created on first use if the init signal did not fire."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, R]) -> R:
+    return get_worker_loop().run_until_complete(coro)
+
+
+def on_worker_shutdown(hook: Callable[[], Awaitable[None]]) -> None:
+    """Register an async cleanup (e.g. closing a client pool) for worker shutdown."""
+    _shutdown_hooks.append(hook)
+
+
+def async_task(
+    *task_args: Any, **task_options: Any
+) -> Callable[[Callable[P, Coroutine[Any, Any, R]]], Any]:
+    """
+    @celery_app.task for coroutine functions:
+
+        @async_task(name="ingestion.ingest_x", bind=True, max_retries=3)
+        async def ingest_x(self, ...): ...
+    """
+    def decorator(fn: Callable[P, Coroutine[Any, Any, R]]) -> Any:
+        @functools.wraps(fn)
+        def run(*args: P.args, **kwargs: P.kwargs) -> R:
+            return run_async(fn(*args, **kwargs))
+
+        return celery_app.task(*task_args, **task_options)(run)
+
+    return decorator
+
+
+def _init_worker_loop(**_: Any) -> None:
+    global _loop
+    # A forked child must not reuse a loop inherited from the parent
+    _loop = None
+    get_worker_loop()
+    logger.info("worker.loop.started")
+
+
+def _close_worker_loop(**_: Any) -> None:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    for hook in _shutdown_hooks:
+        try:
+            _loop.run_until_complete(hook())
+        except Exception as e:
+            logger.warning(
+                "worker.shutdown_hook_failed",
+                hook=getattr(hook, "__name__", repr(hook)),
+                error=str(e),
+            )
+    _loop.run_until_complete(_loop.shutdown_asyncgens())
+    _loop.close()
+    _loop = None
+    logger.info("worker.loop.closed")
+
+
+# Connected by call rather than as decorators: celery's signals are untyped
+worker_process_init.connect(_init_worker_loop)
+worker_process_shutdown.connect(_close_worker_loop)
@@ -0,0 +1,112 @@
+"""
+Synthetic catalogs for the search benchmarks.
+
+Catalogs are generated deterministically across all eight searchable labels and served
+through a fake Gremlin `execute_query` (paged by range bindings) and fakeredis, so the
+suite needs no running services. 1k and 10k entities always run, plus 50k for the
+top-hits budget; set NEXUS_BENCH_LARGE=1 to add 100k.
+
+Every test here is marked `benchmark` and deselected by the default addopts; run them
+with `pytest tests/benchmarks -m benchmark`.
+"""
+import json
+import os
+import random
+import re
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import fakeredis.aioredis
+import pytest
+
+from app.modules.search.models import NAME_PROPERTY, SEARCHABLE_LABELS
+
+CATALOG_SIZES = [1_000, 10_000] + ([100_000] if os.environ.get("NEXUS_BENCH_LARGE") else [])
+TOP_K_SIZE = 50_000
+
+_DOMAINS = [
+    "payments", "billing", "orders", "checkout", "identity", "search", "catalog", "shipping",
+    "inventory", "pricing", "ledger", "fraud", "notifications", "reporting", "analytics", "gateway",
+]
+_ROLES = [
+    "api", "worker", "service", "db", "cache", "queue", "frontend", "scheduler", "proxy", "etl",
+]
+_WORDS = [
+    "handles", "stores", "processes", "publishes", "consumes", "events", "requests", "customer",
+    "card", "refunds", "invoices", "tokens", "sessions", "records", "batch", "stream", "realtime",
+    "legacy", "internal", "public", "critical", "latency", "throughput", "retries", "timeouts",
+]
+_TAGS = [
+    "pci", "gdpr", "tier-1", "tier-2", "tier-3", "critical", "internal", "public", "beta", "legacy",
+]
+_LIFECYCLES = ["production", "experimental", "deprecated"]
+_STATUSES = ["active", "inactive", "resolved", "open"]
+
+
+def _prop(value):
+    return [{"value": value}]
+
+
+def synthetic_vertices(size: int, seed: int = 42) -> dict[str, list[dict]]:
+    """label → Gremlin-shaped vertex dicts, spread evenly over SEARCHABLE_LABELS."""
+    rng = random.Random(seed)
+    by_label: dict[str, list[dict]] = {label: [] for label in SEARCHABLE_LABELS}
+    for i in range(size):
+        label = SEARCHABLE_LABELS[i % len(SEARCHABLE_LABELS)]
+        domain = rng.choice(_DOMAINS)
+        name = f"{domain}-{rng.choice(_ROLES)}-{i:06d}"
+        props = {
+            NAME_PROPERTY[label]: _prop(name),
+            "description": _prop(
+                " ".join(rng.choices(_WORDS, k=rng.randint(4, 12))) + f" for {domain}"
+            ),
+            "tags": _prop(json.dumps(rng.sample(_TAGS, k=rng.randint(0, 3)))),
+            "team": _prop(rng.choice(_DOMAINS)),
+            "lifecycle": _prop(rng.choice(_LIFECYCLES)),
+            "status": _prop(rng.choice(_STATUSES)),
+            "cve_count": _prop(rng.choice([0, 0, 0, 1, 2, 5, 13])),
+        }
+        by_label[label].append(
+            {"id": f"{label.lower()}-{i:06d}", "label": label, "properties": props}
+        )
+    return by_label
+
+
+def fake_gremlin(by_label: dict[str, list[dict]]):
+    """execute_query stand-in for the paged hasLabel(...).range(start, end) scans."""
+    label_re = re.compile(r"hasLabel\('([^']+)'\)")
+
+    def execute_query(query: str, bindings: dict | None = None):
+        bindings = bindings or {}
+        m = label_re.search(query)
+        vertices = by_label.get(m.group(1), []) if m else []
+        return vertices[bindings.get("start", 0):bindings.get("end", len(vertices))]
+
+    return execute_query
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        if item.path.is_relative_to(Path(__file__).parent):
+            item.add_marker(pytest.mark.benchmark)
+
+
+@pytest.fixture(scope="session")
+def catalogs():
+    return {size: synthetic_vertices(size) for size in [*CATALOG_SIZES, TOP_K_SIZE]}
+
+
+@pytest.fixture
+def gremlin(catalogs):
+    """Patch the search scan to read a synthetic catalog; returns a setter taking a size."""
+    with patch("app.modules.search.service.execute_query") as mock:
+        def use(size: int):
+            mock.side_effect = fake_gremlin(catalogs[size])
+        yield use
+
+
+@pytest.fixture
+def redis():
+    fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    with patch("app.modules.search.service.get_redis", new_callable=AsyncMock, return_value=fake):
+        yield fake
@@ -0,0 +1,161 @@
+"""
+Search speed and memory budgets over synthetic catalogs.
+
+Budgets are deliberately loose so they only trip on real regressions; scale them with
+NEXUS_BENCH_BUDGET_SCALE on slow CI runners. Measured numbers are attached to each
+benchmark's extra_info (see `pytest tests/benchmarks --benchmark-json=out.json`).
+"""
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from app.modules.search.index import SearchIndex
+from app.modules.search.service import SearchService, load_catalog_documents
+from tests.benchmarks.conftest import CATALOG_SIZES, TOP_K_SIZE
+
+BUDGET_SCALE = float(os.environ.get("NEXUS_BENCH_BUDGET_SCALE", "1"))
+
+# size → seconds to scan + build
+BUILD_BUDGET_S = {1_000: 2.0, 10_000: 15.0, 100_000: 150.0}
+# size → p99 query latency in ms over QUERY_MIX (loose enough to hold under coverage)
+QUERY_P99_BUDGET_MS = {1_000: 30.0, 10_000: 200.0, 100_000: 2000.0}
+SUGGEST_P99_BUDGET_MS = 10.0
+# p99 for one page of top hits over TOP_K_MIX at TOP_K_SIZE, facets included
+TOP_K_P99_BUDGET_MS = 10.0
+TOP_K_LIMIT = 20
+# Index + documents, per entity
+MEMORY_BUDGET_BYTES_PER_DOC = 6_000
+
+QUERY_MIX = [
+    "payments",
+    "pay api",
+    "paymnets",                                        # typo → fuzzy path
+    "team:payments lifecycle:production",              # facet bitsets only
+    "tag:pci -lifecycle:deprecated cve_count:>0",      # negation + attribute range
+    '"card refunds"',                                  # phrase verification
+    "checkout OR shipping",
+    "ledger worker",
+]
+# Broad queries with thousands of matches at 50k, where ranking only the page pays off
+TOP_K_MIX = [
+    "payments",
+    "api",
+    "pay api",
+    "paymnets",
+    "ledger worker",
+    "team:payments lifecycle:production",
+]
+SUGGEST_MIX = ["p", "pa", "pay", "paym", "che", "led", "zzz"]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _built(gremlin, size: int) -> SearchIndex:
+    gremlin(size)
+    index = SearchIndex()
+    index.replace_all(load_catalog_documents())
+    return index
+
+
+@pytest.mark.parametrize("size", CATALOG_SIZES)
+def test_index_build(benchmark, gremlin, size):
+    gremlin(size)
+    index = SearchIndex()
+
+    benchmark.pedantic(lambda: index.replace_all(load_catalog_documents()), rounds=3, iterations=1)
+    assert len(index) == size
+    assert benchmark.stats.stats.max <= BUILD_BUDGET_S[size] * BUDGET_SCALE
+
+
+@pytest.mark.parametrize("size", CATALOG_SIZES)
+def test_index_memory(benchmark, gremlin, size):
+    gremlin(size)
+    docs = load_catalog_documents()
+
+    def build():
+        tracemalloc.start()
+        try:
+            index = SearchIndex()
+            index.replace_all(docs)
+            return tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    used = benchmark.pedantic(build, rounds=1, iterations=1)
+    per_doc = used / size
+    benchmark.extra_info.update(index_bytes=used, bytes_per_doc=round(per_doc))
+    assert per_doc <= MEMORY_BUDGET_BYTES_PER_DOC * BUDGET_SCALE
+
+
+@pytest.mark.parametrize("size", CATALOG_SIZES)
+def test_query_latency(benchmark, gremlin, size):
+    index = _built(gremlin, size)
+    samples: list[float] = []
+
+    def run_mix():
+        for q in QUERY_MIX:
+            start = time.perf_counter()
+            index.execute(q, with_facets=True)
+            samples.append(time.perf_counter() - start)
+
+    benchmark.pedantic(run_mix, rounds=5, iterations=1, warmup_rounds=1)
+    p50 = _percentile(samples, 0.50) * 1000
+    p99 = _percentile(samples, 0.99) * 1000
+    benchmark.extra_info.update(p50_ms=round(p50, 2), p99_ms=round(p99, 2))
+    assert p99 <= QUERY_P99_BUDGET_MS[size] * BUDGET_SCALE
+
+
+def test_top_hits_latency(benchmark, gremlin):
+    index = _built(gremlin, TOP_K_SIZE)
+    samples: list[float] = []
+
+    def run_mix():
+        for q in TOP_K_MIX:
+            start = time.perf_counter()
+            index.execute(q, with_facets=True, limit=TOP_K_LIMIT)
+            samples.append(time.perf_counter() - start)
+
+    run_mix()   # length norms and impact orders are built on first use
+    samples.clear()
+    benchmark.pedantic(run_mix, rounds=5, iterations=1)
+    p99 = _percentile(samples, 0.99) * 1000
+    p50 = _percentile(samples, 0.50) * 1000
+    benchmark.extra_info.update(p50_ms=round(p50, 2), p99_ms=round(p99, 2))
+    assert p99 <= TOP_K_P99_BUDGET_MS * BUDGET_SCALE
+    for q in TOP_K_MIX:
+        top = index.execute(q, limit=TOP_K_LIMIT)
+        assert top.total > TOP_K_LIMIT
+        assert top.hits == index.execute(q).hits[:TOP_K_LIMIT]
+
+
+@pytest.mark.parametrize("size", CATALOG_SIZES)
+def test_suggest_latency(benchmark, gremlin, size):
+    index = _built(gremlin, size)
+    samples: list[float] = []
+
+    def run_mix():
+        for prefix in SUGGEST_MIX:
+            start = time.perf_counter()
+            index.suggest(prefix, limit=5)
+            samples.append(time.perf_counter() - start)
+
+    benchmark.pedantic(run_mix, rounds=20, iterations=1, warmup_rounds=1)
+    p99 = _percentile(samples, 0.99) * 1000
+    p50 = _percentile(samples, 0.50) * 1000
+    benchmark.extra_info.update(p50_ms=round(p50, 3), p99_ms=round(p99, 3))
+    assert p99 <= SUGGEST_P99_BUDGET_MS * BUDGET_SCALE
+
+
+async def test_paged_search_through_service(gremlin, redis):
+    """End-to-end service path (fake Gremlin scan, fakeredis result cache) stays consistent."""
+    gremlin(CATALOG_SIZES[0])
+    svc = SearchService(index=SearchIndex())
+    first = await svc.search("team:payments", limit=50)
+    second = await svc.search("team:payments", limit=50, cursor=first.next_cursor)
+    assert first.total > 50
+    assert not {h.id for h in first.hits} & {h.id for h in second.hits}
@@ -0,0 +1,104 @@
+"""
+Ranking regression suite: a small hand-labelled catalog mixed into synthetic noise,
+scored with NDCG@10. Thresholds sit just under the current scores, so a ranking
+change that demotes labelled results fails CI; raise them when ranking improves.
+"""
+import math
+
+import pytest
+
+from app.modules.search.index import IndexedDocument, SearchIndex
+from app.modules.search.service import _vertex_to_document, ranking_params
+from tests.benchmarks.conftest import synthetic_vertices
+
+NOISE_SIZE = 1_000
+K = 10
+
+LABELLED = [
+    IndexedDocument("rel-payments-api", "Service", "payments-api",
+                    "Public REST API for card payments", ["pci", "tier-1"]),
+    IndexedDocument("rel-payments-worker", "Service", "payments-worker",
+                    "Settles card payments asynchronously", ["pci"]),
+    IndexedDocument("rel-post-payments", "ApiEndpoint", "POST /payments", "Create a payment", []),
+    IndexedDocument("rel-payments-team", "Team", "Payments Platform",
+                    "Owns payments-api and payments-worker", []),
+    IndexedDocument("rel-idp", "Service", "identity-provider",
+                    "OAuth2 and OIDC login for all apps", ["auth"]),
+    IndexedDocument("rel-jwt", "Package", "jsonwebtoken", "JWT signing and verification", ["auth"]),
+    IndexedDocument("rel-checkout-outage", "Incident", "Checkout outage: card declines",
+                    "payments-api returned 502", []),
+    IndexedDocument("rel-checkout-web", "Service", "checkout-web", "Checkout frontend", ["public"]),
+    IndexedDocument("rel-kv-payments", "AzureResource", "kv-payments-prod",
+                    "Key vault for payments secrets", []),
+    IndexedDocument("rel-prod-eu", "Environment", "production-eu",
+                    "Primary EU production environment", []),
+]
+
+# query → {document id: graded relevance (3 perfect, 2 good, 1 partial)}
+JUDGEMENTS: dict[str, dict[str, int]] = {
+    "payments-api": {"rel-payments-api": 3, "rel-checkout-outage": 1, "rel-payments-team": 1},
+    "identity provider": {"rel-idp": 3},
+    "jwt": {"rel-jwt": 3},
+    "jsonwebtokn": {"rel-jwt": 3},
+    "oauth login": {"rel-idp": 3},
+    "checkout outage": {"rel-checkout-outage": 3, "rel-checkout-web": 1},
+    "production-eu": {"rel-prod-eu": 3},
+    "payments platform": {"rel-payments-team": 3},
+    "key vault payments": {"rel-kv-payments": 3},
+    "tag:auth": {"rel-idp": 2, "rel-jwt": 2},
+    '"card payments"': {"rel-payments-api": 3, "rel-payments-worker": 3},
+}
+
+MIN_NDCG = 0.85
+MIN_MEAN_NDCG = 0.95
+
+
+def ndcg(ranked_ids: list[str], gains: dict[str, int], k: int = K) -> float:
+    dcg = sum(
+        (2 ** gains.get(doc_id, 0) - 1) / math.log2(i + 2)
+        for i, doc_id in enumerate(ranked_ids[:k])
+    )
+    ideal = sorted(gains.values(), reverse=True)[:k]
+    idcg = sum((2 ** g - 1) / math.log2(i + 2) for i, g in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+@pytest.fixture(scope="module")
+def relevance_index():
+    noise = [
+        doc
+        for label, vertices in synthetic_vertices(NOISE_SIZE, seed=7).items()
+        for v in vertices
+        if (doc := _vertex_to_document(v, label)) is not None
+    ]
+    index = SearchIndex()
+    index.replace_all(noise + LABELLED)
+    return index
+
+
+def test_ndcg_formula():
+    assert ndcg(["a", "b"], {"a": 3, "b": 1}) == pytest.approx(1.0)
+    assert ndcg(["b", "a"], {"a": 3, "b": 1}) < 1.0
+    assert ndcg(["x"], {"a": 3}) == 0.0
+
+
+@pytest.mark.parametrize("query", sorted(JUDGEMENTS))
+def test_query_ndcg(relevance_index, query):
+    hits = relevance_index.search(query, limit=K, params=ranking_params())
+    score = ndcg([d.id for d, _ in hits], JUDGEMENTS[query])
+    assert score >= MIN_NDCG, f"{query!r}: NDCG@{K}={score:.3f} ranked {[d.name for d, _ in hits]}"
+
+
+def test_mean_ndcg(benchmark, relevance_index):
+    params = ranking_params()
+
+    def evaluate():
+        return [
+            ndcg([d.id for d, _ in relevance_index.search(q, limit=K, params=params)], gains)
+            for q, gains in JUDGEMENTS.items()
+        ]
+
+    scores = benchmark.pedantic(evaluate, rounds=3, iterations=1)
+    mean = sum(scores) / len(scores)
+    benchmark.extra_info["mean_ndcg"] = round(mean, 4)
+    assert mean >= MIN_MEAN_NDCG
@@ -0,0 +1,60 @@
+import contextlib
+from unittest.mock import patch
+
+import fakeredis
+import fakeredis.aioredis
+import httpx
+import pytest
+
+from app.clients.http_client import close_http_clients, set_transport_factory
+from app.workers.runtime import run_async
+
+# Modules that import get_redis by name; the redis fixtures patch each of them
+REDIS_MODULES = (
+    "app.clients.http_client",
+    "app.modules.catalog.repository",
+    "app.modules.entities.repository",
+    "app.modules.ingestion.bus",
+    "app.modules.ingestion.coalesce",
+    "app.modules.ingestion.dead_letters",
+    "app.modules.ingestion.locations",
+    "app.modules.ingestion.org_sync",
+    "app.modules.ingestion.tasks",
+    "app.modules.search.events",
+    "app.modules.search.service",
+)
+
+
+@pytest.fixture
+def redis_server():
+    """
+    One in-memory Redis behind every module's get_redis. Each call returns a new client,
+    so tasks run on the worker loop (run_async) never share a connection with the test.
+    """
+    server = fakeredis.FakeServer()
+
+    async def fake_get_redis():
+        return fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+
+    with contextlib.ExitStack() as stack:
+        for module in REDIS_MODULES:
+            stack.enter_context(patch(f"{module}.get_redis", side_effect=fake_get_redis))
+        yield server
+
+
+@pytest.fixture
+def redis(redis_server):
+    """A client on the shared fake server, for tests that inspect or seed Redis."""
+    return fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+@pytest.fixture
+def http_mock():
+    """Route new pooled HTTP clients through httpx.MockTransport: http_mock(handler)."""
+
+    def install(handler):
+        set_transport_factory(lambda: httpx.MockTransport(handler))
+
+    yield install
+    set_transport_factory(None)
+    run_async(close_http_clients())
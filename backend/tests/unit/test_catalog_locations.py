@@ -0,0 +1,160 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.modules.ingestion.catalog_parser import make_deterministic_id
+from app.modules.ingestion.locations import crawl_catalog
+
+REPO = "https://github.com/acme/platform"
+RAW = "https://raw.githubusercontent.com/acme/platform/HEAD/"
+
+ROOT = """
+kind: Component
+metadata:
+  name: platform
+spec:
+  owner: team-platform
+---
+kind: Location
+spec:
+  targets:
+    - ./packages/auth/catalog-info.yaml
+    - ./packages/billing/catalog-info.yaml
+    - ./packages/search/catalog-info.yaml
+    - ./packages/*/catalog-info.yaml
+    - https://github.com/acme/other/blob/main/catalog-info.yaml
+"""
+
+PACKAGE = "kind: Component\nmetadata:\n  name: {name}\nspec:\n  owner: {owner}\n"
+
+BILLING = PACKAGE.format(name="billing", owner="team-billing") + """---
+kind: Location
+spec:
+  target: ./invoices/catalog-info.yaml
+"""
+
+
+class _Monorepo:
+    """Raw catalog files served with ETags; a version bump changes a file's body."""
+
+    def __init__(self):
+        self.files = {
+            "catalog-info.yaml": ROOT,
+            "packages/auth/catalog-info.yaml": PACKAGE.format(name="auth", owner="team-auth"),
+            "packages/billing/catalog-info.yaml": BILLING,
+            "packages/search/catalog-info.yaml": PACKAGE.format(name="search", owner="team-search"),
+            "packages/billing/invoices/catalog-info.yaml": PACKAGE.format(
+                name="invoices", owner="team-billing"
+            ),
+        }
+        self.versions = dict.fromkeys(self.files, 1)
+        self.requests: list[tuple[str, int]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def change(self, path: str, body: str) -> None:
+        self.files[path] = body
+        self.versions[path] += 1
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            path = str(request.url).removeprefix(RAW)
+            if path not in self.files:
+                resp = httpx.Response(404)
+            else:
+                etag = f'"{path}@{self.versions[path]}"'
+                if request.headers.get("If-None-Match") == etag:
+                    resp = httpx.Response(304, headers={"ETag": etag})
+                else:
+                    resp = httpx.Response(200, text=self.files[path], headers={"ETag": etag})
+            self.requests.append((path, resp.status_code))
+            return resp
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def monorepo(monkeypatch, http_mock):
+    monkeypatch.setattr(get_settings(), "catalog_location_concurrency", 2)
+    mock = _Monorepo()
+    http_mock(mock)
+    return mock
+
+
+def _names(crawl):
+    return sorted(data.name for _, data in crawl.components)
+
+
+async def test_crawl_follows_nested_locations(monorepo, redis):
+    crawl = await crawl_catalog(REPO)
+    assert crawl.root_status == 200
+    assert _names(crawl) == ["auth", "billing", "invoices", "platform", "search"]
+    assert crawl.files == 5
+    assert crawl.skipped_targets == 2           # the glob and the other repo
+    assert monorepo.max_in_flight <= 2
+
+    ids = {data.name: entity_id for entity_id, data in crawl.components}
+    assert ids["platform"] == make_deterministic_id(REPO)
+    assert ids["invoices"] == make_deterministic_id(f"{REPO}#invoices")
+
+
+async def test_unchanged_root_still_reaches_changed_nested_file(monorepo, redis):
+    await (await crawl_catalog(REPO)).commit()
+
+    monorepo.requests.clear()
+    monorepo.change(
+        "packages/billing/invoices/catalog-info.yaml",
+        PACKAGE.format(name="invoices", owner="team-finance"),
+    )
+    crawl = await crawl_catalog(REPO)
+    assert crawl.root_status == 304
+    assert [(data.name, data.team) for _, data in crawl.components] == [
+        ("invoices", "team-finance")
+    ]
+    assert sorted(monorepo.requests) == [
+        ("catalog-info.yaml", 304),
+        ("packages/auth/catalog-info.yaml", 304),
+        ("packages/billing/catalog-info.yaml", 304),
+        ("packages/billing/invoices/catalog-info.yaml", 200),
+        ("packages/search/catalog-info.yaml", 304),
+    ]
+
+
+async def test_nothing_is_remembered_until_commit(monorepo, redis):
+    await crawl_catalog(REPO)
+    monorepo.requests.clear()
+    crawl = await crawl_catalog(REPO)
+    assert len(crawl.components) == 5
+    assert all(status == 200 for _, status in monorepo.requests)
+
+
+async def test_missing_files(monorepo, redis):
+    del monorepo.files["packages/search/catalog-info.yaml"]
+    crawl = await crawl_catalog(REPO)
+    assert (crawl.missing, len(crawl.components)) == (1, 4)
+
+    del monorepo.files["catalog-info.yaml"]
+    crawl = await crawl_catalog(REPO)
+    assert (crawl.root_status, crawl.components) == (404, [])
+
+
+async def test_crawl_reports_kinds_it_does_not_ingest(monorepo, redis):
+    monorepo.change(
+        "packages/auth/catalog-info.yaml",
+        PACKAGE.format(name="auth", owner="team-auth")
+        + "---\nkind: API\nmetadata:\n  name: auth-api\n"
+        + "---\nkind: System\nmetadata:\n  name: identity\n",
+    )
+    monorepo.change(
+        "packages/search/catalog-info.yaml",
+        PACKAGE.format(name="search", owner="team-search")
+        + "---\nkind: API\nmetadata:\n  name: search-api\n",
+    )
+    crawl = await crawl_catalog(REPO)
+    assert _names(crawl) == ["auth", "billing", "invoices", "platform", "search"]
+    assert crawl.skipped_kinds == {"API": 2, "System": 1}
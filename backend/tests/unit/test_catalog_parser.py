@@ -1,6 +1,10 @@
-import pytest
-from app.modules.ingestion.catalog_parser import parse_catalog_info, make_deterministic_id
-
+from app.modules.ingestion.catalog_parser import (
+    component_id,
+    make_deterministic_id,
+    parse_catalog_documents,
+    parse_catalog_info,
+    resolve_location_target,
+)
 
 VALID_YAML = """
 apiVersion: nexus.io/v1
@@ -71,3 +75,73 @@ def test_deterministic_id_is_valid_uuid():
     import uuid
     id1 = make_deterministic_id("https://github.com/org/repo")
     uuid.UUID(id1)  # Should not raise
+
+
+MONOREPO_CATALOG = """
+apiVersion: backstage.io/v1alpha1
+kind: Component
+metadata:
+  name: platform-gateway
+spec:
+  owner: team-platform
+---
+apiVersion: backstage.io/v1alpha1
+kind: Location
+metadata:
+  name: platform-packages
+spec:
+  targets:
+    - ./packages/auth/catalog-info.yaml
+    - ./packages/billing/catalog-info.yaml
+---
+apiVersion: backstage.io/v1alpha1
+kind: Component
+metadata:
+  name: platform-admin
+spec:
+  owner: team-platform
+---
+apiVersion: backstage.io/v1alpha1
+kind: API
+metadata:
+  name: platform-api
+"""
+
+
+def test_parse_multi_document_catalog():
+    docs = parse_catalog_documents(MONOREPO_CATALOG, "https://github.com/org/platform")
+    assert [c.name for c in docs.components] == ["platform-gateway", "platform-admin"]
+    assert docs.targets == [
+        "./packages/auth/catalog-info.yaml",
+        "./packages/billing/catalog-info.yaml",
+    ]
+    assert docs.skipped_kinds == {"API": 1}
+    assert parse_catalog_info(MONOREPO_CATALOG).name == "platform-gateway"
+
+
+def test_parse_multi_document_keeps_documents_before_a_yaml_error():
+    docs = parse_catalog_documents("metadata:\n  name: first\n---\nkey: [unclosed\n")
+    assert [c.name for c in docs.components] == ["first"]
+
+
+def test_resolve_location_target():
+    repo = "https://github.com/org/platform"
+    base = "https://raw.githubusercontent.com/org/platform/HEAD/catalog-info.yaml"
+    raw = "https://raw.githubusercontent.com/org/platform/"
+    assert resolve_location_target(base, "./packages/auth/catalog-info.yaml", repo) == (
+        raw + "HEAD/packages/auth/catalog-info.yaml"
+    )
+    assert resolve_location_target(
+        base, "https://github.com/org/platform/blob/main/apps/catalog-info.yaml", repo
+    ) == raw + "main/apps/catalog-info.yaml"
+    assert resolve_location_target(base, "./packages/*/catalog-info.yaml", repo) is None
+    assert resolve_location_target(base, "../../other/HEAD/catalog-info.yaml", repo) is None
+    assert resolve_location_target(
+        base, "https://github.com/org/other/blob/main/catalog-info.yaml", repo
+    ) is None
+
+
+def test_component_id_keeps_repo_id_for_primary_component():
+    repo = "https://github.com/org/platform"
+    assert component_id(repo, "platform-gateway", primary=True) == make_deterministic_id(repo)
+    assert component_id(repo, "auth", primary=False) == make_deterministic_id(f"{repo}#auth")
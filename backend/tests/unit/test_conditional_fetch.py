@@ -0,0 +1,95 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.clients.http_client import close_http_clients, conditional_get, remember_validators
+from app.modules.ingestion import tasks
+from app.workers.runtime import run_async
+
+CATALOG_INFO = b"""\
+apiVersion: backstage.io/v1alpha1
+kind: Component
+metadata:
+  name: payments
+spec:
+  owner: team-payments
+"""
+
+
+class _CatalogHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802 - BaseHTTPRequestHandler dispatch name
+        server = self.server
+        etag = f'"v{server.version}"'
+        server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == etag:
+            server.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = server.body
+        server.statuses.append(200)
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Mon, 19 Oct 2026 09:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CatalogHandler)
+    server.version, server.body, server.requests, server.statuses = 1, CATALOG_INFO, [], []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def test_validators_are_sent_only_after_remembering(stub_server, redis_server):
+    url = f"http://127.0.0.1:{stub_server.server_port}/catalog-info.yaml"
+    try:
+        first = await conditional_get(url)
+        assert first.status_code == 200
+        # Not remembered yet (e.g. processing failed): the next poll refetches the body
+        assert (await conditional_get(url)).status_code == 200
+
+        await remember_validators(url, first)
+        assert (await conditional_get(url)).status_code == 304
+        assert stub_server.requests[-1]["If-None-Match"] == '"v1"'
+        assert stub_server.requests[-1]["If-Modified-Since"] == "Mon, 19 Oct 2026 09:00:00 GMT"
+
+        stub_server.version = 2
+        assert (await conditional_get(url)).status_code == 200
+    finally:
+        await close_http_clients()
+
+
+def test_ingest_skips_unchanged_catalog_info(stub_server, redis_server):
+    repo_url = f"http://127.0.0.1:{stub_server.server_port}"
+    service_repo = AsyncMock()
+    service_repo.upsert_many.return_value = [None]
+    try:
+        with patch("app.modules.ingestion.tasks.ServiceRepository", return_value=service_repo):
+            tasks.ingest_github_repo.apply(args=(repo_url,)).get()
+            tasks.ingest_github_repo.apply(args=(repo_url,)).get()
+            assert stub_server.statuses == [200, 304]
+            assert service_repo.upsert_many.await_count == 1
+
+            stub_server.version = 2
+            stub_server.body = CATALOG_INFO.replace(b"team-payments", b"team-billing")
+            tasks.ingest_github_repo.apply(args=(repo_url,)).get()
+            assert stub_server.statuses == [200, 304, 200]
+            assert service_repo.upsert_many.await_count == 2
+    finally:
+        run_async(close_http_clients())
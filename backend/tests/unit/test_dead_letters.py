@@ -0,0 +1,167 @@
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+from jose import jwt
+
+from app.config import get_settings
+from app.core import security
+from app.main import app
+from app.modules.entities.repository import EntityRepository
+from app.modules.ingestion import dead_letters, tasks
+from app.modules.ingestion.sbom import package_id
+from app.modules.relationships.repository import RelationshipRepository
+from app.workers.runtime import run_async
+
+PD_INCIDENT = {"id": "PD7", "title": "Checkout 500s", "urgency": "high", "status": "triggered"}
+
+
+@pytest.fixture
+def gremlin_down():
+    down = AsyncMock(side_effect=ConnectionError("cosmos unavailable"))
+    with patch.object(EntityRepository, "upsert", down):
+        yield
+
+
+def _fail_pagerduty_task():
+    # Final attempt (retries == max_retries): the retry re-raises and the task fails for good
+    result = tasks.ingest_pagerduty_incident.apply(
+        args=("incident.triggered", PD_INCIDENT), retries=2
+    )
+    assert result.failed()
+
+
+def test_exhausted_task_is_dead_lettered(redis_server, gremlin_down):
+    _fail_pagerduty_task()
+    _fail_pagerduty_task()
+
+    entries = run_async(dead_letters.list_dead_letters())
+    assert len(entries) == 1
+    [entry] = entries
+    assert entry.task == "ingestion.ingest_pagerduty_incident"
+    assert entry.source == "pagerduty"
+    assert entry.args == ["incident.triggered", PD_INCIDENT]
+    assert entry.exception == "ConnectionError"
+    assert entry.attempts == 6
+    assert entry.first_failed_at <= entry.last_failed_at
+
+
+def test_dead_letter_never_holds_the_github_token(redis_server, http_mock, monkeypatch):
+    monkeypatch.setattr(get_settings(), "github_token", "ghp_secret")
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.headers.get("Authorization"))
+        return httpx.Response(503)
+
+    http_mock(handler)
+    result = tasks.ingest_github_dependencies.apply(
+        args=("https://github.com/acme/api", "acme", "api"), retries=3
+    )
+    assert result.failed()
+
+    assert sent == ["Bearer ghp_secret"]
+    [entry] = run_async(dead_letters.list_dead_letters("github"))
+    assert entry.args == ["https://github.com/acme/api", "acme", "api"]
+    assert "ghp_secret" not in entry.model_dump_json()
+
+
+def test_replayed_dependency_ingestion_writes_the_graph(redis_server, http_mock):
+    sbom = {"sbom": {"packages": [{"name": "left-pad", "versionInfo": "1.3.0"}]}}
+    http_mock(lambda _: httpx.Response(200, json=sbom))
+    upserts = AsyncMock(side_effect=ConnectionError("cosmos down"))
+    args = ("https://github.com/acme/api", "acme", "api")
+    with patch.object(EntityRepository, "get_many", AsyncMock(return_value={})), \
+         patch.object(EntityRepository, "upsert_many", upserts), \
+         patch.object(RelationshipRepository, "reconcile_outgoing",
+                      AsyncMock(return_value=([], []))):
+        assert tasks.ingest_github_dependencies.apply(args=args, retries=3).failed()
+
+        upserts.side_effect = None
+        with patch.object(dead_letters.celery_app, "send_task") as send_task:
+            [replayed] = run_async(dead_letters.replay_dead_letters(source="github"))
+        [call] = send_task.call_args_list
+        result = tasks.ingest_github_dependencies.apply(
+            args=call.kwargs["args"], kwargs=call.kwargs["kwargs"]
+        )
+
+    assert result.successful()
+    assert upserts.await_count == 2
+    [(written_id, _)] = upserts.await_args.args[0]
+    assert written_id == package_id("left-pad", "1.3.0")
+    assert run_async(dead_letters.count_dead_letters()) == 0
+
+
+def test_failure_rate_per_source(redis_server, gremlin_down):
+    _fail_pagerduty_task()
+    with patch.object(EntityRepository, "upsert", AsyncMock(return_value=(None, True))):
+        resolved = {**PD_INCIDENT, "id": "PD8"}
+        tasks.ingest_pagerduty_incident.apply(args=("incident.resolved", resolved)).get()
+        alert = {"alertId": "A1", "message": "disk"}
+        tasks.ingest_opsgenie_alert.apply(args=("Create", alert)).get()
+
+    stats = {s.source: s for s in run_async(dead_letters.failure_stats(hours=1))}
+    assert (stats["pagerduty"].succeeded, stats["pagerduty"].failed) == (1, 1)
+    assert stats["pagerduty"].failure_rate == 0.5
+    assert stats["pagerduty"].dead_letters == 1
+    assert (stats["opsgenie"].succeeded, stats["opsgenie"].failure_rate) == (1, 0.0)
+    assert stats["github"].failure_rate == 0.0
+
+
+async def test_replay_and_purge(redis_server):
+    for i in range(3):
+        await dead_letters.dead_letter(
+            "ingestion.ingest_pagerduty_incident", "pagerduty",
+            ["incident.triggered", {"id": f"P{i}"}], {}, ConnectionError("down"), attempts=3,
+        )
+    await dead_letters.dead_letter(
+        "ingestion.ingest_ado_work_item", "ado",
+        ["workitem.updated", {"id": 1}], {}, KeyError("x"), attempts=3,
+    )
+
+    with patch.object(dead_letters.celery_app, "send_task") as send_task:
+        replayed = await dead_letters.replay_dead_letters(source="pagerduty")
+    assert len(replayed) == 3
+    assert {c.kwargs["args"][1]["id"] for c in send_task.call_args_list} == {"P0", "P1", "P2"}
+    assert await dead_letters.count_dead_letters("pagerduty") == 0
+    assert await dead_letters.count_dead_letters() == 1
+
+    assert await dead_letters.purge_dead_letters(source="ado") == 1
+    assert await dead_letters.count_dead_letters() == 0
+
+
+async def test_replay_stops_while_broker_is_down(redis_server):
+    await dead_letters.dead_letter("ingestion.ingest_github_repo", "github",
+                                   ["https://github.com/a/b"], {}, ConnectionError("down"),
+                                   attempts=4)
+    with patch.object(dead_letters.celery_app, "send_task", side_effect=OSError("broker down")):
+        assert await dead_letters.replay_dead_letters() == []
+    assert await dead_letters.count_dead_letters() == 1
+
+
+async def test_admin_endpoints_require_admin(redis_server):
+    await dead_letters.dead_letter("ingestion.ingest_github_repo", "github",
+                                   ["https://github.com/a/b"], {}, ConnectionError("down"),
+                                   attempts=4)
+    admin = jwt.encode({"oid": "u1", "groups": ["g-admins"]}, "k", algorithm="HS256")
+    developer = jwt.encode({"oid": "u2", "groups": []}, "k", algorithm="HS256")
+
+    with patch.dict(security.GROUP_ROLE_MAP, {"g-admins": "Admin"}):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            denied = await client.get("/api/v1/ingestion/dead-letters",
+                                      headers={"Authorization": f"Bearer {developer}"})
+            listed = await client.get("/api/v1/ingestion/dead-letters?source=github",
+                                      headers={"Authorization": f"Bearer {admin}"})
+            bad_source = await client.get("/api/v1/ingestion/dead-letters?source=jira",
+                                          headers={"Authorization": f"Bearer {admin}"})
+            purged = await client.post("/api/v1/ingestion/dead-letters/purge",
+                                       json={"source": "github"},
+                                       headers={"Authorization": f"Bearer {admin}"})
+
+    assert denied.status_code == 403
+    assert listed.status_code == 200
+    assert listed.json()["meta"]["total"] == 1
+    assert listed.json()["data"][0]["exception"] == "ConnectionError"
+    assert bad_source.status_code == 422
+    assert purged.json()["data"]["purged"] == 1
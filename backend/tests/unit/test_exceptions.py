@@ -1,12 +1,9 @@
-import pytest
 from app.core.exceptions import (
-    NexusError,
-    NotFoundError,
     AuthenticationError,
     AuthorizationError,
-    ValidationError,
     ConflictError,
     ExternalServiceError,
+    NotFoundError,
 )
 
 
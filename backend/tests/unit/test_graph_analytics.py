@@ -0,0 +1,38 @@
+from app.modules.relationships.analytics import analyse_edges, strongly_connected_components
+from app.modules.relationships.models import GraphEdge
+
+
+def _e(i, src, tgt, rel="depends_on"):
+    return GraphEdge(id=f"e{i}", source_id=src, target_id=tgt, relationship_type=rel)
+
+
+def test_scc_finds_cycle_and_singletons():
+    comps = strongly_connected_components({"a": {"b"}, "b": {"c"}, "c": {"a", "d"}, "d": set()})
+    assert sorted(sorted(c) for c in comps) == [["a", "b", "c"], ["d"]]
+
+
+def test_scc_deep_chain_does_not_recurse():
+    adjacency = {str(i): {str(i + 1)} for i in range(5000)}
+    assert len(strongly_connected_components(adjacency)) == 5001
+
+
+def test_analyse_reports_dependency_cycles_only():
+    edges = [
+        _e(1, "a", "b"),
+        _e(2, "b", "a"),
+        _e(3, "c", "d", "owned_by"),
+        _e(4, "d", "c", "owned_by"),
+    ]
+    report = analyse_edges(edges)
+    assert report.cycles == [["a", "b"]]
+    assert report.edge_count == 4
+
+
+def test_analyse_flags_fan_out_outlier_and_hotspot():
+    edges = [_e(i, "hub", f"leaf{i}") for i in range(80)]
+    edges += [_e(100 + i, f"svc{i}", f"lib{i}") for i in range(40)]
+    report = analyse_edges(edges)
+    assert report.top_degree[0].entity_id == "hub"
+    assert [s.entity_id for s in report.fan_out_outliers] == ["hub"]
+    assert report.hotspot_ids == ["hub"]
+    assert report.degree_histogram["1"] == 160
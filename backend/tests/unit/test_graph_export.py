@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from app.modules.relationships.repository import RelationshipRepository
+
+
+def _paged(rows):
+    """Fake execute_query that honours the keyset bindings: ids after `after`, up to `limit`."""
+    calls = []
+
+    def fake(query, bindings=None):
+        assert "range(" not in query
+        calls.append(bindings)
+        ordered = sorted(rows, key=lambda r: r["id"])
+        return [r for r in ordered if r["id"] > bindings["after"]][:bindings["limit"]]
+
+    return fake, calls
+
+
+async def test_iter_nodes_pages_by_id_until_short_page():
+    rows = [
+        {"id": f"v{i}", "label": "Service", "props": {"name": [f"svc-{i}"]}} for i in range(5)
+    ] + [{"id": "inc", "label": "Incident", "props": {"title": ["Outage"]}}]
+    fake, calls = _paged(rows)
+    with patch("app.modules.relationships.repository.execute_query", side_effect=fake):
+        nodes = [n async for n in RelationshipRepository().iter_nodes(page_size=2)]
+    assert [n.id for n in nodes] == ["inc", "v0", "v1", "v2", "v3", "v4"]
+    assert nodes[0].name == "Outage"
+    assert [c["after"] for c in calls] == ["", "v0", "v2", "v4"]
+
+
+async def test_iter_edges_skips_dangling_rows():
+    rows = [
+        {"id": "e1", "label": "depends_on", "src": "a", "tgt": "b"},
+        {"id": "e2", "label": "depends_on", "src": "a", "tgt": None},
+    ]
+    fake, _ = _paged(rows)
+    with patch("app.modules.relationships.repository.execute_query", side_effect=fake):
+        edges = [e async for e in RelationshipRepository().iter_edges(labels=["Service"])]
+    assert [(e.id, e.source_id, e.target_id) for e in edges] == [("e1", "a", "b")]
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.clients.http_client import close_http_clients, get_http_client, set_transport_factory
+from app.config import get_settings
+from app.modules.actions.models import ActionExecution
+from app.modules.actions.service import _dispatch_http_webhook
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def do_POST(self):  # noqa: N802 - BaseHTTPRequestHandler dispatch name
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append((self.client_address, json.loads(body or b"{}")))
+        out = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+async def fresh_clients():
+    yield
+    set_transport_factory(None)
+    await close_http_clients()
+
+
+def test_clients_are_shared_per_origin():
+    assert get_http_client("https://api.github.com/a") is get_http_client("https://API.github.com:443/b")
+    assert get_http_client("https://api.github.com/") is not get_http_client("https://dev.azure.com/")
+    with pytest.raises(ValueError):
+        get_http_client("/relative")
+
+
+async def test_webhook_dispatch_reuses_one_connection(stub_server):
+    url = f"http://127.0.0.1:{stub_server.server_port}/hook"
+    for i in range(5):
+        execution = ActionExecution(
+            action_id="a1", action_name="Hook", triggered_by="u1", parameters={"n": i}
+        )
+        assert await _dispatch_http_webhook({"url": url}, {"n": i}, execution) == execution.id
+
+    assert [payload["parameters"]["n"] for _, payload in stub_server.requests] == [0, 1, 2, 3, 4]
+    # Every request arrived from the same client socket: keep-alive, no reconnects
+    assert len({address for address, _ in stub_server.requests}) == 1
+
+
+async def test_injected_transport():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        return httpx.Response(200, json={"id": 42})
+
+    set_transport_factory(lambda: httpx.MockTransport(handler))
+    resp = await get_http_client("https://dev.azure.com/").get("https://dev.azure.com/org/_apis/x")
+    assert resp.json() == {"id": 42}
+    assert seen == ["https://dev.azure.com/org/_apis/x"]
+
+
+async def test_least_recently_used_client_is_evicted_and_closed(monkeypatch):
+    monkeypatch.setattr(get_settings(), "http_max_pooled_origins", 2)
+    monkeypatch.setattr(get_settings(), "http_timeout_seconds", 0.01)
+    a = get_http_client("https://a.example/")
+    b = get_http_client("https://b.example/")
+    assert get_http_client("https://a.example/x") is a     # a is now the most recent
+    get_http_client("https://c.example/")
+
+    assert get_http_client("https://a.example/") is a
+    assert not b.is_closed                                # in-flight requests may finish
+    await asyncio.sleep(0.05)
+    assert b.is_closed and not a.is_closed
+    assert get_http_client("https://b.example/") is not b
+
+
+async def test_shutdown_closes_clients_awaiting_eviction(monkeypatch):
+    monkeypatch.setattr(get_settings(), "http_max_pooled_origins", 1)
+    first = get_http_client("https://a.example/")
+    get_http_client("https://b.example/")
+    await close_http_clients()
+    assert first.is_closed
@@ -0,0 +1,209 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.config import get_settings
+from app.modules.ingestion import dead_letters, tasks
+from app.modules.ingestion.bus import (
+    GROUP,
+    IngestionBus,
+    publish,
+    stream_key,
+)
+from app.modules.ingestion.router import github_webhook
+
+
+class _PushRequest:
+    async def body(self):
+        return json.dumps({
+            "ref": "refs/heads/main",
+            "repository": {
+                "html_url": "https://github.com/acme/api", "name": "api",
+                "owner": {"login": "acme"}, "default_branch": "main",
+            },
+        }).encode()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def dispatched():
+    with patch("app.modules.ingestion.bus.coalesce", new_callable=AsyncMock) as coalesce:
+        yield coalesce
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    s = get_settings()
+    monkeypatch.setattr(s, "ingestion_bus_batch_size", 10)
+    monkeypatch.setattr(s, "ingestion_bus_rate_per_second", 1000.0)
+    monkeypatch.setattr(s, "ingestion_bus_source_rates", {})
+    monkeypatch.setattr(s, "ingestion_bus_claim_idle_ms", 0)
+    monkeypatch.setattr(s, "ingestion_bus_max_deliveries", 2)
+    return s
+
+
+async def _bus(clock=None, depth=0):
+    bus = IngestionBus(
+        consumer="c1", queue_depth=AsyncMock(return_value=depth), clock=clock or _Clock()
+    )
+    await bus.ensure_groups()
+    return bus
+
+
+def _keys(mock):
+    return [c.args[1] for c in mock.await_args_list]
+
+
+async def test_events_are_dispatched_and_acked(redis, dispatched, settings):
+    bus = await _bus()
+    await publish(
+        "pagerduty", tasks.ingest_pagerduty_incident, "PD1", "incident.triggered", {"id": "PD1"}
+    )
+    assert await bus.poll_once() == 1
+    dispatched.assert_awaited_once_with(
+        tasks.ingest_pagerduty_incident, "PD1", "incident.triggered", {"id": "PD1"}
+    )
+    assert (await redis.xpending(stream_key("pagerduty"), GROUP))["pending"] == 0
+
+
+async def test_noisy_source_does_not_starve_others(redis, dispatched, settings):
+    bus = await _bus()
+    for i in range(200):
+        await publish("github", tasks.ingest_github_repo, f"repo-{i}", f"repo-{i}")
+    for i in range(3):
+        await publish(
+            "opsgenie", tasks.ingest_opsgenie_alert, f"A{i}", "Create", {"alertId": f"A{i}"}
+        )
+
+    assert await bus.poll_once() == 13
+    keys = _keys(dispatched)
+    assert {"A0", "A1", "A2"} <= set(keys)
+    assert sum(k.startswith("repo-") for k in keys) == 10
+
+
+async def test_per_source_rate_limit(redis, dispatched, settings, monkeypatch):
+    monkeypatch.setattr(settings, "ingestion_bus_source_rates", {"github": 5.0})
+    clock = _Clock()
+    bus = await _bus(clock)
+    for i in range(40):
+        await publish("github", tasks.ingest_github_repo, f"repo-{i}", f"repo-{i}")
+
+    assert await bus.poll_once() == 5           # 5 per one-second window
+    assert await bus.poll_once() == 0           # window used up
+    clock.now += 1.0
+    assert await bus.poll_once() == 5
+    assert len(await redis.xrange(stream_key("github"))) == 40
+
+
+async def test_rate_limit_is_shared_by_all_consumers(redis, dispatched, settings, monkeypatch):
+    monkeypatch.setattr(settings, "ingestion_bus_source_rates", {"github": 8.0})
+    clock = _Clock()
+    first = await _bus(clock)
+    second = IngestionBus(consumer="c2", queue_depth=AsyncMock(return_value=0), clock=clock)
+    await publish("github", tasks.ingest_github_repo, "repo-0", "repo-0")
+
+    assert await first.poll_once() == 1         # unused allowance goes back to the window
+    for i in range(1, 40):
+        await publish("github", tasks.ingest_github_repo, f"repo-{i}", f"repo-{i}")
+    assert await second.poll_once() == 7
+    assert await first.poll_once() == 0
+    clock.now += 1.0
+    assert await first.poll_once() + await second.poll_once() == 8
+
+
+async def test_stream_entries_never_hold_the_github_token(redis, dispatched, settings, monkeypatch):
+    monkeypatch.setattr(settings, "github_token", "ghp_secret")
+    with patch("app.modules.ingestion.router._verify_github_signature", return_value=True):
+        await github_webhook(_PushRequest(), x_hub_signature_256="sha256=x", x_github_event="push")
+
+    entries = await redis.xrange(stream_key("github"))
+    assert [e[1]["task"] for e in entries] == [
+        tasks.ingest_github_repo.name, tasks.ingest_github_dependencies.name,
+    ]
+    assert not any("ghp_secret" in value for _, fields in entries for value in fields.values())
+
+
+async def test_backpressure_leaves_events_in_stream(redis, dispatched, settings):
+    bus = await _bus(depth=10_000)
+    await publish("github", tasks.ingest_github_repo, "repo", "repo")
+    assert await bus.poll_once() == 0
+    dispatched.assert_not_awaited()
+    assert (await redis.xinfo_groups(stream_key("github")))[0]["lag"] == 1
+
+
+async def test_failed_dispatch_is_reclaimed_then_dead_lettered_and_replayable(
+    redis, dispatched, settings
+):
+    bus = await _bus()
+    dispatched.side_effect = ConnectionError("broker down")
+    await publish("ado", tasks.ingest_ado_work_item, "42", "workitem.updated", {"id": 42})
+
+    assert await bus.poll_once() == 1           # delivery 1 fails, stays pending
+    assert await bus.poll_once() == 1           # reclaimed: delivery 2 fails
+    assert dispatched.await_count == 2
+    await bus.poll_once()                       # delivery 3 exceeds max → dead letter
+    assert dispatched.await_count == 2
+    assert (await redis.xpending(stream_key("ado"), GROUP))["pending"] == 0
+    [entry] = await dead_letters.list_dead_letters("ado")
+    assert entry.task == tasks.ingest_ado_work_item.name
+    assert entry.key == "42"
+    assert entry.args == ["workitem.updated", {"id": 42}]
+    assert entry.exception == "DeliveryError"
+    assert entry.error == "max deliveries exceeded"
+    assert entry.attempts == 2
+
+    dispatched.side_effect = None
+    with patch.object(dead_letters.celery_app, "send_task") as send_task:
+        assert await dead_letters.replay_dead_letters(source="ado") == [entry.id]
+    send_task.assert_not_called()               # back through the stream, not straight to Celery
+    assert await dead_letters.count_dead_letters() == 0
+    assert await bus.poll_once() == 1
+    assert dispatched.await_args.args[1:] == ("42", "workitem.updated", {"id": 42})
+
+
+async def test_delivery_counts_cover_every_claimed_entry(redis, dispatched, settings, monkeypatch):
+    monkeypatch.setattr(settings, "ingestion_bus_claim_idle_ms", 60_000)
+    bus = await _bus()
+    dispatched.side_effect = ConnectionError("broker down")
+    for key in ("a", "b", "c"):
+        await publish("ado", tasks.ingest_ado_work_item, key, "workitem.updated", {"id": key})
+    assert await bus.poll_once() == 3           # all three pending for c1
+
+    first, middle, last = [e for e, _ in await redis.xrange(stream_key("ado"))]
+    # First and last are idle and over max deliveries; the middle one is still fresh
+    await redis.xclaim(stream_key("ado"), GROUP, "c1", 0, [first, last], idle=120_000,
+                       retrycount=5)
+    await redis.xclaim(stream_key("ado"), GROUP, "c1", 0, [middle], idle=0)
+    bus._claim_cursor["ado"] = "0-0"
+    dispatched.reset_mock()
+    await bus.poll_once()
+
+    dead = await dead_letters.list_dead_letters("ado")
+    assert sorted(e.key for e in dead) == ["a", "c"]
+    dispatched.assert_not_awaited()
+
+
+async def test_unknown_task_is_dead_lettered(redis, dispatched, settings):
+    bus = await _bus()
+    await redis.xadd(stream_key("github"), {"task": "no.such.task", "key": "k", "args": "[]"})
+    await bus.poll_once()
+    dispatched.assert_not_awaited()
+    [entry] = await dead_letters.list_dead_letters("github")
+    assert entry.error.startswith("unknown task")
+    assert (await redis.xpending(stream_key("github"), GROUP))["pending"] == 0
+
+
+async def test_publish_falls_back_to_direct_dispatch(dispatched):
+    with patch(
+        "app.modules.ingestion.bus.get_redis", new_callable=AsyncMock, side_effect=ConnectionError
+    ):
+        await publish("github", tasks.ingest_github_repo, "repo", "repo")
+    dispatched.assert_awaited_once_with(tasks.ingest_github_repo, "repo", "repo")
@@ -0,0 +1,93 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config import get_settings
+from app.modules.ingestion import coalesce as coalesce_mod
+from app.modules.ingestion.coalesce import coalesce, take_latest
+from app.modules.ingestion.router import github_webhook
+
+
+@pytest.fixture
+def flush():
+    with patch.object(coalesce_mod.flush_coalesced, "apply_async") as apply_async:
+        yield apply_async
+
+
+def _task(name="ingestion.ingest_github_repo"):
+    task = MagicMock()
+    task.name = name
+    return task
+
+
+async def test_burst_collapses_to_one_flush_with_latest_args(redis, flush):
+    task = _task("ingestion.ingest_pagerduty_incident")
+    opened = [
+        await coalesce(task, "PD1", "incident.triggered", {"id": "PD1", "status": "triggered"}),
+        await coalesce(
+            task, "PD1", "incident.acknowledged", {"id": "PD1", "status": "acknowledged"}
+        ),
+        await coalesce(task, "PD1", "incident.resolved", {"id": "PD1", "status": "resolved"}),
+    ]
+    assert opened == [True, False, False]
+    flush.assert_called_once()
+    assert flush.call_args.args[0] == ("ingestion.ingest_pagerduty_incident", "PD1")
+    task.delay.assert_not_called()
+
+    args, kwargs = await take_latest("ingestion.ingest_pagerduty_incident", "PD1")
+    assert args == ["incident.resolved", {"id": "PD1", "status": "resolved"}]
+    assert kwargs == {}
+    # Window is consumed: nothing left to flush, and the next event opens a new one
+    assert await take_latest("ingestion.ingest_pagerduty_incident", "PD1") is None
+    assert await coalesce(task, "PD1", "incident.reopened", {"id": "PD1"}) is True
+    assert flush.call_count == 2
+
+
+async def test_keys_and_tasks_have_independent_windows(redis, flush):
+    repo_task, deps_task = _task(), _task("ingestion.ingest_github_dependencies")
+    assert await coalesce(repo_task, "https://github.com/a/x", "https://github.com/a/x")
+    assert await coalesce(repo_task, "https://github.com/a/y", "https://github.com/a/y")
+    assert await coalesce(deps_task, "https://github.com/a/x", "https://github.com/a/x", "a", "x")
+    assert flush.call_count == 3
+
+
+async def test_zero_window_dispatches_directly(redis, flush, monkeypatch):
+    monkeypatch.setattr(coalesce_mod.get_settings(), "ingestion_coalesce_window_seconds", 0)
+    task = _task()
+    await coalesce(task, "k", "https://github.com/a/x")
+    task.delay.assert_called_once_with("https://github.com/a/x")
+    flush.assert_not_called()
+
+
+async def test_redis_failure_falls_back_to_direct_dispatch(flush):
+    task = _task()
+    with patch(
+        "app.modules.ingestion.coalesce.get_redis",
+        new_callable=AsyncMock,
+        side_effect=ConnectionError("down"),
+    ):
+        assert await coalesce(task, "k", "https://github.com/a/x") is True
+    task.delay.assert_called_once_with("https://github.com/a/x")
+    flush.assert_not_called()
+
+
+async def test_coalesced_args_never_hold_the_github_token(redis, flush, monkeypatch):
+    monkeypatch.setattr(get_settings(), "github_token", "ghp_secret")
+    request = MagicMock()
+    request.body = AsyncMock(return_value=json.dumps({
+        "ref": "refs/heads/main",
+        "repository": {"html_url": "https://github.com/acme/api", "name": "api",
+                       "owner": {"login": "acme"}, "default_branch": "main"},
+    }).encode())
+    # Stream unavailable: the webhook's events go straight to coalesce()
+    with patch("app.modules.ingestion.router._verify_github_signature", return_value=True), \
+            patch("app.modules.ingestion.bus.get_redis", new_callable=AsyncMock,
+                  side_effect=ConnectionError):
+        await github_webhook(request, x_hub_signature_256="sha256=x", x_github_event="push")
+
+    stored = [await redis.get(k) for k in await redis.keys(f"{coalesce_mod.ARGS_PREFIX}*")]
+    assert len(stored) == 2 and flush.call_count == 2
+    assert not any("ghp_secret" in payload for payload in stored)
+    args, _ = await take_latest("ingestion.ingest_github_dependencies", "https://github.com/acme/api")
+    assert args == ["https://github.com/acme/api", "acme", "api"]
@@ -0,0 +1,129 @@
+import re
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.modules.catalog.models import ServiceCreate
+from app.modules.catalog.repository import ServiceRepository
+from app.modules.entities.models import IncidentEntity
+from app.modules.entities.repository import EntityRepository
+from app.modules.ingestion import tasks
+from app.modules.ingestion.catalog_parser import make_deterministic_id
+
+
+class _FakeGraph:
+    """Just enough Gremlin for get-by-id and the fold/coalesce bulk upsert."""
+
+    def __init__(self):
+        self.vertices: dict[str, dict] = {}
+        self.add_v = 0
+        self.queries: list[str] = []
+
+    def __call__(self, query: str, bindings: dict | None = None):
+        bindings = bindings or {}
+        self.queries.append(query)
+        if query.startswith("g.inject(0).union("):
+            i = 0
+            while f"id{i}" in bindings:
+                vid = bindings[f"id{i}"]
+                vertex = self.vertices.get(vid)
+                if vertex is None:
+                    self.add_v += 1
+                    created = [{"value": bindings["now"]}]
+                    vertex = self.vertices[vid] = {"id": vid, "properties": {"created_at": created}}
+                for key in re.findall(rf"%\(p{i}_(\w+)\)s", query):
+                    vertex["properties"][key] = [{"value": bindings[f"p{i}_{key}"]}]
+                vertex["properties"]["updated_at"] = [{"value": bindings["now"]}]
+                i += 1
+            return []
+        if query.startswith("g.addV("):
+            self.add_v += 1
+        match = re.fullmatch(r"g\.V\(\)\.hasLabel\('\w+'\)\.has\('id', %\(id\)s\)", query)
+        if match:
+            vertex = self.vertices.get(bindings["id"])
+            return [vertex] if vertex else []
+        return []
+
+
+@pytest.fixture
+def graph(redis_server):
+    fake = _FakeGraph()
+    with patch("app.modules.catalog.repository.execute_query", side_effect=fake), \
+         patch("app.modules.entities.repository.execute_query", side_effect=fake), \
+         patch("app.modules.catalog.repository.publish_change", new_callable=AsyncMock), \
+         patch("app.modules.entities.repository.publish_change", new_callable=AsyncMock), \
+         patch("app.modules.entities.repository.publish_changes", new_callable=AsyncMock):
+        yield fake
+
+
+async def test_service_upsert_is_idempotent_on_the_natural_key(graph):
+    repo = ServiceRepository()
+    url = "https://github.com/acme/payments"
+    service_id = make_deterministic_id(url)
+
+    first, created = await repo.upsert(
+        service_id, ServiceCreate(name="payments", team="a", repository_url=url)
+    )
+    assert created and first.id == service_id
+    second, created = await repo.upsert(
+        service_id, ServiceCreate(name="payments", team="b", repository_url=url)
+    )
+    assert not created
+    assert second.created_at == first.created_at
+
+    assert list(graph.vertices) == [service_id]
+    assert graph.add_v == 1
+    assert (await repo.get(service_id)).team == "b"
+
+
+async def test_create_honours_explicit_id(graph):
+    entity = await ServiceRepository().create(ServiceCreate(name="x"), service_id="svc-1")
+    assert entity.id == "svc-1"
+    incident = await EntityRepository("Incident", IncidentEntity).create(
+        tasks.IncidentCreate(title="t", source="pagerduty", source_id="P1"), entity_id="inc-1"
+    )
+    assert incident.id == "inc-1"
+
+
+def test_repeated_webhooks_update_one_incident(graph):
+    for status in ("triggered", "acknowledged", "resolved"):
+        tasks.ingest_pagerduty_incident.apply(
+            args=(
+                "incident." + status,
+                {"id": "PD42", "title": "DB down", "urgency": "high", "status": status},
+            )
+        ).get()
+
+    assert graph.add_v == 1
+    [vertex] = graph.vertices.values()
+    assert vertex["properties"]["status"] == [{"value": "resolved"}]
+    assert vertex["properties"]["source_id"] == [{"value": "PD42"}]
+
+
+def _union_children(query: str) -> list[str]:
+    """Top-level arguments of the query's outer union(...)."""
+    body = query.removeprefix("g.inject(0).union(").removesuffix(")")
+    children, depth, start = [], 0, 0
+    for pos, char in enumerate(body):
+        depth += (char == "(") - (char == ")")
+        if char == "," and depth == 0:
+            children.append(body[start:pos].strip())
+            start = pos + 1
+    return children + [body[start:].strip()]
+
+
+async def test_bulk_upsert_unions_anonymous_traversals(graph):
+    await ServiceRepository().upsert_many(
+        [(f"svc-{i}", ServiceCreate(name=f"s{i}")) for i in range(3)]
+    )
+    await EntityRepository("Incident", IncidentEntity).upsert_many(
+        [(f"inc-{i}", tasks.IncidentCreate(title="t", source="pagerduty", source_id=f"P{i}"))
+         for i in range(2)]
+    )
+
+    unions = [q for q in graph.queries if q.startswith("g.inject(0).union(")]
+    assert [len(_union_children(q)) for q in unions] == [3, 2]
+    for query in unions:
+        # Only the outer traversal is spawned from g; a child g.V() would be a new traversal
+        assert query.count("g.") == 1
+        assert all(child.startswith("__.V().hasLabel(") for child in _union_children(query))
@@ -0,0 +1,143 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.modules.ingestion.org_sync import (
+    GitHubRateLimiter,
+    TokenBucket,
+    load_checkpoint,
+    sync_org,
+)
+
+REPOS = 250
+
+
+class _GitHub:
+    """Mock api.github.com org listing + raw catalog-info.yaml with ETags."""
+
+    def __init__(self):
+        self.pages: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "api.github.com":
+            page = int(request.url.params["page"])
+            self.pages.append(page)
+            start = (page - 1) * 100
+            repos = [
+                {"html_url": f"https://github.com/acme/svc-{i}", "archived": i == 7}
+                for i in range(start, min(start + 100, REPOS))
+            ]
+            link = {} if start + 100 >= REPOS else {
+                "Link": f'<https://api.github.com/orgs/acme/repos?page={page + 1}>; rel="next"'
+            }
+            return httpx.Response(200, json=repos, headers=link)
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            i = int(request.url.path.split("/")[2].removeprefix("svc-"))
+            if i % 5 == 0:
+                return httpx.Response(404)
+            etag = f'"e{i}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers={"ETag": etag})
+            body = f"metadata:\n  name: svc-{i}\nspec:\n  owner: team-{i % 3}\n"
+            return httpx.Response(200, text=body, headers={"ETag": etag})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def github(monkeypatch, http_mock):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "github_org_sync_concurrency", 4)
+    monkeypatch.setattr(settings, "github_org_sync_requests_per_second", 10_000.0)
+    mock = _GitHub()
+    http_mock(mock)
+    return mock
+
+
+@pytest.fixture
+def services():
+    repo = AsyncMock()
+    with patch("app.modules.ingestion.org_sync.ServiceRepository", return_value=repo):
+        yield repo
+
+
+def _upserted_names(services):
+    return [data.name for call in services.upsert_many.await_args_list for _, data in call.args[0]]
+
+
+async def test_full_sync_upserts_in_bulk_then_revalidates(github, redis, services):
+    result = await sync_org("acme")
+    assert (result.pages, result.repos, result.upserted, result.missing) == (3, 249, 199, 50)
+    assert services.upsert_many.await_count == 3
+    assert "svc-1" in _upserted_names(services) and "svc-7" not in _upserted_names(services)
+    assert github.max_in_flight <= 4
+    assert await load_checkpoint("acme") == {}
+    assert not await redis.exists("ingestion:org_sync:acme:lock")
+
+    services.upsert_many.reset_mock()
+    again = await sync_org("acme")
+    assert (again.unchanged, again.upserted) == (199, 0)
+    services.upsert_many.assert_not_awaited()
+
+
+async def test_crashed_sync_resumes_after_last_checkpoint(github, redis, services):
+    services.upsert_many.side_effect = [None, RuntimeError("gremlin unavailable")]
+    with pytest.raises(RuntimeError):
+        await sync_org("acme")
+    checkpoint = await load_checkpoint("acme")
+    assert checkpoint["page"] == "1" and checkpoint["upserted"] == "79"
+    assert not await redis.exists("ingestion:org_sync:acme:lock")
+
+    services.upsert_many.side_effect = None
+    github.pages.clear()
+    result = await sync_org("acme")
+    assert github.pages == [2, 3]
+    assert result.resumed_from_page == 2
+    assert (result.pages, result.repos, result.upserted) == (3, 249, 199)
+
+
+async def test_concurrent_sync_of_same_org_is_skipped(github, redis, services):
+    await redis.set("ingestion:org_sync:acme:lock", "1")
+    result = await sync_org("acme")
+    assert result.pages == 0
+    assert github.pages == []
+
+
+def test_token_bucket_refills_up_to_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=4, clock=lambda: now[0])
+    assert bucket.take(10) == 4
+    now[0] += 1.0
+    assert bucket.take(10) == 2
+    now[0] += 100.0
+    assert bucket.take(10) == 4
+
+
+async def test_rate_limiter_waits_for_reset_when_budget_is_low():
+    slept: list[float] = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    limiter = GitHubRateLimiter(rate=1000, reserve=100, wall_clock=lambda: 1_000.0, sleep=sleep)
+    await limiter.acquire()
+    assert slept == []
+
+    limiter.observe(
+        httpx.Response(200, headers={"X-RateLimit-Remaining": "99", "X-RateLimit-Reset": "1060"})
+    )
+    await limiter.acquire()
+    assert slept == [60.0]
+
+    secondary = httpx.Response(403, headers={"Retry-After": "30"})
+    assert limiter.is_rate_limited(secondary)
+    assert not limiter.is_rate_limited(httpx.Response(403))
@@ -0,0 +1,106 @@
+from unittest.mock import AsyncMock, patch
+
+import fakeredis.aioredis
+import pytest
+
+from app.modules.relationships.closure import ReachabilityIndex, compute_closure
+from app.modules.relationships.repository import RelationshipRepository
+
+
+@pytest.fixture
+def index():
+    fake = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    with patch(
+        "app.modules.relationships.closure.get_redis", new_callable=AsyncMock, return_value=fake
+    ):
+        yield ReachabilityIndex()
+
+
+def test_compute_closure_handles_cycles():
+    closure = compute_closure({"a": {"b"}, "b": {"c"}, "c": {"a"}})
+    assert closure["a"] == {"a", "b", "c"}
+
+
+async def test_incremental_add(index):
+    await index.add_edge("e1", "svc", "lib")
+    await index.add_edge("e2", "lib", "pkg")
+    assert await index.reaches("svc", "pkg")
+    assert not await index.reaches("pkg", "svc")
+    assert await index.ancestors("pkg") == {"svc", "lib"}
+
+
+async def test_remove_edge_drops_transitive_reachability(index):
+    await index.add_edge("e1", "svc", "lib")
+    await index.add_edge("e2", "lib", "pkg")
+    await index.add_edge("e3", "svc", "other")
+    await index.remove_edge("e2")
+    assert not await index.reaches("svc", "pkg")
+    assert await index.reaches("svc", "other")
+    assert await index.ancestors("pkg") == set()
+
+
+async def test_remove_keeps_alternate_path(index):
+    await index.add_edge("e1", "a", "b")
+    await index.add_edge("e2", "b", "d")
+    await index.add_edge("e3", "a", "c")
+    await index.add_edge("e4", "c", "d")
+    await index.remove_edge("e2")
+    assert await index.reaches("a", "d")
+    assert not await index.reaches("b", "d")
+
+
+async def test_parallel_edges_counted(index):
+    await index.add_edge("e1", "a", "b")
+    await index.add_edge("e2", "a", "b")
+    await index.remove_edge("e1")
+    assert await index.reaches("a", "b")
+    await index.remove_edge("e2")
+    assert not await index.reaches("a", "b")
+
+
+async def test_rebuild_matches_incremental(index):
+    await index.add_edge("stale", "x", "y")
+    await index.rebuild([("e1", "a", "b"), ("e2", "b", "c")])
+    assert await index.reaches("a", "c")
+    assert not await index.reaches("x", "y")
+    await index.remove_edge("e1")
+    assert not await index.reaches("a", "c")
+
+
+async def test_rebuild_replays_changes_made_during_the_export(index):
+    await index.add_edge("e1", "a", "b")
+    await index.begin_rebuild()
+    export = [("e1", "a", "b"), ("e2", "b", "c")]
+    # Written while the export is still paging
+    await index.add_edge("e3", "c", "d")
+    await index.remove_edge("e1")
+    await index.rebuild(export)
+    assert await index.reaches("b", "d")
+    assert not await index.reaches("a", "b")
+    await index.add_edge("e4", "x", "y")
+    await index.remove_edge("e4")
+    assert not await index.reaches("x", "y")
+
+
+async def test_replayed_edge_already_in_the_export_is_counted_once(index):
+    await index.begin_rebuild()
+    await index.add_edge("e1", "a", "b")
+    await index.rebuild([("e1", "a", "b")])
+    await index.remove_edge("e1")
+    assert not await index.reaches("a", "b")
+
+
+async def test_deleting_a_vertex_drops_its_edges_from_the_index(index):
+    await index.add_edge("e1", "svc", "lib")
+    await index.add_edge("e2", "lib", "pkg")
+    queries = []
+
+    def execute(query, params):
+        queries.append(query)
+        return ["e1", "e2"] if query.endswith(".id()") else []
+
+    with patch("app.modules.relationships.repository.execute_query", side_effect=execute):
+        await RelationshipRepository().drop_vertex("Library", "lib")
+    assert queries[-1].endswith(".drop()")
+    assert not await index.reaches("svc", "pkg")
+    assert await index.descendants("svc") == set()
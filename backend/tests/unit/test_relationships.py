@@ -0,0 +1,113 @@
+from unittest.mock import AsyncMock, patch
+
+import fakeredis.aioredis
+import pytest
+from pydantic import ValidationError
+
+from app.modules.relationships.models import EdgeCreate
+from app.modules.relationships.repository import RelationshipRepository
+
+REPOSITORY = "app.modules.relationships.repository"
+
+
+EDGE_BASE = dict(source_id="a", source_label="Service", target_id="b", target_label="Team")
+
+
+@pytest.mark.parametrize("relationship_type,prop,value", [
+    ("owned_by", "criticality", "high"),
+    ("owned_by", "environment", "prod"),
+    ("causes", "environment", "prod"),
+    ("deployed_to", "version_constraint", ">=1.2"),
+])
+def test_edge_create_rejects_undeclared_typed_property(relationship_type, prop, value):
+    with pytest.raises(ValidationError, match=prop):
+        EdgeCreate(**EDGE_BASE, relationship_type=relationship_type, **{prop: value})
+
+
+def test_edge_create_keeps_declared_typed_properties():
+    edge = EdgeCreate(
+        **EDGE_BASE, relationship_type="depends_on", criticality="high", environment="prod"
+    )
+    assert edge.typed_properties() == {"criticality": "high", "environment": "prod"}
+
+
+async def test_get_graph_hydrates_each_vertex_once():
+    edges = {
+        "root": [
+            {"id": "e1", "label": "depends_on", "src": "root", "tgt": "a", "props": {}},
+            {"id": "e2", "label": "consumes", "src": "root", "tgt": "b",
+             "props": {"criticality": "high"}},
+        ],
+        "a": [{"id": "e1", "label": "depends_on", "src": "root", "tgt": "a", "props": {}},
+              {"id": "e3", "label": "depends_on", "src": "a", "tgt": "b", "props": {}}],
+    }
+    queries = []
+
+    def fake(query, bindings=None):
+        queries.append(query)
+        if "bothE()" in query:
+            return [e for vid in bindings["ids"] for e in edges.get(vid, [])]
+        return [
+            {"id": vid, "label": "Service", "props": {"name": [vid.upper()]}}
+            for vid in bindings["ids"]
+        ]
+
+    fake_redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    with patch(f"{REPOSITORY}.execute_query", side_effect=fake), \
+            patch(f"{REPOSITORY}.get_redis", new_callable=AsyncMock, return_value=fake_redis):
+        graph = await RelationshipRepository().get_graph("root", depth=2)
+
+    assert sorted(n.id for n in graph.nodes) == ["a", "b", "root"]
+    assert sorted(e.id for e in graph.edges) == ["e1", "e2", "e3"]
+    assert next(e for e in graph.edges if e.id == "e2").criticality == "high"
+    assert sum("valueMap('name','title')" in q for q in queries) == 1
+
+
+def _filtered_graph_query(edges):
+    """Fake execute_query applying the criticality/environment edge filters get_graph emits."""
+    queries = []
+
+    def fake(query, bindings=None):
+        queries.append(query)
+        if "bothE()" not in query:
+            return [
+                {"id": vid, "label": "Service", "props": {"name": [vid]}} for vid in bindings["ids"]
+            ]
+        rows = [e for e in edges if {e["src"], e["tgt"]} & set(bindings["ids"])]
+        if "has('criticality', within(" in query:
+            rows = [e for e in rows if e["props"].get("criticality") in bindings["criticality"]]
+        if "has('environment'," in query:
+            rows = [e for e in rows if e["props"].get("environment") == bindings["environment"]]
+        return rows
+
+    return fake, queries
+
+
+@pytest.mark.parametrize("filters,expected_nodes", [
+    ({}, ["a", "b", "c", "root"]),
+    ({"criticality": ["high"]}, ["a", "c", "root"]),
+    ({"environment": "prod"}, ["a", "b", "root"]),
+    ({"criticality": ["high"], "environment": "prod"}, ["a", "root"]),
+])
+async def test_get_graph_prunes_edges_by_criticality_and_environment(filters, expected_nodes):
+    edges = [
+        {"id": "e1", "label": "depends_on", "src": "root", "tgt": "a",
+         "props": {"criticality": "high", "environment": "prod"}},
+        {"id": "e2", "label": "depends_on", "src": "root", "tgt": "b",
+         "props": {"criticality": "low", "environment": "prod"}},
+        {"id": "e3", "label": "consumes", "src": "a", "tgt": "c",
+         "props": {"criticality": "high", "environment": "staging"}},
+    ]
+    fake, queries = _filtered_graph_query(edges)
+    fake_redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    with patch(f"{REPOSITORY}.execute_query", side_effect=fake), \
+            patch(f"{REPOSITORY}.get_redis", new_callable=AsyncMock, return_value=fake_redis):
+        graph = await RelationshipRepository().get_graph("root", depth=2, **filters)
+
+    assert sorted(n.id for n in graph.nodes) == expected_nodes
+    # Pruned inside the traversal, not after the fact
+    traversals = [q for q in queries if "bothE()" in q]
+    assert all(("criticality" in filters) == ("within(%(criticality)s)" in q) for q in traversals)
+    assert all(("environment" in filters) == ("has('environment'" in q) for q in traversals)
+    # A filtered graph must not be served for the unfiltered key (or vice versa)
+    assert await fake_redis.keys("graph:root:2") == ([] if filters else ["graph:root:2"])
@@ -0,0 +1,128 @@
+from unittest.mock import AsyncMock, patch
+
+import fakeredis.aioredis
+import pytest
+
+from app.modules.entities.models import PackageCreate, PackageEntity
+from app.modules.entities.repository import EntityRepository
+from app.modules.ingestion.sbom import iter_sbom_packages, package_id, sync_sbom
+from app.modules.relationships.repository import RelationshipRepository
+
+
+def _sbom(*pkgs):
+    return {"sbom": {"packages": [
+        {"name": n, "versionInfo": v, "licenseConcluded": lic} for n, v, lic in pkgs
+    ]}}
+
+
+class _FakeCatalog:
+    """In-memory stand-in for the bulk repository calls used by sync_sbom."""
+
+    def __init__(self):
+        self.packages: dict[str, PackageEntity] = {}
+        self.edges: dict[str, set[str]] = {}
+        self.upsert_calls = 0
+
+    async def get_many(self, ids, chunk_size=100):
+        return {i: self.packages[i] for i in ids if i in self.packages}
+
+    async def upsert_many(self, items, existing=None, chunk_size=100):
+        self.upsert_calls += 1
+        for eid, data in items:
+            self.packages[eid] = PackageEntity(id=eid, **data.model_dump())
+        return [self.packages[eid] for eid, _ in items]
+
+    async def reconcile_outgoing(self, source_id, source_label, rel_type, targets, chunk_size=500):
+        current = self.edges.setdefault(source_id, set())
+        added = [t for t in targets if t not in current]
+        removed = [t for t in current if t not in targets]
+        self.edges[source_id] = set(targets)
+        return added, removed
+
+
+@pytest.fixture
+def catalog():
+    fake = _FakeCatalog()
+    with patch.object(EntityRepository, "get_many", fake.get_many), \
+         patch.object(EntityRepository, "upsert_many", fake.upsert_many), \
+         patch.object(RelationshipRepository, "reconcile_outgoing", fake.reconcile_outgoing):
+        yield fake
+
+
+def test_parse_dedupes_and_skips_nameless():
+    sbom = _sbom(("a", "1", "MIT"), ("a", "1", "MIT"), ("", "2", ""), ("b", "2", "Apache-2.0"))
+    pkgs = list(iter_sbom_packages(sbom))
+    assert [(p.name, p.license) for p in pkgs] == [("a", "MIT"), ("b", "Apache-2.0")]
+    assert pkgs[0].id == package_id("a", "1")
+
+
+async def test_first_sync_creates_packages_and_edges(catalog):
+    sbom = _sbom(*[(f"p{i}", "1.0", "MIT") for i in range(250)])
+    result = await sync_sbom("svc-1", sbom, chunk_size=100)
+    assert (result.packages, result.created, result.updated, result.unchanged) == (250, 250, 0, 0)
+    assert result.edges_added == 250
+    assert catalog.upsert_calls == 3
+    assert set(result.timings) == {"parse", "diff", "upsert", "edges"}
+
+
+async def test_resync_only_writes_changes_and_removes_dropped(catalog):
+    await sync_sbom("svc-1", _sbom(("a", "1", "MIT"), ("b", "1", "MIT"), ("c", "1", "MIT")))
+    await sync_sbom("svc-2", _sbom(("a", "1", "MIT")))
+
+    result = await sync_sbom("svc-1", _sbom(("a", "1", "MIT"), ("b", "1", "BSD-3-Clause")))
+    assert (result.created, result.updated, result.unchanged) == (0, 1, 1)
+    assert (result.edges_added, result.edges_removed) == (0, 1)
+    assert catalog.edges["svc-1"] == {package_id("a", "1"), package_id("b", "1")}
+    assert catalog.packages[package_id("b", "1")].license == "BSD-3-Clause"
+    assert catalog.packages[package_id("c", "1")].consumers == []
+    assert sorted(catalog.packages[package_id("a", "1")].consumers) == ["svc-1", "svc-2"]
+
+
+async def test_upsert_many_one_query_per_chunk():
+    calls = []
+    fake_redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    with (
+        patch("app.modules.entities.repository.execute_query",
+              side_effect=lambda q, b=None: calls.append((q, b)) or []),
+        patch("app.modules.entities.repository.get_redis",
+              new_callable=AsyncMock, return_value=fake_redis),
+        patch(
+            "app.modules.entities.repository.publish_changes", new_callable=AsyncMock
+        ) as published,
+    ):
+        repo: EntityRepository[PackageEntity] = EntityRepository("Package", PackageEntity)
+        items = [(f"id{i}", PackageCreate(name=f"p{i}")) for i in range(5)]
+        entities = await repo.upsert_many(items, chunk_size=2)
+    assert len(calls) == 3
+    query, bindings = calls[0]
+    assert query.startswith("g.inject(0).union(") and query.count("coalesce(") == 2
+    assert bindings["id0"] == "id0" and bindings["p1_name"] == "p1"
+    assert [e.id for e in entities] == [f"id{i}" for i in range(5)]
+    # One batch of change events per chunk, not one round trip per entity
+    assert [len(c.args[1]) for c in published.await_args_list] == [2, 2, 1]
+
+
+async def test_reconcile_outgoing_adds_and_drops():
+    calls = []
+
+    def fake(query, bindings=None):
+        calls.append((query, bindings))
+        if ".project('id','tgt')" in query:
+            return [{"id": "e-old", "tgt": "gone"}, {"id": "e-keep", "tgt": "kept"}]
+        return []
+
+    fake_redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    with (
+        patch("app.modules.relationships.repository.execute_query", side_effect=fake),
+        patch("app.modules.relationships.repository.get_redis",
+              new_callable=AsyncMock, return_value=fake_redis),
+        patch("app.modules.relationships.closure.get_redis",
+              new_callable=AsyncMock, return_value=fake_redis),
+    ):
+        added, removed = await RelationshipRepository().reconcile_outgoing(
+            "svc", "Service", "consumes", {"kept": "Package", "new": "Package"}
+        )
+    assert (added, removed) == (["new"], ["gone"])
+    add_query = next(b for q, b in calls if ".union(addE(" in q)
+    assert add_query["t0"] == "new"
+    assert any(b.get("eids") == ["e-old"] for q, b in calls if q.endswith(".drop()"))
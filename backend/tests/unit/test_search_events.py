@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+import pytest
+from pydantic import BaseModel
+
+from app.modules.search.events import (
+    CHANGE_STREAM,
+    SearchIndexSync,
+    publish_change,
+    publish_changes,
+    stream_tail,
+)
+from app.modules.search.index import SearchIndex
+from app.modules.search.snapshot import write_snapshot
+
+
+class _Entity(BaseModel):
+    id: str
+    name: str
+    description: str = ""
+    tags: list[str] = []
+
+
+@pytest.fixture
+def writer_index():
+    index = SearchIndex()
+    index.replace_all([])
+    with patch("app.modules.search.events.get_search_index", return_value=index):
+        yield index
+
+
+async def test_publish_updates_local_index_and_stream(redis, writer_index):
+    await publish_change("Service", "s1", _Entity(id="s1", name="payments-api"))
+    assert writer_index.get("s1").name == "payments-api"
+    assert await redis.xlen(CHANGE_STREAM) == 1
+
+
+async def test_publish_changes_appends_a_batch(redis, writer_index):
+    await publish_changes("Service", [
+        ("s1", _Entity(id="s1", name="payments-api")),
+        ("s2", _Entity(id="s2", name="orders-api")),
+        ("s1", None),
+    ])
+    assert writer_index.get("s1") is None and writer_index.get("s2").name == "orders-api"
+    events = await redis.xrange(CHANGE_STREAM)
+    assert [(f["op"], f["id"]) for _, f in events] == [
+        ("upsert", "s1"), ("upsert", "s2"), ("delete", "s1"),
+    ]
+
+
+async def test_publish_ignores_unsearchable_labels(redis, writer_index):
+    await publish_change("Scorecard", "x1", _Entity(id="x1", name="gold"))
+    assert await redis.xlen(CHANGE_STREAM) == 0
+
+
+async def test_other_worker_applies_events_in_order(redis, writer_index):
+    reader = SearchIndex()
+    reader.replace_all([])
+    sync = SearchIndexSync(index=reader, reconcile_interval=3600)
+
+    await publish_change("Service", "s1", _Entity(id="s1", name="payments-api"))
+    await publish_change("Service", "s2", _Entity(id="s2", name="orders-api"))
+    await publish_change("Service", "s1", _Entity(id="s1", name="billing-api"))
+    await publish_change("Service", "s2")
+
+    assert await sync.poll_once(block_ms=None) == 4
+    assert reader.get("s1").name == "billing-api"
+    assert reader.get("s2") is None
+    assert [d.id for d, _ in reader.search("billing")] == ["s1"]
+    assert sync.last_id == await stream_tail()
+    assert await sync.poll_once(block_ms=None) == 0
+
+
+async def test_start_loads_snapshot_and_catches_up_from_offset(redis, writer_index, tmp_path):
+    await publish_change("Service", "s1", _Entity(id="s1", name="payments-api"))
+    offset = await stream_tail()
+    snapshot_docs = [writer_index.get("s1")]
+    write_snapshot(tmp_path / "index.snap", snapshot_docs, offset)
+    await publish_change("Service", "s2", _Entity(id="s2", name="orders-api"))
+
+    reader = SearchIndex()
+    sync = SearchIndexSync(
+        index=reader, reconcile_interval=3600, snapshot_path=str(tmp_path / "index.snap")
+    )
+    assert await sync.load_snapshot()
+    assert reader.ready and reader.get("s1") is not None and reader.get("s2") is None
+    await sync.poll_once(block_ms=None)
+    assert reader.get("s2").name == "orders-api"
+
+
+async def test_snapshot_rejected_when_offset_was_trimmed(redis, writer_index, tmp_path):
+    write_snapshot(tmp_path / "index.snap", [], "1-0")
+    sync = SearchIndexSync(
+        index=SearchIndex(), reconcile_interval=3600, snapshot_path=str(tmp_path / "index.snap")
+    )
+    assert not await sync.load_snapshot()
+
+
+async def test_one_worker_rescans_per_interval_and_others_reload(redis, writer_index, tmp_path):
+    scans = 0
+
+    def load():
+        nonlocal scans
+        scans += 1
+        return [writer_index.get("s1")]
+
+    await publish_change("Service", "s1", _Entity(id="s1", name="payments-api"))
+    path = str(tmp_path / "index.snap")
+    workers = [
+        SearchIndexSync(index=SearchIndex(), reconcile_interval=3600, snapshot_path=path)
+        for _ in range(3)
+    ]
+    with patch("app.modules.search.service.load_catalog_documents", side_effect=load):
+        for sync in workers:
+            sync.last_id = await stream_tail()
+            await sync.reconcile()
+    assert scans == 1
+    assert all(sync.index.get("s1").name == "payments-api" for sync in workers)
@@ -0,0 +1,240 @@
+from dataclasses import replace
+
+from app.modules.catalog.models import ServiceEntity
+from app.modules.search.index import (
+    IndexedDocument,
+    RankingParams,
+    SearchIndex,
+    document_from_entity,
+    edit_distance,
+    tokenize,
+)
+from app.modules.search.service import _vertex_to_document
+
+
+def _doc(i, name, entity_type="Service", description="", tags=None):
+    return IndexedDocument(id=f"id-{i}", entity_type=entity_type, name=name,
+                           description=description, tags=tags or [])
+
+
+def _index(*docs):
+    idx = SearchIndex()
+    idx.replace_all(list(docs))
+    return idx
+
+
+def test_tokenize_splits_on_punctuation():
+    assert tokenize("Payments-API v2") == ["payments", "api", "v2"]
+
+
+def test_prefix_match_and_name_ranking():
+    idx = _index(
+        _doc(1, "billing-worker", description="talks to payments"),
+        _doc(2, "payments-api"),
+        _doc(3, "orders"),
+    )
+    hits = idx.search("pay")
+    assert [d.name for d, _ in hits] == ["payments-api", "billing-worker"]
+    assert hits[0][1] > hits[1][1]
+
+
+def test_all_tokens_must_match():
+    idx = _index(_doc(1, "payments-api"), _doc(2, "payments-worker"))
+    assert [d.name for d, _ in idx.search("payments api")] == ["payments-api"]
+
+
+def test_type_filter_and_tags():
+    idx = _index(_doc(1, "redis", "AzureResource", tags=["cache"]), _doc(2, "cache-svc"))
+    assert [d.id for d, _ in idx.search("cache", entity_types=["AzureResource"])] == ["id-1"]
+
+
+def test_upsert_replaces_and_remove_deletes():
+    idx = _index(_doc(1, "old-name"))
+    idx.upsert(_doc(1, "new-name"))
+    assert idx.search("old") == []
+    assert len(idx.search("new")) == 1
+    assert idx.remove("id-1")
+    assert idx.search("new") == [] and len(idx) == 0
+
+
+def test_document_from_entity_extracts_attributes():
+    doc = document_from_entity("Service", ServiceEntity(name="svc", team="payments", tags=["pci"]))
+    assert doc.attributes["team"] == "payments"
+    assert doc.tags == ["pci"]
+    assert "created_at" not in doc.attributes
+
+
+def test_vertex_to_document_decodes_tags_and_title():
+    vertex = {
+        "id": "inc-1",
+        "properties": {
+            "title": [{"value": "DB outage"}],
+            "tags": [{"value": '["db"]'}],
+            "severity": [{"value": "critical"}],
+            "mttr_minutes": [{"value": 42}],
+        },
+    }
+    doc = _vertex_to_document(vertex, "Incident")
+    assert doc.name == "DB outage" and doc.tags == ["db"]
+    assert doc.attributes == {"severity": "critical", "mttr_minutes": 42}
+
+
+def test_bm25_exact_name_beats_longer_names():
+    idx = _index(_doc(1, "orders-api-gateway"), _doc(2, "orders-api"), _doc(3, "legacy-orders-api"))
+    assert [d.name for d, _ in idx.search("orders api")][0] == "orders-api"
+
+
+def test_bm25_rare_term_outweighs_common_term():
+    docs = [_doc(i, f"svc{i}-api") for i in range(50)] + [_doc(99, "ledger-api")]
+    idx = _index(*docs)
+    hits = idx.search("api ledger")
+    assert hits[0][0].name == "ledger-api" and len(hits) == 1
+
+
+def test_field_boosts_are_configurable():
+    idx = _index(_doc(1, "alpha", tags=["kafka"]), _doc(2, "beta", description="kafka consumer"))
+    assert idx.search("kafka")[0][0].name == "alpha"
+    flipped = RankingParams(tag_boost=0.1, description_boost=5.0)
+    assert idx.search("kafka", params=flipped)[0][0].name == "beta"
+
+
+def test_ties_break_on_name_then_id():
+    idx = _index(_doc(2, "same"), _doc(1, "same"), _doc(3, "Same"))
+    assert [d.id for d, _ in idx.search("same")] == ["id-1", "id-2", "id-3"]
+
+
+def test_suggest_groups_by_type_and_word_starts():
+    idx = _index(
+        _doc(1, "payments-api", tags=["pci"]),
+        _doc(2, "payments-worker"),
+        _doc(3, "payments", "Team"),
+        _doc(4, "orders-api", tags=["pci-dss"]),
+    )
+    by_type, tags = idx.suggest("pay", limit=5)
+    assert [d.name for d in by_type["Service"]] == ["payments-api", "payments-worker"]
+    assert [d.name for d in by_type["Team"]] == ["payments"]
+    by_type, _ = idx.suggest("api")
+    assert sorted(d.name for d in by_type["Service"]) == ["orders-api", "payments-api"]
+    _, tags = idx.suggest("pc")
+    assert tags == ["pci", "pci-dss"]
+
+
+def test_suggest_tracks_updates_and_removals():
+    idx = _index(_doc(1, "alpha"))
+    idx.upsert(_doc(1, "beta"))
+    idx.upsert(_doc(2, "alphabet"))
+    assert [d.id for d in idx.suggest("alp")[0]["Service"]] == ["id-2"]
+    idx.remove("id-2")
+    assert idx.suggest("alp") == ({}, [])
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("paymnets", "payments", 2) == 1
+    assert edit_distance("kitten", "sitting", 2) == 3
+
+
+def test_fuzzy_corrects_misspelled_token_only():
+    idx = _index(_doc(1, "payments-api"), _doc(2, "payments-worker"), _doc(3, "orders-api"))
+    hits = idx.search("paymnets api")
+    assert [d.name for d, _ in hits] == ["payments-api"]
+    assert idx.search("paymnets api", fuzzy=False) == []
+
+
+def test_fuzzy_matches_rank_below_exact_matches():
+    idx = _index(
+        _doc(1, "ledger", description="formerly called legder"), _doc(2, "ledgers-archive")
+    )
+    assert idx.search("ledgr")[0][0].name == "ledger"
+    exact = idx.search("ledger")[0][1]
+    fuzzy = idx.search("ledgr")[0][1]
+    assert fuzzy < exact
+
+
+def test_facet_counts_from_bitsets():
+    idx = _index(
+        IndexedDocument(id="s1", entity_type="Service", name="pay-api", tags=["pci"],
+                        attributes={"team": "payments", "lifecycle": "production"}),
+        IndexedDocument(id="s2", entity_type="Service", name="pay-worker", tags=["pci", "kafka"],
+                        attributes={"team": "payments", "lifecycle": "staging"}),
+        IndexedDocument(id="p1", entity_type="Package", name="pay-sdk"),
+        IndexedDocument(id="s3", entity_type="Service", name="orders"),
+    )
+    results = idx.execute("pay", entity_types=["Service"], with_facets=True)
+    assert results.total == 2
+    assert results.facets["entity_type"] == {"Service": 2, "Package": 1}
+    assert results.facets["tag"] == {"pci": 2, "kafka": 1}
+    assert results.facets["lifecycle"] == {"production": 1, "staging": 1}
+
+    idx.remove("s2")
+    assert idx.execute("pay", with_facets=True).facets["tag"] == {"pci": 1}
+
+
+def test_limited_execute_returns_head_of_full_ranking():
+    idx = _index(*(_doc(i, f"svc-{i % 7}", description="pay " * (i % 4 + 1)) for i in range(40)))
+    full = idx.execute("pay")
+    top = idx.execute("pay", limit=5)
+    assert top.total == full.total == 40
+    assert top.hits == full.hits[:5]
+
+
+def test_cached_term_bitsets_follow_writes():
+    idx = _index(_doc(1, "ledger-api"), _doc(2, "ledger-worker"))
+    assert idx.execute("ledger").total == 2
+    idx.upsert(_doc(3, "ledger-db"))
+    idx.remove("id-1")
+    assert sorted(d.id for d, _ in idx.execute("ledger").hits) == ["id-2", "id-3"]
+
+
+def test_top_k_pruning_matches_exhaustive_ranking(monkeypatch):
+    words = ["pay", "ledger", "card", "refund"]
+    docs = [
+        IndexedDocument(
+            id=f"id-{i:03}", entity_type="Team" if i % 5 == 0 else "Service",
+            name=f"{words[i % 4]}-{words[i % 3]}" if i % 9 else "ledger",
+            description=" ".join(words[: i % 4 + 1]) + " ledger" * (i % 2),
+            tags=[words[i % 2]], attributes={"tier": i % 3},
+        )
+        for i in range(600)
+    ]
+    idx = _index(*docs)
+    idx.upsert(replace(docs[10], name="ledger ledger"))
+    idx.remove("id-011")
+    pruned = []
+    score_top = SearchIndex.score_top
+    monkeypatch.setattr(
+        SearchIndex, "score_top",
+        lambda self, *args: pruned.append(score_top(self, *args)) or pruned[-1],
+    )
+    for query in ("ledger", "ledger pay", "card tier:<2", "-tag:pay ledger", "refund ledger"):
+        for types in (None, ["Service"]):
+            full = idx.execute(query, entity_types=types)
+            for limit in (1, 10, 50):
+                top = idx.execute(query, entity_types=types, limit=limit)
+                assert top.total == full.total
+                assert top.hits == full.hits[:limit], (query, types, limit)
+    # Enough matches that the pruned path ran, not just the exhaustive fallback
+    assert any(scores is not None for scores in pruned)
+
+
+def test_attribute_filters_use_value_postings_and_sorted_numbers():
+    idx = _index(*(
+        IndexedDocument(id=f"id-{i}", entity_type="Service", name=f"svc-{i}",
+                        attributes={"owner": "Ann" if i % 2 else "bob", "cve_count": i % 4,
+                                    "tier": str(i % 3), "region": "eu"})
+        for i in range(12)
+    ))
+
+    def ids(query):
+        return sorted(int(d.id[3:]) for d, _ in idx.execute(query).hits)
+
+    assert ids("owner:ann") == [1, 3, 5, 7, 9, 11]
+    assert ids("cve_count:>2") == [3, 7, 11]
+    assert ids("cve_count:>=3 tier:<1") == [3]
+    assert ids("tier:<=0 -owner:bob") == [3, 9]
+    assert ids("region:>1") == [] and ids("missing:x") == []
+
+    idx.upsert(IndexedDocument(id="id-3", entity_type="Service", name="svc-3",
+                               attributes={"owner": "bob", "cve_count": 0}))
+    idx.remove("id-7")
+    assert ids("cve_count:>2") == [11]
+    assert ids("owner:bob") == [0, 2, 3, 4, 6, 8, 10]
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.modules.search.index import IndexedDocument, SearchIndex
+from app.modules.search.service import SearchService, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def svc():
+    index = SearchIndex()
+    index.replace_all([
+        IndexedDocument(id=f"svc-{i}", entity_type="Service", name=f"payments-{i:02d}")
+        for i in range(7)
+    ])
+    return SearchService(index=index)
+
+
+async def _all_pages(svc, query, limit):
+    pages, cursor = [], None
+    while True:
+        page = await svc.search(query, limit=limit, cursor=cursor)
+        pages.append(page)
+        if not page.has_more:
+            return pages
+        cursor = page.next_cursor
+
+
+async def test_pages_cover_ranking_once_with_true_total(redis, svc):
+    pages = await _all_pages(svc, "payments", limit=3)
+    assert [len(p.hits) for p in pages] == [3, 3, 1]
+    assert all(p.total == 7 for p in pages)
+    ids = [h.id for p in pages for h in p.hits]
+    assert ids == [f"svc-{i}" for i in range(7)]
+    assert pages[-1].next_cursor is None
+
+
+async def test_paging_does_not_rescore(redis, svc):
+    first = await svc.search("payments", limit=2)
+    with patch.object(svc.index, "execute", side_effect=AssertionError("re-scored")):
+        second = await svc.search("payments", limit=2, cursor=first.next_cursor)
+    assert [h.id for h in second.hits] == ["svc-2", "svc-3"]
+
+
+async def test_expired_cursor_is_rejected(redis, svc):
+    first = await svc.search("payments", limit=2)
+    await redis.flushall()
+    with pytest.raises(ValidationError, match="expired"):
+        await svc.search("payments", limit=2, cursor=first.next_cursor)
+
+
+async def test_cached_ranking_keeps_every_match(redis, svc):
+    svc.index.replace_all([
+        IndexedDocument(id=f"pkg-{i:04d}", entity_type="Service", name=f"payments-{i:04d}")
+        for i in range(5100)
+    ])
+    first = await svc.search("payments", limit=2000)
+    [key] = await redis.keys("search:results:*")
+    assert len(json.loads(await redis.get(key))["ranked"]) == first.total == 5100
+    key_hash, _ = decode_cursor(first.next_cursor)
+    last = await svc.search("payments", limit=2000, cursor=encode_cursor(key_hash, 4000))
+    assert len(last.hits) == 1100 and not last.has_more
+
+
+async def test_only_multi_page_rankings_are_cached(redis, svc):
+    single = await svc.search("payments", limit=10)
+    assert not single.has_more and await redis.keys("search:results:*") == []
+
+    first = await svc.search("payments", limit=2)
+    assert first.has_more and len(await redis.keys("search:results:*")) == 1
+
+
+async def test_first_page_reflects_index_changes(redis, svc):
+    first = await svc.search("payments", limit=2)
+    svc.index.upsert(IndexedDocument(id="svc-new", entity_type="Service", name="payments"))
+    again = await svc.search("payments", limit=2)
+    assert again.total == first.total + 1
+    assert again.hits[0].id == "svc-new"
+    second = await svc.search("payments", limit=2, cursor=again.next_cursor)
+    assert [h.id for h in second.hits] == ["svc-1", "svc-2"]
+
+
+async def test_cursor_bound_to_query(redis, svc):
+    first = await svc.search("payments", limit=2)
+    with pytest.raises(ValidationError):
+        await svc.search("payments", types=["Team"], limit=2, cursor=first.next_cursor)
+    with pytest.raises(ValidationError):
+        await svc.search("payments", limit=2, cursor="not-a-cursor")
+
+
+async def test_unknown_types_match_nothing(redis, svc):
+    with patch.object(svc.index, "execute", side_effect=AssertionError("searched")):
+        result = await svc.search("payments", types=["Spaceship"])
+    assert result.total == 0 and result.hits == [] and not result.has_more
+    assert (await svc.suggest("pay", types=["Spaceship"])).suggestions == {}
+    assert (await svc.search("payments", types=["Spaceship", "Service"])).total == 7
+
+
+async def test_concurrent_first_requests_rebuild_once(redis):
+    svc = SearchService(index=SearchIndex())
+    loads = 0
+
+    def load():
+        nonlocal loads
+        loads += 1
+        time.sleep(0.05)
+        return [IndexedDocument(id="svc-0", entity_type="Service", name="payments")]
+
+    with patch("app.modules.search.service.load_catalog_documents", side_effect=load):
+        results = await asyncio.gather(
+            svc.search("payments"), svc.search("payments"), svc.suggest("pay")
+        )
+    assert loads == 1
+    assert [r.total for r in results[:2]] == [1, 1]
+
+
+async def test_cursor_on_a_fresh_worker_builds_the_index_first(redis, svc):
+    first = await svc.search("payments", limit=3)
+    other_worker = SearchService(index=SearchIndex())
+    docs = svc.index.documents()
+    with patch("app.modules.search.service.load_catalog_documents", return_value=docs):
+        second = await other_worker.search("payments", limit=3, cursor=first.next_cursor)
+    assert [h.id for h in second.hits] == ["svc-3", "svc-4", "svc-5"]
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor("abc", 40)) == ("abc", 40)
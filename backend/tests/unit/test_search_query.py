@@ -0,0 +1,112 @@
+import pytest
+
+from app.modules.search.index import IndexedDocument, SearchIndex, slots_from_bitset
+from app.modules.search.query import And, Filter, Not, Or, QuerySyntaxError, Text, parse_query
+
+
+def _doc(i, name, description="", tags=None, entity_type="Service", **attributes):
+    return IndexedDocument(id=f"id-{i}", entity_type=entity_type, name=name,
+                           description=description, tags=tags or [], attributes=attributes)
+
+
+@pytest.fixture
+def idx():
+    index = SearchIndex()
+    index.replace_all([
+        _doc(
+            1, "payments-api", "card payments gateway", ["pci"],
+            team="payments", lifecycle="production", cve_count=3,
+        ),
+        _doc(
+            2, "payments-worker", "settles payments", [],
+            team="payments", lifecycle="experimental", cve_count=0,
+        ),
+        _doc(
+            3, "billing-api", "invoices and payments card", ["pci"],
+            team="billing", lifecycle="production",
+        ),
+        _doc(4, "orders", "order intake", [], team="orders", lifecycle="deprecated", cve_count=7),
+    ])
+    return index
+
+
+def _ids(index, query, **kwargs):
+    return sorted(d.id for d, _ in index.execute(query, **kwargs).hits)
+
+
+def test_parse_fields_negation_and_or():
+    node = parse_query('team:payments -tag:pci "card payments" OR cve_count:>=2')
+    assert node == Or((
+        And((
+            Filter("team", "=", "payments"),
+            Not(Filter("tag", "=", "pci")),
+            Text(("card", "payments"), phrase=True),
+        )),
+        Filter("cve_count", ">=", 2.0),
+    ))
+
+
+def test_parse_aliases_and_text_fields():
+    assert parse_query("type:Service") == Filter("entity_type", "=", "Service")
+    assert parse_query("name:pay") == Text(("pay",), field="name")
+    assert parse_query("payments-api") == And((Text(("payments",)), Text(("api",))))
+    assert parse_query("  ") is None
+
+
+def test_parse_errors():
+    with pytest.raises(QuerySyntaxError):
+        parse_query("cve_count:>many")
+    with pytest.raises(QuerySyntaxError):
+        parse_query("(team:payments")
+    with pytest.raises(QuerySyntaxError):
+        parse_query("team:")
+
+
+def test_facet_filters_intersect(idx):
+    assert _ids(idx, "team:payments lifecycle:production") == ["id-1"]
+    assert _ids(idx, "TEAM:Payments") == ["id-1", "id-2"]
+    assert _ids(idx, "tag:pci api") == ["id-1", "id-3"]
+
+
+def test_negation_and_or(idx):
+    assert _ids(idx, "-lifecycle:deprecated -team:payments") == ["id-3"]
+    assert _ids(idx, "team:billing OR team:orders") == ["id-3", "id-4"]
+    assert _ids(idx, "(team:billing OR team:orders) -lifecycle:deprecated") == ["id-3"]
+    assert _ids(idx, "NOT team:payments") == ["id-3", "id-4"]
+
+
+def test_numeric_ranges_skip_missing_attributes(idx):
+    assert _ids(idx, "cve_count:>0") == ["id-1", "id-4"]
+    assert _ids(idx, "cve_count:<=3") == ["id-1", "id-2"]
+
+
+def test_phrase_requires_adjacent_words(idx):
+    assert _ids(idx, '"card payments"') == ["id-1"]
+    assert _ids(idx, "card payments") == ["id-1", "id-3"]
+
+
+def test_field_restricted_text(idx):
+    assert _ids(idx, "name:pay") == ["id-1", "id-2"]
+    assert _ids(idx, "description:pay") == ["id-1", "id-2", "id-3"]
+
+
+def test_filters_only_query_ranks_by_name(idx):
+    hits = idx.execute("lifecycle:production").hits
+    assert [d.name for d, _ in hits] == ["billing-api", "payments-api"]
+    assert all(score == 0 for _, score in hits)
+
+
+def test_free_text_ranking_unchanged_by_filters(idx):
+    plain = {d.id: s for d, s in idx.execute("payments").hits}
+    filtered = {d.id: s for d, s in idx.execute("payments team:payments").hits}
+    assert filtered == {k: plain[k] for k in ("id-1", "id-2")}
+
+
+def test_negation_respects_removed_documents(idx):
+    idx.remove("id-4")
+    assert _ids(idx, "-team:payments") == ["id-3"]
+
+
+def test_slots_from_bitset():
+    assert slots_from_bitset(0) == []
+    assert slots_from_bitset((1 << 0) | (1 << 9) | (1 << 70)) == [0, 9, 70]
@@ -0,0 +1,53 @@
+from app.modules.search.index import IndexedDocument
+from app.modules.search.snapshot import read_snapshot, write_snapshot
+
+
+def _docs(n):
+    return [
+        IndexedDocument(
+            id=f"svc-{i}",
+            entity_type="Service",
+            name=f"service-{i}",
+            description="handles payments",
+            tags=["pci"],
+            attributes={"team": "payments", "cve_count": i},
+        )
+        for i in range(n)
+    ]
+
+
+def test_roundtrip(tmp_path):
+    path = tmp_path / "index.snap"
+    write_snapshot(path, _docs(50), "1700000000000-3")
+    snapshot = read_snapshot(path)
+    assert snapshot.stream_id == "1700000000000-3"
+    assert snapshot.documents == _docs(50)
+
+
+def test_overwrite_is_atomic_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "index.snap"
+    write_snapshot(path, _docs(3), "1-0")
+    write_snapshot(path, _docs(5), "2-0")
+    assert [p.name for p in tmp_path.iterdir()] == ["index.snap"]
+    assert len(read_snapshot(path).documents) == 5
+
+
+def test_missing_file(tmp_path):
+    assert read_snapshot(tmp_path / "absent.snap") is None
+
+
+def test_corrupt_payload_is_rejected(tmp_path):
+    path = tmp_path / "index.snap"
+    write_snapshot(path, _docs(10), "1-0")
+    data = bytearray(path.read_bytes())
+    data[-5] ^= 0xFF
+    path.write_bytes(bytes(data))
+    assert read_snapshot(path) is None
+
+
+def test_foreign_or_empty_file_is_rejected(tmp_path):
+    path = tmp_path / "index.snap"
+    path.write_bytes(b"")
+    assert read_snapshot(path) is None
+    path.write_bytes(b"not a snapshot at all, just some bytes here" * 3)
+    assert read_snapshot(path) is None
@@ -0,0 +1,37 @@
+import asyncio
+
+from app.workers import runtime
+from app.workers.runtime import async_task, get_worker_loop
+
+
+@async_task(name="tests.runtime.loop_id", bind=True)
+async def _loop_id(self, offset: int = 0) -> int:
+    await asyncio.sleep(0)
+    return id(asyncio.get_running_loop()) + offset
+
+
+def test_async_task_runs_on_one_persistent_loop():
+    first = _loop_id.apply().get()
+    second = _loop_id.apply(kwargs={"offset": 0}).get()
+    assert first == second == id(get_worker_loop())
+    assert not get_worker_loop().is_closed()
+
+
+def test_task_signature_is_preserved():
+    assert _loop_id.name == "tests.runtime.loop_id"
+    assert _loop_id.apply(args=(1,)).get() == id(get_worker_loop()) + 1
+
+
+def test_shutdown_runs_hooks_then_closes_loop(monkeypatch):
+    calls = []
+
+    async def hook():
+        calls.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(runtime, "_shutdown_hooks", [hook])
+    loop = get_worker_loop()
+    runtime._close_worker_loop()
+    assert calls == [loop]
+    assert loop.is_closed()
+    # Next use (e.g. a new worker process) gets a fresh loop
+    assert not get_worker_loop().is_closed()